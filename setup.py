@@ -14,6 +14,7 @@ with open('HISTORY.rst') as history_file:
 requirements = ['click==8.0.1', 'colored==1.4.2', 'beautifultable==1.0.1',
                 'redis==3.5.3', 'redisearch==2.1.1', 'python-dateutil==2.8.2',
                 'fastapi==0.75.1']
+extras_requirements = {'zstd': ['zstandard']}
 setup_requirements = ['pytest-runner', ]
 test_requirements = ['pytest', ]
 
@@ -37,6 +38,7 @@ setup(
     ''',
     packages=['taskmgr', 'taskmgr.lib'],
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
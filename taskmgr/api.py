@@ -1,23 +1,66 @@
+import asyncio
+
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
-from taskmgr.lib.database.db_manager import DatabaseManager, AuthenticationFailed
+from taskmgr.lib.database.db_manager import DatabaseManager, AuthenticationFailed, DatabaseUnavailable
 from taskmgr.lib.logger import AppLogger
 from taskmgr.lib.view.api_client import ApiClient
 from taskmgr.lib.view.client_args import *
 
 
 try:
-    db_manager = DatabaseManager()
-    api_client = ApiClient(DatabaseManager())
+    db_manager = DatabaseManager.get_instance()
+    api_client = ApiClient(db_manager)
     logger = AppLogger("api").get_logger()
-except AuthenticationFailed:
+except (AuthenticationFailed, DatabaseUnavailable):
     exit(-1)
 
 
+# The routes are plain functions, so FastAPI runs them in its threadpool and
+# the blocking redis calls share the pool of db_manager without stalling the
+# event loop.
 app = FastAPI()
 
 
+async def reconcile_snapshots():
+    """
+    Repairs the drift of the snapshot counters in the background instead of
+    inside a request. claim_reconcile lets one api worker run each
+    reconciliation per snapshot_reconcile_interval. A failed run is logged
+    and the next one is tried after the interval.
+    """
+    common_vars = db_manager.get_common_vars()
+    while common_vars.snapshot_reconcile_interval > 0:
+        await asyncio.sleep(common_vars.snapshot_reconcile_interval)
+        job = asyncio.ensure_future(run_in_threadpool(api_client.reconcile_snapshots_if_due))
+        try:
+            await asyncio.shield(job)
+        except asyncio.CancelledError:
+            # The thread cannot be interrupted, so shutdown waits for it
+            # before the connection pool is closed
+            await asyncio.gather(job, return_exceptions=True)
+            raise
+        except Exception as ex:
+            logger.error(f"Snapshot reconciliation failed: {type(ex).__name__}: {ex}")
+
+
+@app.on_event("startup")
+async def start_reconcile_job():
+    app.state.reconcile_task = asyncio.create_task(reconcile_snapshots())
+
+
+@app.on_event("shutdown")
+async def close_database():
+    app.state.reconcile_task.cancel()
+    try:
+        await app.state.reconcile_task
+    except asyncio.CancelledError:
+        pass
+    db_manager.close()
+
+
 def handle_response(json):
     if "error" in json:
         return JSONResponse(status_code=422, content=json)
@@ -26,34 +69,34 @@ def handle_response(json):
 
 # Tasks
 @app.get("/tasks")
-async def get_all_tasks(args: ListArgs):
+def get_all_tasks(args: ListArgs):
     return api_client.list_all_tasks(args)
 
 
 @app.post("/tasks")
-async def add_task(args: AddArgs):
+def add_task(args: AddArgs):
     json = api_client.add_task(args)
     return handle_response(json)
 
 
 @app.delete("/tasks")
-async def delete_tasks():
+def delete_tasks():
     api_client.remove_all_tasks()
     return api_client.count_all_tasks()
 
 
 @app.put("/tasks")
-async def edit_task(args: EditArgs):
+def edit_task(args: EditArgs):
     return api_client.edit_task(args)
 
 
 @app.get("/task/{task_index}")
-async def get_task(task_index: int):
+def get_task(task_index: int):
     return api_client.get_task(GetArg(index=task_index))
 
 
 @app.delete("/task/{action}/{task_index}")
-async def delete_task(action: str, task_index: int):
+def delete_task(action: str, task_index: int):
 
     if action == "undelete":
         args = UndeleteArgs(indexes=(task_index,))
@@ -66,19 +109,19 @@ async def delete_task(action: str, task_index: int):
 
 
 @app.put("/task/complete/{task_index}")
-async def complete_task(task_index: int, time_spent: float = 0.0):
+def complete_task(task_index: int, time_spent: float = 0.0):
     args = CompleteArgs(indexes=(task_index,), time_spent=time_spent)
     return api_client.complete_task(args)
 
 
 @app.put("/task/incomplete/{task_index}")
-async def incomplete_task(task_index: int):
+def incomplete_task(task_index: int):
     args = IncompleteArgs(indexes=(task_index,))
     return api_client.incomplete_task(args)
 
 
 @app.put("/task/unique/{unique_type}")
-async def get_unique_object(unique_type: str):
+def get_unique_object(unique_type: str):
 
     if unique_type == "label":
         return api_client.get_unique_label_list()
@@ -89,80 +132,90 @@ async def get_unique_object(unique_type: str):
 
 
 @app.put("/task/group/{group_type}")
-async def group_by_object(group_type: str):
+def group_by_object(group_type: str, page: int = 1):
 
     if group_type == "label":
-        return api_client.group_tasks_by_label()
+        return api_client.group_tasks_by_label(page)
     elif group_type == "project":
-        return api_client.group_tasks_by_project()
+        return api_client.group_tasks_by_project(page)
     elif group_type == "due_date":
-        return api_client.group_tasks_by_due_date()
+        return api_client.group_tasks_by_due_date(page)
     else:
         raise HTTPException(status_code=418, detail="name: [label, project, due_date]")
 
 
 @app.put("/task/filter/project")
-async def filter_tasks_by_project(args: ProjectArgs):
+def filter_tasks_by_project(args: ProjectArgs):
     return api_client.filter_tasks_by_project(args)
 
 
 @app.put("/task/filter/label")
-async def filter_tasks_by_label(args: LabelArgs):
+def filter_tasks_by_label(args: LabelArgs):
     return api_client.filter_tasks_by_label(args)
 
 
 @app.put("/task/filter/name")
-async def filter_tasks_by_name(args: NameArgs):
+def filter_tasks_by_name(args: NameArgs):
     return api_client.filter_tasks_by_name(args)
 
 
 @app.put("/task/filter/due_date")
-async def filter_tasks_by_due_date(args: DueDateArgs):
+def filter_tasks_by_due_date(args: DueDateArgs):
     return api_client.filter_tasks_by_due_date(args)
 
 
 @app.put("/task/filter/status")
-async def filter_tasks_by_status(args: StatusArgs):
+def filter_tasks_by_status(args: StatusArgs):
     return api_client.filter_tasks_by_status(args)
 
 
 @app.put("/task/filter/due_date_range")
-async def filter_tasks_by_due_date_range(args: DueDateRangeArgs):
+def filter_tasks_by_due_date_range(args: DueDateRangeArgs):
     return api_client.filter_tasks_by_due_date_range(args)
 
 
+@app.put("/task/filter")
+def filter_tasks(args: FilterArgs):
+    if args.status not in [None, "incomplete", "complete"]:
+        raise HTTPException(status_code=418, detail="status: [incomplete, complete]")
+    return api_client.filter_tasks(args)
+
+
 @app.put("/task/count_all")
-async def count_all_tasks(page: int = 1):
-    return api_client.count_all_tasks(page)
+def count_all_tasks(page: int = 1, cursor: str = None):
+    return api_client.count_all_tasks(page, cursor)
 
 
 @app.put("/task/count/due_date")
-async def count_tasks_by_due_date(args: DueDateArgs):
+def count_tasks_by_due_date(args: DueDateArgs):
     return api_client.count_tasks_by_due_date(args)
 
 
 @app.put("/task/count/project")
-async def count_tasks_by_project(args: ProjectArgs):
+def count_tasks_by_project(args: ProjectArgs):
     return api_client.count_tasks_by_project(args)
 
 
 @app.put("/task/count/due_date_range")
-async def count_tasks_by_due_date_range(args: DueDateRangeArgs):
+def count_tasks_by_due_date_range(args: DueDateRangeArgs):
     return api_client.count_tasks_by_due_date_range(args)
 
 
 @app.put("/task/count/label")
-async def count_tasks_by_label(args: LabelArgs):
+def count_tasks_by_label(args: LabelArgs):
     return api_client.count_tasks_by_label(args)
 
 
 @app.put("/task/count/name")
-async def count_tasks_by_name(args: NameArgs):
+def count_tasks_by_name(args: NameArgs):
     return api_client.count_tasks_by_name(args)
 
 
 @app.put("/task/reschedule")
-async def reschedule():
+def reschedule():
     api_client.reschedule_tasks()
 
 
+@app.get("/database/pool")
+def get_pool_stats():
+    return db_manager.get_pool_stats()
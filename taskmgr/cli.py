@@ -2,7 +2,7 @@ import sys
 
 import click
 
-from taskmgr.lib.database.db_manager import DatabaseManager, AuthenticationFailed
+from taskmgr.lib.database.db_manager import DatabaseManager, AuthenticationFailed, DatabaseUnavailable
 from taskmgr.lib.logger import AppLogger
 from taskmgr.lib.presenter.file_manager import FileManager
 from taskmgr.lib.presenter.task_sync import TaskImporter
@@ -12,11 +12,11 @@ from taskmgr.lib.view.cli_client import CliClient
 from taskmgr.lib.view.client_args import *
 
 try:
-    db_manager = DatabaseManager()
+    db_manager = DatabaseManager.get_instance()
     cli_client = CliClient(db_manager, FileManager())
     logger = AppLogger("cli").get_logger()
     variables = CommonVariables()
-except AuthenticationFailed:
+except (AuthenticationFailed, DatabaseUnavailable):
     exit(-1)
 
 @click.group()
@@ -41,11 +41,11 @@ def edit_time_card(**kwargs):
 
 @time_card.command("reset", help="Exports and removes all time cards")
 @click.option('--confirm', is_flag=True, required=True, help="Confirms removal")
+@click.option('--drop_index', is_flag=True, help="Drops the search index with its documents, faster on large stores")
 def clear_time_cards(**kwargs):
     if kwargs.get("confirm"):
-        query_result = cli_client.time_cards.get_all()
-        cli_client.export_time_cards(query_result.to_list())
-        cli_client.clear_time_cards()
+        cli_client.export_all_time_cards()
+        cli_client.clear_time_cards(kwargs.get("drop_index"))
     else:
         logger.info("Warning: Must use confirm flag before deleting all time cards")
 
@@ -62,11 +62,14 @@ def undelete_time_card(**kwargs):
 @time_card.command("list", help="Lists all time cards")
 @click.option('--export', is_flag=True, help="Outputs to csv file")
 @click.option('--page', type=int, default=0)
+@click.option('--cursor', type=str, default=None, help="Cursor of the page to display, 'first' for the first page")
 @click.option('--all', is_flag=True)
 def list_time_cards(**kwargs):
     args = ListArgs.parse_obj(kwargs)
     time_card_list = cli_client.list_all_time_cards(args)
-    if args.export:
+    if args.export and args.all:
+        cli_client.export_all_time_cards()
+    elif args.export:
         cli_client.export_time_cards(time_card_list)
 
 
@@ -140,6 +143,7 @@ def edit_task(**kwargs):
 
 @task.command("list", help="Lists all tasks")
 @click.option('--page', type=int, default=0)
+@click.option('--cursor', type=str, default=None, help="Cursor of the page to display, 'first' for the first page")
 @click.option('--all', is_flag=True)
 def list_tasks(**kwargs):
     args = ListArgs.parse_obj(kwargs)
@@ -187,25 +191,28 @@ def group_edit(**kwargs):
 
 
 @task_group.command("label")
+@click.option('--page', type=int, default=0)
 @click.option('--export', is_flag=True, help="Outputs to csv file")
 def group_tasks_by_label(**kwargs):
-    task_list = cli_client.group_tasks_by_label()
+    task_list = cli_client.group_tasks_by_label(kwargs.get("page"))
     if kwargs.get("export"):
         cli_client.export_tasks(task_list)
 
 
 @task_group.command("project")
+@click.option('--page', type=int, default=0)
 @click.option('--export', is_flag=True, help="Outputs to csv file")
 def group_tasks_by_project(**kwargs):
-    task_list = cli_client.group_tasks_by_project()
+    task_list = cli_client.group_tasks_by_project(kwargs.get("page"))
     if kwargs.get("export"):
         cli_client.export_tasks(task_list)
 
 
 @task_group.command("due_date")
+@click.option('--page', type=int, default=0)
 @click.option('--export', is_flag=True, help="Outputs to csv file")
 def group_tasks_by_due_date(**kwargs):
-    task_list = cli_client.group_tasks_by_due_date()
+    task_list = cli_client.group_tasks_by_due_date(kwargs.get("page"))
     if kwargs.get("export"):
         cli_client.export_tasks(task_list)
 
@@ -280,6 +287,22 @@ def filter_tasks_by_date(**kwargs):
         cli_client.export_tasks(task_list)
 
 
+@task_filter.command("combined", help="Filters tasks by every provided option with one query")
+@click.option('--project', type=str)
+@click.option('--label', type=str)
+@click.option('--status', type=click.Choice(['incomplete', 'complete']))
+@click.option('--name', type=str, help="Words contained in the task name")
+@click.option('--min_date', type=str)
+@click.option('--max_date', type=str)
+@click.option('--page', type=int, default=0)
+@click.option('--export', is_flag=True, help="Outputs to csv file")
+def filter_tasks(**kwargs):
+    args = FilterArgs.parse_obj(kwargs)
+    task_list = cli_client.filter_tasks(args)
+    if args.export:
+        cli_client.export_tasks(task_list)
+
+
 @task.command("today", help="Lists only the tasks that have today's date")
 @click.option('--export', is_flag=True, help="Outputs to csv file")
 def today(**kwargs):
@@ -295,12 +318,24 @@ def task_count(): pass
 @task_count.command("all")
 @click.option('--export', is_flag=True, help="Outputs all to csv file")
 @click.option('--page', type=int, default=0)
+@click.option('--cursor', type=str, default=None, help="Cursor of the page to display, 'first' for the first page")
 def count_all_tasks(**kwargs):
-    snapshot_list = cli_client.count_all_tasks(kwargs.get("page"))
+    snapshot_list = cli_client.count_all_tasks(kwargs.get("page"), kwargs.get("cursor"))
     if kwargs.get("export"):
         cli_client.export_snapshots(snapshot_list)
 
 
+@task_count.command("reconcile", help="Rebuilds drifted task counts from the tasks")
+def reconcile_snapshots():
+    cli_client.reconcile_snapshots()
+
+
+@task_count.command("rebuild", help="Recreates all task counts from the tasks")
+@click.option('--workers', type=int, default=None, help="Number of threads, defaults to rebuild_workers")
+def rebuild_snapshots(**kwargs):
+    cli_client.rebuild_snapshots(kwargs.get("workers"))
+
+
 @task_count.command("date")
 @click.option('--export', is_flag=True, help="Outputs to csv file")
 @click.argument('due_date', type=str, required=True, metavar="<due_date>")
@@ -363,9 +398,12 @@ def incomplete_task(**kwargs):
 
 
 @task.command("export", help="Exports tasks to csv file")
+@click.option('--format', 'file_format', type=click.Choice(CommonVariables.export_formats), default=None,
+              help="File format, defaults to export_format")
+@click.option('--compress', 'compression', type=click.Choice(CommonVariables.export_compressions), default=None,
+              help="Compression, defaults to export_compression")
 def export_tasks(**kwargs):
-    result = cli_client.tasks.get_all()
-    cli_client.export_tasks(result.to_list())
+    cli_client.export_all_tasks(kwargs.get("file_format"), kwargs.get("compression"))
 
 
 @task.command("import", help="Imports tasks from csv file")
@@ -386,7 +424,24 @@ def import_tasks(**kwargs):
 @click.option('--redis_port', help="Port for redis database", type=int, default=None)
 @click.option('--redis_host', help="IPv4 address for redis database", type=str, default=None)
 @click.option('--export_dir', help="Export directory for csv files", type=str, default=None)
+@click.option('--export_format', help="File format used by exports",
+              type=click.Choice(CommonVariables.export_formats), default=None)
+@click.option('--export_compression', help="Compression used by exports",
+              type=click.Choice(CommonVariables.export_compressions), default=None)
 @click.option('--max_rows', help="Max number of rows to display on page", type=int, default=None)
+@click.option('--redis_max_connections', help="Size of the redis connection pool", type=int, default=None)
+@click.option('--durability', help="Redis persistence after each write",
+              type=click.Choice(CommonVariables.durability_modes), default=None)
+@click.option('--bgsave_interval', help="Minimum seconds between background saves", type=int, default=None)
+@click.option('--snapshot_reconcile_interval', help="Seconds between the snapshot reconciliations of the api, 0 disables",
+              type=int, default=None)
+@click.option('--rebuild_partition_days', help="Days of tasks counted by each snapshot rebuild worker",
+              type=int, default=None)
+@click.option('--rebuild_workers', help="Number of threads used to rebuild snapshots", type=int, default=None)
+@click.option('--index_build_timeout', help="Seconds to wait for a new search index to be built",
+              type=int, default=None)
+@click.option('--scan_count', help="Keys requested by each SCAN and removed by each UNLINK when clearing",
+              type=int, default=None)
 def set_defaults(**kwargs):
     cli_client.set_default_variables(**kwargs)
     cli_client.list_default_variables()
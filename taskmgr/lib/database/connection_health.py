@@ -0,0 +1,72 @@
+import time
+from contextlib import contextmanager
+
+from redis import Redis, ConnectionError, TimeoutError
+
+from taskmgr.lib.logger import AppLogger
+
+
+class ConnectionHealth:
+    """
+    Remembers when the redis connection last completed a command. A PING is
+    only sent after the ttl expires or a command failed with a connection error,
+    so the hot path does not pay an extra round trip before every operation.
+    """
+    logger = AppLogger("connection_health").get_logger()
+
+    def __init__(self, ttl: float, retry_count: int = 3, backoff: float = 0.1,
+                 errors: tuple = (ConnectionError, TimeoutError)):
+        self.ttl = ttl
+        self.retry_count = retry_count
+        self.backoff = backoff
+        self.errors = errors
+        self.__last_success = None
+
+    def mark_success(self):
+        self.__last_success = time.monotonic()
+
+    def mark_failure(self):
+        self.__last_success = None
+
+    def is_fresh(self) -> bool:
+        if self.__last_success is None:
+            return False
+        return time.monotonic() - self.__last_success < self.ttl
+
+    @contextmanager
+    def track(self):
+        """
+        Marks the connection healthy when the block completes and stale when
+        redis-py raises a connection error, which is re-raised to the caller.
+        """
+        try:
+            yield
+        except self.errors:
+            self.mark_failure()
+            raise
+        self.mark_success()
+
+    def check(self, db: Redis) -> bool:
+        """
+        Returns True when a command succeeded within the ttl. Otherwise pings
+        the server, letting redis-py reconnect, with an exponential backoff
+        between attempts.
+        """
+        if self.is_fresh():
+            return True
+
+        delay = self.backoff
+        for attempt in range(1, self.retry_count + 1):
+            try:
+                if db.ping():
+                    self.mark_success()
+                    return True
+            except self.errors as ex:
+                self.mark_failure()
+                self.logger.debug(f"Ping attempt {attempt} of {self.retry_count} failed: {ex}")
+                if attempt < self.retry_count:
+                    time.sleep(delay)
+                    delay *= 2
+
+        self.logger.error("Failed to connect to redis. Check redis host and port")
+        return False
@@ -0,0 +1,31 @@
+import threading
+
+from redis import BlockingConnectionPool
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """
+    Blocking pool that records how many connections were created and how
+    often a caller had to wait for a free connection. The statistics are
+    used to size the pool for the api workers.
+    """
+
+    def __init__(self, **kwargs):
+        self.__lock = threading.Lock()
+        self.__wait_count = 0
+        super().__init__(**kwargs)
+
+    def get_connection(self, command_name, *keys, **options):
+        if self.pool.empty():
+            with self.__lock:
+                self.__wait_count += 1
+        return super().get_connection(command_name, *keys, **options)
+
+    def get_stats(self) -> dict:
+        created_count = len(self._connections)
+        available_count = len([conn for conn in list(self.pool.queue) if conn is not None])
+        return {"max_connections": self.max_connections,
+                "created": created_count,
+                "in_use": created_count - available_count,
+                "available": available_count,
+                "waits": self.__wait_count}
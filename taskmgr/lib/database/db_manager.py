@@ -1,5 +1,9 @@
+import threading
+
 from redis import Redis
 
+from taskmgr.lib.database.connection_pool import InstrumentedConnectionPool
+
 from taskmgr.lib.database.snapshots_db import SnapshotsDatabase
 from taskmgr.lib.database.tasks_db import TasksDatabase
 from taskmgr.lib.database.time_cards_db import TimeCardsDatabase
@@ -16,60 +20,134 @@ class AuthenticationFailed(Exception):
         self.logger.error(msg)
         self.logger.info(msg)
 
+class DatabaseUnavailable(Exception):
+    logger = AppLogger("database_unavailable").get_logger()
+    def __init__(self, msg):
+        super().__init__(msg)
+        self.logger.error(msg)
+
 class DatabaseManager:
+    """
+    Owns the redis connection pool and the database and model objects. The
+    objects are created once and reused, so get_instance should be used to
+    share a single manager in each process.
+    """
+    __instances = dict()
+    __instance_lock = threading.Lock()
 
     def __init__(self, common_vars: CommonVariables = None):
         self.logger = AppLogger("database_manager").get_logger()
         if common_vars is None:
             common_vars = CommonVariables()
+        self.__common_vars = common_vars
+        self.__lock = threading.RLock()
+        self.__tasks_db = None
+        self.__snapshots_db = None
+        self.__time_cards_db = None
+        self.__tasks = None
+        self.__snapshots = None
+        self.__time_cards = None
+
+        self.__pool = InstrumentedConnectionPool(**self.get_pool_args(common_vars))
+        self.__connection = Redis(connection_pool=self.__pool)
 
+    @staticmethod
+    def get_pool_args(common_vars: CommonVariables) -> dict:
+        """
+        Builds the connection pool settings from variables.ini.
+        """
         host = common_vars.redis_host
         port = common_vars.redis_port
+        pool_args = dict(host=host, port=port, db=0,
+                         max_connections=common_vars.redis_max_connections,
+                         timeout=common_vars.redis_pool_timeout,
+                         socket_timeout=common_vars.redis_socket_timeout,
+                         socket_connect_timeout=common_vars.redis_socket_timeout,
+                         socket_keepalive=common_vars.redis_socket_keepalive)
+
         if host not in ["localhost", "127.0.0.1"]:
             username = common_vars.redis_username
             password = common_vars.redis_password
             if username != "unset" and password != "unset":
-                self.__connection = Redis(host=host, port=port, db=0,
-                                          username=username,
-                                          password=password)
+                pool_args.update(username=username, password=password)
             else:
                 raise AuthenticationFailed("Failed to connect to redis. Check redis credentials in variables.ini")
-        else:
-            self.__connection = Redis(host=host, port=port, db=0)
+
+        return pool_args
+
+    @classmethod
+    def get_instance(cls, common_vars: CommonVariables = None):
+        """
+        Returns the manager shared by the process for the provided variables file.
+        """
+        if common_vars is None:
+            common_vars = CommonVariables()
+
+        with cls.__instance_lock:
+            if common_vars.ini_file not in cls.__instances:
+                cls.__instances[common_vars.ini_file] = cls(common_vars)
+            return cls.__instances[common_vars.ini_file]
+
+    def get_common_vars(self) -> CommonVariables:
+        return self.__common_vars
+
+    def get_pool_stats(self) -> dict:
+        return self.__pool.get_stats()
+
+    def close(self):
+        self.__pool.disconnect()
 
     def initialize(self, redis_db):
+        """
+        Creates the index of the database.
+        :raises DatabaseUnavailable: when redis cannot be reached. Nothing is
+        cached, so the next getter call connects again.
+        """
         if redis_db.exists():
             self.logger.debug("Connecting to redis")
             redis_db.create_index()
             self.logger.debug("Creating index")
             return redis_db
         else:
-            self.logger.info("Failed to connect to redis. Check redis host and port")
+            raise DatabaseUnavailable("Failed to connect to redis. Check redis host and port")
 
     def get_tasks_model(self):
-        tasks_db = self.get_tasks_db()
-        return Tasks(tasks_db)
+        with self.__lock:
+            if self.__tasks is None:
+                self.__tasks = Tasks(self.get_tasks_db())
+            return self.__tasks
 
     def get_snapshots_model(self):
-        tasks = self.get_tasks_model()
-        time_cards = self.get_time_cards_model()
-        snapshot_db = self.get_snapshots_db()
-        return Snapshots(tasks, time_cards, snapshot_db)
+        with self.__lock:
+            if self.__snapshots is None:
+                self.__snapshots = Snapshots(self.get_tasks_model(),
+                                             self.get_time_cards_model(),
+                                             self.get_snapshots_db())
+            return self.__snapshots
 
     def get_time_cards_model(self):
-        time_cards_db = self.get_time_cards_db()
-        return TimeCards(time_cards_db)
+        with self.__lock:
+            if self.__time_cards is None:
+                self.__time_cards = TimeCards(self.get_time_cards_db())
+            return self.__time_cards
 
     def get_tasks_db(self):
-        tasks_db = TasksDatabase(self.__connection)
-        return self.initialize(tasks_db)
+        with self.__lock:
+            if self.__tasks_db is None:
+                tasks_db = TasksDatabase(self.__connection, self.__common_vars)
+                self.__tasks_db = self.initialize(tasks_db)
+            return self.__tasks_db
 
     def get_snapshots_db(self):
-        snapshots_db = SnapshotsDatabase(self.__connection)
-        return self.initialize(snapshots_db)
+        with self.__lock:
+            if self.__snapshots_db is None:
+                snapshots_db = SnapshotsDatabase(self.__connection, self.__common_vars)
+                self.__snapshots_db = self.initialize(snapshots_db)
+            return self.__snapshots_db
 
     def get_time_cards_db(self):
-        time_cards_db = TimeCardsDatabase(self.__connection)
-        return self.initialize(time_cards_db)
-
-
+        with self.__lock:
+            if self.__time_cards_db is None:
+                time_cards_db = TimeCardsDatabase(self.__connection, self.__common_vars)
+                self.__time_cards_db = self.initialize(time_cards_db)
+            return self.__time_cards_db
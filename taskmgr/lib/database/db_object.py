@@ -2,6 +2,11 @@ from abc import ABC, abstractmethod
 
 
 class DatabaseObject(ABC):
+    """
+    Base class of the models. The models use __slots__ instead of an instance
+    dict, so large result sets only pay for the fields they store.
+    """
+    __slots__ = ("__unique_id", "__index", "__last_updated", "__object_name")
 
     def __init__(self, object_name):
         self.__unique_id = None
@@ -49,6 +54,17 @@ class DatabaseObject(ABC):
     def last_updated(self, last_updated: str):
         self.__last_updated = last_updated
 
+    def _set_fields(self, obj_dict: dict):
+        """
+        Sets the properties found in obj_dict. Other keys, like the id and payload
+        of a redisearch document, are skipped since there is no instance dict.
+        """
+        cls = type(self)
+        for key, value in obj_dict.items():
+            if isinstance(key, str) and isinstance(getattr(cls, key, None), property):
+                setattr(self, key, value)
+        return self
+
     @abstractmethod
     def deserialize(self, obj_dict): pass
 
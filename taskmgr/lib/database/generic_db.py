@@ -1,14 +1,24 @@
+import threading
+import time
 import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional, TypeVar, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar, Tuple
 
 from redis import Redis, ResponseError
+from redis.client import Pipeline
+from redisearch import IndexDefinition, reducers
+from redisearch._util import to_string
+from redisearch.aggregation import AggregateRequest, Asc, Desc
 from redisearch.client import Client
+from redisearch.document import Document
 from redisearch.query import Query
 
-from taskmgr.lib.database.pager import Pager, Page
+from taskmgr.lib.database.connection_health import ConnectionHealth
+from taskmgr.lib.database.pager import Cursor, Page
+from taskmgr.lib.database.query_builder import QueryBuilder, escape_tag
 from taskmgr.lib.logger import AppLogger
+from taskmgr.lib.model.day import Day
 from taskmgr.lib.model.snapshot import Snapshot
 from taskmgr.lib.model.task import Task
 from taskmgr.lib.model.time_card import TimeCard
@@ -52,26 +62,154 @@ class QueryResult:
         return self.item_count > 0
 
 
-class QueryParams:
-    def __init__(self, key: str, value1=None, value2=None):
+class GroupedResult(QueryResult):
+    """
+    Contains the objects of a grouped query ordered by group, along with the
+    name and item count of each group. Objects with an empty value are skipped.
+    The counts cover every page when group_counts is provided.
+    """
+
+    def __init__(self, key: str, obj_list: list = None, group_counts: Dict[str, int] = None,
+                 page: Page = None):
+        groups = dict()
+        for obj in obj_list or []:
+            value = getattr(obj, key)
+            if value:
+                groups.setdefault(value, []).append(obj)
+
+        self.__groups = [(name, groups[name]) for name in sorted(groups)]
+        if group_counts is None:
+            group_counts = {name: len(group) for name, group in self.__groups}
+        self.__counts = {name: group_counts[name] for name in sorted(group_counts)}
+        super().__init__([obj for _, group in self.__groups for obj in group], page)
+
+    def get_groups(self) -> List[Tuple[str, list]]:
+        return self.__groups
+
+    def get_counts(self) -> Dict[str, int]:
+        return self.__counts
+
+
+class BulkResult:
+    """Contains the objects saved by a bulk write and the duration of each chunk."""
+
+    def __init__(self):
+        self.__object_list = []
+        self.__chunk_times = []
+        self.item_count = 0
+
+    def add_chunk(self, obj_list: list, seconds: float):
+        self.__object_list.extend(obj_list)
+        self.__chunk_times.append(seconds)
+        self.item_count = len(self.__object_list)
+
+    def to_list(self):
+        return self.__object_list
+
+    def get_chunk_times(self) -> List[float]:
+        return self.__chunk_times
+
+    def get_summary(self) -> str:
+        total_time = sum(self.__chunk_times)
+        return f"saved: {self.item_count}, chunks: {len(self.__chunk_times)}, " \
+               f"duration: {total_time:.3f}s"
+
+
+class ClearResult:
+    """Counts the keys removed by a clear and the batches they were removed in."""
+
+    def __init__(self):
+        self.deleted_count = 0
+        self.batch_count = 0
+        self.index_dropped = False
+        self.__start = time.perf_counter()
+
+    def add_batch(self, key_count: int):
+        self.deleted_count += key_count
+        self.batch_count += 1
+
+    def get_duration(self) -> float:
+        return time.perf_counter() - self.__start
+
+    def get_summary(self) -> str:
+        return f"deleted: {self.deleted_count}, batches: {self.batch_count}, " \
+               f"index dropped: {self.index_dropped}, duration: {self.get_duration():.3f}s"
+
+
+class DayQuery:
+    """
+    Builds a single query for a list of days. Consecutive days are collapsed
+    into one numeric range and the ranges are combined with OR, so "this month"
+    is one range and "every weekday" is one range per week.
+    """
+    def __init__(self, key: str, day_list: List[Day]):
         self.key = key
-        self.value1 = value1
-        self.value2 = value2
+        self.day_list = day_list
+
+    def get_ranges(self) -> List[Tuple[int, int]]:
+        range_list = list()
+        first_day = last_day = None
+        for day in sorted(self.day_list, key=lambda d: d.ordinal):
+            if last_day is not None and day.ordinal - last_day.ordinal <= 1:
+                last_day = day
+                continue
+            if first_day is not None:
+                range_list.append((first_day.to_date_timestamp(), last_day.to_date_timestamp()))
+            first_day = last_day = day
+
+        if first_day is not None:
+            range_list.append((first_day.to_date_timestamp(), last_day.to_date_timestamp()))
+        return range_list
 
     def build(self) -> Optional[Query]:
-        if isinstance(self.value1, str) or isinstance(self.value1, bool):
-            return Query(f"@{self.key}:{self.value1}")
-        elif isinstance(self.value1, int) and self.value2 is None:
-            return Query(f"@{self.key}:[{self.value1} {self.value1}]")
-        elif isinstance(self.value1, int) and isinstance(self.value2, int):
-            return Query(f"@{self.key}:[{self.value1} {self.value2}]")
+        range_list = self.get_ranges()
+        if range_list:
+            query_string = " | ".join([f"@{self.key}:[{min_value} {max_value}]"
+                                       for min_value, max_value in range_list])
+            return Query(query_string).sort_by(self.key, asc=True)
 
 
 class GenericDatabase(ABC):
     """Generic base class to support redis databases."""
     logger = AppLogger("generic_database").get_logger()
-
-    def __init__(self): pass
+    last_bgsave = 0.0
+    # Fields declared as TAG in the index schema, the query builder matches them with tag expressions
+    tag_fields: Tuple[str, ...] = ()
+    # Version of the index schema, changing the schema requires a new version
+    schema_version = 1
+    # Separator of the TAG fields holding user input. redisearch splits a tag
+    # value on its separator, so the default "," would split "home, work"
+    tag_separator = "\x1f"
+    # Reads the objects of a list of unique_ids through the id hash in KEYS[1]
+    # and returns one HGETALL reply per id, empty when the id is unknown
+    id_lookup_script = """
+        local result = {}
+        for i, unique_id in ipairs(ARGV) do
+            local key = redis.call('HGET', KEYS[1], unique_id)
+            if key then
+                result[i] = redis.call('HGETALL', key)
+            else
+                result[i] = {}
+            end
+        end
+        return result
+    """
+
+    def __init__(self, inc_key_name: str, id_key_name: str, common_vars: CommonVariables = None):
+        """
+        :param inc_key_name: counter used to reserve the indexes
+        :param id_key_name: hash mapping each unique_id to the key of the object
+        """
+        self.inc_key_name = inc_key_name
+        self.id_key_name = id_key_name
+        if common_vars is None:
+            common_vars = CommonVariables()
+        self.vars = common_vars
+        self.health = ConnectionHealth(common_vars.health_check_ttl,
+                                       common_vars.reconnect_attempts)
+        # The api shares one database object between its worker threads,
+        # so each thread keeps the page number of its own request
+        self.__page_state = threading.local()
 
     @abstractmethod
     def deserialize(self, documents):
@@ -81,23 +219,140 @@ class GenericDatabase(ABC):
     def create_index(self):
         pass
 
-    @abstractmethod
-    def get_key_count(self):
-        pass
+    def set_page_number(self, page: int):
+        self.__page_state.page_number = page
 
-    @abstractmethod
-    def set_page_number(self, page: int): pass
+    def get_page_number(self) -> int:
+        return getattr(self.__page_state, "page_number", 0)
 
     @staticmethod
-    def calc_limits(item_count: int, page_number: int) -> Page:
-        row_count = CommonVariables().max_rows
-        pager = Pager(item_count, row_count)
-        page = pager.get_page(page_number)
-        if page is None:
+    def calc_limits(total: int, page_number: int, row_limit: int = None) -> Page:
+        """
+        Creates the page from the search total.
+        :raises IndexError: when the page number is past the last page
+        """
+        if row_limit is None:
+            row_limit = CommonVariables().max_rows
+        page = Page(page_number, row_limit, total)
+        if not page.exists():
             raise IndexError
 
         return page
 
+    @staticmethod
+    def create_cursor_page(position: Cursor, object_list: list, sort_key: str, row_limit: int,
+                           total: int) -> Page:
+        """
+        Creates the page of a cursor query along with the cursors of the
+        neighbouring pages.
+        """
+        page = Page(position.page_number, row_limit, total)
+        page.pager_disabled = False
+        if object_list:
+            first_obj, last_obj = object_list[0], object_list[-1]
+            if page.page_number < page.page_count:
+                page.next_cursor = Cursor(int(getattr(last_obj, sort_key)), last_obj.index,
+                                          page.page_number + 1).encode()
+            if page.page_number > 1:
+                page.prev_cursor = Cursor(int(getattr(first_obj, sort_key)), first_obj.index,
+                                          page.page_number - 1, Cursor.PREVIOUS).encode()
+        return page
+
+    @staticmethod
+    def create_cursor_request(position: Cursor, query_string: str, sort_key: str, field_list: List[str],
+                              row_limit: int) -> AggregateRequest:
+        """
+        Builds an FT.AGGREGATE request that loads the object fields and sorts
+        by the sort key and the index, so rows with the same timestamp have a
+        stable order.
+        """
+        order = Asc if position.is_reversed() else Desc
+        request = AggregateRequest(position.get_query_string(sort_key, query_string))
+        request.load(*[f"@{field}" for field in field_list])
+        return request.sort_by(order(f"@{sort_key}"), order("@index"), max=row_limit)
+
+    @staticmethod
+    def to_documents(rows: list) -> List[Document]:
+        """
+        Converts FT.AGGREGATE rows, which are flat lists of field names and
+        values, to documents that deserialize accepts.
+        """
+        document_list = list()
+        for row in rows:
+            field_dict = {to_string(row[i]): to_string(row[i + 1]) for i in range(0, len(row) - 1, 2)}
+            document_list.append(Document(field_dict.get("unique_id"), **field_dict))
+        return document_list
+
+    def _get_page(self, db: Redis, client: Client, query: Query, sort_key: str, page_number: int,
+                  asc: bool = False) -> QueryResult:
+        """
+        Gets one page of objects sorted by the sort key, newest first. Page 0
+        returns every object. The page count comes from the total of the same
+        search, so the keys do not need to be counted first.
+        """
+        query.sort_by(sort_key, asc=asc)
+        if page_number == 0:
+            return QueryResult(self._get_all(db, client, query, self.vars.max_rows))
+
+        row_limit = self.vars.max_rows
+        query.paging((page_number - 1) * row_limit, row_limit)
+        result = self._get_object_list(db, client, query)
+        if result is None:
+            return QueryResult()
+
+        total, object_list = result
+        try:
+            return QueryResult(object_list, self.calc_limits(total, page_number, row_limit))
+        except IndexError:
+            return QueryResult()
+
+    def _get_built(self, db: Redis, client: Client, builder: QueryBuilder, sort_key: str,
+                   page_number: int) -> QueryResult:
+        """
+        Runs a query made with the QueryBuilder. A limit set on the builder
+        replaces the page, otherwise the rows are paged like the other queries.
+        The builder's sort field replaces the default sort key.
+        :raises InvalidQuery: when a value of the builder has no searchable terms
+        """
+        query = builder.build(self.tag_fields)
+        if builder.has_limit():
+            result = self._get_object_list(db, client, query)
+            return QueryResult() if result is None else QueryResult(result[1])
+
+        if builder.sort_field is not None:
+            return self._get_page(db, client, query, builder.sort_field, page_number, builder.sort_asc)
+        return self._get_page(db, client, query, sort_key, page_number)
+
+    def _get_cursor_page(self, db: Redis, client: Client, query_string: str, sort_key: str,
+                         field_list: List[str], cursor: str = None) -> QueryResult:
+        """
+        Gets the page at the cursor, sorted by the sort key and the index, newest
+        first. The rows are selected with a filter on the position of the
+        previous page instead of an offset, so every page costs the same.
+        :param query_string: query that selects the objects, "*" for all
+        :param field_list: object fields loaded by the aggregate request
+        :param cursor: next_cursor or prev_cursor of a page, None for the first page
+        :raises InvalidCursor: when the cursor cannot be decoded
+        """
+        position = Cursor.decode(cursor)
+        if not self._exists(db):
+            return QueryResult()
+
+        row_limit = self.vars.max_rows
+        request = self.create_cursor_request(position, query_string, sort_key, field_list, row_limit)
+        try:
+            with self.health.track():
+                rows = client.aggregate(request).rows
+                total = int(client.search(Query(query_string).paging(0, 0)).total)
+        except ResponseError as ex:
+            self.logger.error(ex)
+            return QueryResult()
+
+        object_list = self.deserialize(self.to_documents(rows))
+        if position.is_reversed():
+            object_list.reverse()
+        return QueryResult(object_list, self.create_cursor_page(position, object_list, sort_key, row_limit, total))
+
     @abstractmethod
     def replace_object(self, obj: T, index: int = 0) -> T:
         pass
@@ -105,19 +360,17 @@ class GenericDatabase(ABC):
     def _replace_object(self, db: Redis, obj: T, index: int = 0) -> T:
 
         if self._exists(db):
-            with db.pipeline() as pipe:
+            with self.health.track(), db.pipeline() as pipe:
                 if index != 0 and obj.index != index:
                     obj.index = index
                 obj.last_updated = self.get_last_updated()
 
                 self.logger.debug(f"replace_object: obj {dict(obj)}")
 
-                for key, value in dict(obj).items():
-                    task_key = GenericDatabase.get_key(obj)
-                    pipe.hset(task_key, key, value)
-
+                pipe.hset(self.get_key(obj), mapping=dict(obj))
+                self._set_lookup_keys(pipe, [obj])
                 pipe.execute()
-            db.save()
+            self._persist(db)
 
             return obj
 
@@ -127,34 +380,80 @@ class GenericDatabase(ABC):
 
     def _append_object(self, db: Redis, obj: T) -> T:
         if self._exists(db):
-            with db.pipeline() as pipe:
-                obj.index = self.get_key_count() + 1
+            with self.health.track(), db.pipeline() as pipe:
+                obj.index = self._get_next_index(db)
                 obj.unique_id = self.get_unique_id()
                 obj.last_updated = self.get_last_updated()
 
                 self.logger.debug(f"append_object: obj {dict(obj)}")
 
-                for key, value in dict(obj).items():
-                    obj_key = self.get_key(obj)
-                    pipe.hset(obj_key, key, value)
-
+                pipe.hset(self.get_key(obj), mapping=dict(obj))
+                self._set_lookup_keys(pipe, [obj])
                 pipe.execute()
-            db.save()
+            self._persist(db)
 
             return obj
 
+    def _persist(self, db: Redis):
+        """
+        Persists the dataset using the durability mode in variables.ini.
+        none: relies on the AOF or save settings in the redis server config
+        bgsave: forks a background save at most once every bgsave_interval seconds
+        sync: blocks the server until the full dataset is saved
+        """
+        durability = self.vars.durability
+        if durability == "sync":
+            db.save()
+        elif durability == "bgsave":
+            now = time.monotonic()
+            if now - GenericDatabase.last_bgsave >= self.vars.bgsave_interval:
+                GenericDatabase.last_bgsave = now
+                try:
+                    db.bgsave()
+                except ResponseError as ex:
+                    # Raised when a background save is already in progress
+                    self.logger.debug(ex)
+
+    def _increment_objects(self, db: Redis, increment_list: List[Tuple[T, dict]]):
+        """
+        Adds the values to the fields of existing objects in one MULTI/EXEC
+        pipeline. Integers use HINCRBY and floats use HINCRBYFLOAT, so updates
+        made at the same time by other processes are not lost. Strings are
+        not counters and replace the field.
+        :param db: Redis connection
+        :param increment_list: tuples of object and dict of field increments
+        """
+        if increment_list and self._exists(db):
+            last_updated = self.get_last_updated()
+            with self.health.track(), db.pipeline(transaction=True) as pipe:
+                for obj, field_dict in increment_list:
+                    key = self.get_key(obj)
+                    for field, value in field_dict.items():
+                        if isinstance(value, str):
+                            pipe.hset(key, field, value)
+                        elif isinstance(value, float):
+                            pipe.hincrbyfloat(key, field, value)
+                        else:
+                            pipe.hincrby(key, field, value)
+                    pipe.hset(key, "last_updated", last_updated)
+                pipe.execute()
+            self._persist(db)
+
     @abstractmethod
     def get_object(self, key: str, value) -> Optional[T]:
         pass
 
-    def _get_object(self, client: Client, key: str, value) -> Optional[T]:
+    def _get_object(self, db: Redis, client: Client, key: str, value) -> Optional[T]:
+        if key == "unique_id":
+            return self._get_by_ids(db, [value]).get(value)
 
-        query = QueryParams(key, value).build()
+        query = QueryBuilder.select(key, value, tag_fields=self.tag_fields)
         if query is None:
             return None
 
         query.paging(0, 1)
-        documents = client.search(query).docs
+        with self.health.track():
+            documents = client.search(query).docs
         obj_list = self.deserialize(documents)
         if obj_list:
             return obj_list[0]
@@ -168,53 +467,521 @@ class GenericDatabase(ABC):
     def _get_object_list(self, db: Redis, client: Client, query: Query) -> Tuple[int, List[T]]:
         if self._exists(db):
             try:
-                result = client.search(query)
+                with self.health.track():
+                    result = client.search(query)
                 return int(result.total), self.deserialize(result.docs)
             except ResponseError as ex:
                 self.logger.error(ex)
 
     @abstractmethod
-    def append_objects(self, obj_list: List[T]) -> List[T]:
+    def get_by_days(self, day_list: List[Day]) -> QueryResult:
         pass
 
-    def _append_objects(self, db: Redis, obj_list: List[T]) -> List[T]:
+    def _get_all(self, db: Redis, client: Client, query: Query, row_limit: int) -> List[T]:
+        """
+        Gets every object matching the query. The first request asks for
+        row_limit objects and a second request is only made when more objects
+        matched than that, so the keyspace does not need to be counted first.
+        """
+        query.paging(0, row_limit)
+        result = self._get_object_list(db, client, query)
+        if result is None:
+            return []
+
+        total, object_list = result
+        if total > len(object_list):
+            query.paging(len(object_list), total - len(object_list))
+            result = self._get_object_list(db, client, query)
+            if result is not None:
+                object_list.extend(result[1])
+
+        return object_list
+
+    def _get_by_days(self, db: Redis, client: Client, key: str, day_list: List[Day]) -> QueryResult:
+        """
+        Gets the objects for all the days with one query sorted by date, asking
+        for max_rows per day in the first request.
+        """
+        query = DayQuery(key, day_list).build()
+        if query is None:
+            return QueryResult()
+
+        return QueryResult(self._get_all(db, client, query, len(day_list) * self.vars.max_rows))
+
+    def _get_grouped(self, db: Redis, client: Client, key: str, sort_key: str, field_list: List[str],
+                     page_number: int) -> GroupedResult:
+        """
+        Gets one page of objects ordered by the key, and by the sort key
+        within each group, newest first. The group counts come from one
+        FT.AGGREGATE GROUPBY, and the page from an FT.AGGREGATE sorted by the
+        key, so the server does the grouping. Page 0 returns every object,
+        read in chunks of bulk_chunk_size.
+        """
+        if not self._exists(db):
+            return GroupedResult(key)
+
+        group_counts = self._get_group_counts(client, key)
+        if group_counts is None:
+            return GroupedResult(key)
+
+        total = sum(group_counts.values())
+        if page_number == 0:
+            object_list = list()
+            for offset in range(0, total, self.vars.bulk_chunk_size):
+                object_list.extend(self._get_group_rows(client, key, sort_key, field_list,
+                                                        offset, self.vars.bulk_chunk_size))
+            return GroupedResult(key, object_list, group_counts)
+
+        row_limit = self.vars.max_rows
+        try:
+            page = self.calc_limits(total, page_number, row_limit)
+        except IndexError:
+            return GroupedResult(key)
+        object_list = self._get_group_rows(client, key, sort_key, field_list, page.offset, row_limit)
+        return GroupedResult(key, object_list, group_counts, page)
+
+    def _get_group_counts(self, client: Client, key: str) -> Optional[Dict[str, int]]:
+        """
+        Counts the objects of each non-empty value of the key.
+        :return: dict of counts keyed by value, None when the request failed
+        """
+        request = AggregateRequest("*").group_by(f"@{key}", reducers.count().alias("count"))
+        try:
+            with self.health.track():
+                rows = client.aggregate(request).rows
+        except ResponseError as ex:
+            self.logger.error(ex)
+            return None
+
+        group_counts = dict()
+        for row in rows:
+            field_dict = {to_string(row[i]): row[i + 1] for i in range(0, len(row) - 1, 2)}
+            value = to_string(field_dict.get(key) or "")
+            if value:
+                group_counts[value] = int(field_dict["count"])
+        return group_counts
+
+    def _get_group_rows(self, client: Client, key: str, sort_key: str, field_list: List[str],
+                        offset: int, row_limit: int) -> List[T]:
+        """
+        Reads the objects with a non-empty key from the offset, sorted by the
+        key, the sort key and the index.
+        """
+        request = AggregateRequest("*")
+        request.load(*[f"@{field}" for field in field_list])
+        request.filter(f"@{key} != \"\"")
+        request.sort_by(Asc(f"@{key}"), Desc(f"@{sort_key}"), Desc("@index"), max=offset + row_limit)
+        request.limit(offset, row_limit)
+        try:
+            with self.health.track():
+                rows = client.aggregate(request).rows
+        except ResponseError as ex:
+            self.logger.error(ex)
+            return []
+        return self.deserialize(self.to_documents(rows))
+
+    def _get_span(self, db: Redis, client: Client, key: str) -> Optional[Tuple[int, int]]:
+        """
+        Gets the lowest and highest value of a numeric field by reading one
+        object from each end of the sorted index.
+        """
+        value_list = list()
+        for asc in [True, False]:
+            query = Query("*").sort_by(key, asc=asc).paging(0, 1)
+            result = self._get_object_list(db, client, query)
+            if result is None or not result[1]:
+                return None
+            value_list.append(int(getattr(result[1][0], key)))
+        return value_list[0], value_list[1]
+
+    def _get_between(self, db: Redis, client: Client, key: str, min_value: int, max_value: int) -> List[T]:
+        """
+        Gets every object with a numeric field between the two values sorted
+        by that field.
+        """
+        query = QueryBuilder.select(key, min_value, max_value).sort_by(key, asc=True)
+        return self._get_all(db, client, query, self.vars.bulk_chunk_size)
+
+    @abstractmethod
+    def iter_chunks(self, chunk_size: int = None) -> Iterator[List[T]]:
+        pass
+
+    def _iter_chunks(self, db: Redis, client: Client, chunk_size: int = None) -> Iterator[List[T]]:
+        """
+        Yields all the objects in index order, one window of chunk_size
+        indexes at a time. Each window is a numeric range query, so only one
+        chunk is held in memory and deep result offsets are never requested.
+        """
+        if chunk_size is None:
+            chunk_size = self.vars.bulk_chunk_size
+
         if self._exists(db):
-            with db.pipeline() as pipe:
-                for obj in obj_list:
-                    obj.index = self.get_key_count() + 1
-                    obj.unique_id = self.get_unique_id()
-                    obj.last_updated = self.get_last_updated()
+            last_index = int(db.get(self.inc_key_name) or 0)
+            for first_index in range(1, last_index + 1, chunk_size):
+                query = QueryBuilder.select("index", first_index, first_index + chunk_size - 1)
+                object_list = self._get_all(db, client, query.sort_by("index", asc=True), chunk_size)
+                if object_list:
+                    yield object_list
 
-                    for key, value in dict(obj).items():
-                        task_key = self.get_key(obj)
-                        pipe.hset(task_key, key, value)
+    @abstractmethod
+    def append_objects(self, obj_list: List[T], chunk_size: int = None) -> BulkResult:
+        pass
 
+    def _append_objects(self, db: Redis, obj_list: List[T], chunk_size: int = None) -> BulkResult:
+        """
+        Writes the objects in chunks. Each chunk is sent in a single MULTI/EXEC
+        pipeline with one HSET per object, and the indexes for the whole list
+        are reserved with one INCRBY.
+        :param db: Redis connection
+        :param obj_list: objects to append
+        :param chunk_size: number of objects per pipeline, defaults to bulk_chunk_size
+        :return: BulkResult containing the objects and the time spent on each chunk
+        """
+        result = BulkResult()
+        if self._exists(db):
+            if chunk_size is None:
+                chunk_size = self.vars.bulk_chunk_size
+
+            first_index = self._get_next_index(db, len(obj_list))
+            last_updated = self.get_last_updated()
+            for obj_index, obj in enumerate(obj_list, start=first_index):
+                obj.index = obj_index
+                obj.unique_id = self.get_unique_id()
+                obj.last_updated = last_updated
+
+            for offset in range(0, len(obj_list), chunk_size):
+                chunk = obj_list[offset:offset + chunk_size]
+                start = time.perf_counter()
+                with self.health.track(), db.pipeline(transaction=True) as pipe:
+                    for obj in chunk:
+                        pipe.hset(self.get_key(obj), mapping=dict(obj))
+                    self._set_lookup_keys(pipe, chunk)
                     pipe.execute()
-                db.save()
+                result.add_chunk(chunk, time.perf_counter() - start)
+
+            self._persist(db)
 
-            return obj_list
+        return result
+
+    @abstractmethod
+    def replace_objects(self, obj_list: List[T], chunk_size: int = None) -> BulkResult:
+        pass
+
+    def _replace_objects(self, db: Redis, obj_list: List[T], chunk_size: int = None) -> BulkResult:
+        """
+        Overwrites existing objects in chunks, keeping their index and
+        unique_id. Each chunk is sent in a single MULTI/EXEC pipeline.
+        :param db: Redis connection
+        :param obj_list: objects to replace
+        :param chunk_size: number of objects per pipeline, defaults to bulk_chunk_size
+        :return: BulkResult containing the objects and the time spent on each chunk
+        """
+        result = BulkResult()
+        if self._exists(db):
+            if chunk_size is None:
+                chunk_size = self.vars.bulk_chunk_size
+
+            last_updated = self.get_last_updated()
+            for offset in range(0, len(obj_list), chunk_size):
+                chunk = obj_list[offset:offset + chunk_size]
+                start = time.perf_counter()
+                with self.health.track(), db.pipeline(transaction=True) as pipe:
+                    for obj in chunk:
+                        obj.last_updated = last_updated
+                        pipe.hset(self.get_key(obj), mapping=dict(obj))
+                    self._set_lookup_keys(pipe, chunk)
+                    pipe.execute()
+                result.add_chunk(chunk, time.perf_counter() - start)
+
+            self._persist(db)
+
+        return result
+
+    def _get_by_values(self, db: Redis, client: Client, key: str, value_list: List[str],
+                       chunk_size: int = None) -> Dict[str, T]:
+        """
+        Gets the objects whose field equals one of the values. The values
+        are combined with OR, so each chunk of values needs one query instead
+        of one query per value. unique_ids are read through the id hash.
+        :return: dict of objects keyed by the value of the field
+        """
+        if chunk_size is None:
+            chunk_size = self.vars.bulk_chunk_size
+        if key == "unique_id":
+            return self._get_by_ids(db, value_list, chunk_size)
+
+        value_set = set([value for value in value_list if value])
+        sorted_list = sorted(value_set)
+        object_dict = dict()
+        for offset in range(0, len(sorted_list), chunk_size):
+            chunk = sorted_list[offset:offset + chunk_size]
+            query = QueryBuilder().one_of(key, chunk).build(self.tag_fields)
+            for obj in self._get_all(db, client, query, len(chunk)):
+                value = getattr(obj, key)
+                if value in value_set:
+                    object_dict[value] = obj
+
+        return object_dict
+
+    def _get_by_ids(self, db: Redis, id_list: List[str], chunk_size: int = None) -> Dict[str, T]:
+        """
+        Reads the objects through the hash that maps each unique_id to its key.
+        Each chunk of ids is resolved by one script call, so the lookup and the
+        HGETALL of every object share a single round trip.
+        :return: dict of objects keyed by unique_id, unknown ids are left out
+        """
+        if chunk_size is None:
+            chunk_size = self.vars.bulk_chunk_size
+
+        object_dict = dict()
+        sorted_list = sorted(set([unique_id for unique_id in id_list if unique_id]))
+        if sorted_list and self._exists(db):
+            script = db.register_script(self.id_lookup_script)
+            for offset in range(0, len(sorted_list), chunk_size):
+                chunk = sorted_list[offset:offset + chunk_size]
+                with self.health.track():
+                    rows = script(keys=[self.id_key_name], args=chunk)
+                for obj in self.deserialize(self.to_documents([row for row in rows if row])):
+                    object_dict[obj.unique_id] = obj
+        return object_dict
+
+    def _seed_id_keys(self, db: Redis, pattern: str):
+        """
+        Migrates databases created before the id hash existed. The hash is
+        filled from the existing keys as SCAN returns each batch, so the key
+        list is never held in memory, and HSETNX leaves entries written by
+        other processes untouched. Databases that already have the hash, or
+        never stored an object, are skipped without a scan.
+        """
+        if db.exists(self.id_key_name) or int(db.get(self.inc_key_name) or 0) == 0:
+            return
+
+        batch = list()
+        for key in db.scan_iter(match=pattern, count=self.vars.scan_count):
+            batch.append(key)
+            if len(batch) >= self.vars.scan_count:
+                self._set_id_keys(db, batch)
+                batch = list()
+        if batch:
+            self._set_id_keys(db, batch)
+
+    def _set_id_keys(self, db: Redis, batch: List[bytes]):
+        with db.pipeline(transaction=False) as pipe:
+            for key in batch:
+                pipe.hget(key, "unique_id")
+            id_list = pipe.execute()
+        with db.pipeline(transaction=False) as pipe:
+            for key, unique_id in zip(batch, id_list):
+                if unique_id:
+                    pipe.hsetnx(self.id_key_name, unique_id, key)
+            pipe.execute()
+
+    @staticmethod
+    def get_id_keys(obj_list: List[T]) -> Dict[str, str]:
+        return {obj.unique_id: GenericDatabase.get_key(obj) for obj in obj_list}
+
+    def _set_lookup_keys(self, pipe: Pipeline, obj_list: List[T]):
+        """
+        Adds the writes of the hashes that map a field to the key of each
+        object to the pipeline that writes the objects. Subclasses with more
+        lookup hashes extend it and get_lookup_key_names.
+        """
+        pipe.hset(self.id_key_name, mapping=self.get_id_keys(obj_list))
+
+    def get_lookup_key_names(self) -> List[str]:
+        return [self.id_key_name]
 
     @abstractmethod
     def get_selected(self, key: str, value1, value2=None) -> QueryResult:
         pass
 
     @abstractmethod
-    def clear(self):
+    def get_cursor_page(self, cursor: str = None, key: str = None, value=None) -> QueryResult:
+        pass
+
+    @abstractmethod
+    def clear(self, drop_index: bool = False, on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
         pass
 
-    def _clear(self, db: Redis, pattern: str):
+    def _clear(self, db: Redis, pattern: str, alias: str, drop_index: bool = False,
+               on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
+        """
+        Removes the objects and resets the index counter. The keys are found
+        with SCAN, which never blocks redis like KEYS, and each batch of
+        scan_count keys is removed with one UNLINK, so redis frees the memory
+        in the background.
+        :param alias: name of the search index used by the queries
+        :param drop_index: drops the index with FT.DROPINDEX DD first, which
+        removes the indexed hashes on the server. The scan then only finds the
+        keys the index did not hold, and the index is created again.
+        :param on_progress: called with the result after each batch
+        """
+        result = ClearResult()
         if self._exists(db):
-            for key in db.keys(pattern):
-                db.delete(key)
-            # db.set(inc_key_name, 0)
+            with self.health.track():
+                if drop_index:
+                    result.index_dropped = self._drop_index(db, alias)
+
+                batch = list()
+                for key in db.scan_iter(match=pattern, count=self.vars.scan_count):
+                    batch.append(key)
+                    if len(batch) >= self.vars.scan_count:
+                        self._unlink(db, batch, result, on_progress)
+                        batch = list()
+                if batch:
+                    self._unlink(db, batch, result, on_progress)
+                db.unlink(self.inc_key_name, *self.get_lookup_key_names())
+
+            if result.index_dropped:
+                self.create_index()
+            self.logger.debug(f"Cleared {pattern}: {result.get_summary()}")
+        return result
+
+    @staticmethod
+    def _unlink(db: Redis, batch: List[bytes], result: ClearResult, on_progress: Callable[[ClearResult], None]):
+        db.unlink(*batch)
+        result.add_batch(len(batch))
+        if on_progress is not None:
+            on_progress(result)
+
+    def _drop_index(self, db: Redis, alias: str) -> bool:
+        """
+        Drops the index the alias points to together with its documents.
+        :return: True when the index was dropped
+        """
+        index_name = self._get_aliased_index(db, alias)
+        if index_name is None:
+            return False
+
+        try:
+            Client(index_name, conn=db).dropindex(delete_documents=True)
+            return True
+        except ResponseError as ex:
+            self.logger.error(ex)
+            return False
+
+    def _get_next_index(self, db: Redis, count: int = 1) -> int:
+        """
+        Reserves a block of indexes using the counter stored in redis. INCRBY
+        is atomic, so processes appending at the same time never receive the
+        same index.
+        :param db: Redis connection
+        :param count: number of indexes to reserve
+        :return: first index in the reserved block
+        """
+        last_index = db.incrby(self.inc_key_name, count)
+        return last_index - count + 1
+
+    def _seed_index(self, db: Redis, pattern: str):
+        """
+        Migrates databases created before the index counter existed. The
+        counter is seeded with the highest index found in the existing keys,
+        and SETNX leaves a counter created by another process untouched.
+        """
+        if not db.exists(self.inc_key_name):
+            max_index = 0
+            for key in db.scan_iter(match=pattern):
+                _, _, index = key.decode().rpartition(":")
+                if index.isdigit():
+                    max_index = max(max_index, int(index))
+            db.setnx(self.inc_key_name, max_index)
+
+    @staticmethod
+    def get_index_name(alias: str, schema_version: int) -> str:
+        return f"{alias}:v{schema_version}"
+
+    def _create_index(self, db: Redis, alias: str, schema: tuple, prefix: str):
+        """
+        Creates the index for the current schema version and points the alias
+        used by the queries at it. While redisearch indexes the existing hashes
+        into a new version, the alias keeps serving the old index. The alias is
+        moved once the new index is built, and the old index is then dropped.
+        The hashes are never deleted.
+        :param alias: name used by the queries, e.g. tasks:idx
+        :param schema: fields of the index
+        :param prefix: key prefix of the indexed hashes, e.g. Task:
+        """
+        index_name = self.get_index_name(alias, self.schema_version)
+        client = Client(index_name, conn=db)
+        try:
+            client.info()
+        except ResponseError:
+            try:
+                client.create_index(schema, definition=IndexDefinition(prefix=[prefix]))
+                self.logger.info(f"Building index {index_name}")
+            except ResponseError as ex:
+                # Another process created the index first
+                self.logger.debug(ex)
+
+        current_index = self._get_aliased_index(db, alias)
+        if current_index == index_name:
+            return
+
+        if not self._wait_for_index(client):
+            self.logger.error(f"Index {index_name} was not built within {self.vars.index_build_timeout}s, "
+                              f"{alias} still uses {current_index}")
+            return
+
+        try:
+            if current_index is None:
+                client.aliasadd(alias)
+            elif current_index == alias:
+                self._replace_legacy_index(db, alias, index_name)
+            else:
+                client.aliasupdate(alias)
+                Client(current_index, conn=db).dropindex(delete_documents=False)
+            self.logger.info(f"Moved {alias} from {current_index} to {index_name}")
+        except ResponseError as ex:
+            self.logger.error(ex)
+
+    def _replace_legacy_index(self, db: Redis, alias: str, index_name: str):
+        """
+        Indexes created before the schema was versioned use the alias as their
+        name, and the alias cannot be added while that index exists. The index
+        is dropped and the alias added in one MULTI/EXEC, so no query runs
+        between the two commands. When the alias could not be added, it is
+        added again once the legacy index is gone.
+        """
+        try:
+            with db.pipeline(transaction=True) as pipe:
+                pipe.execute_command("FT.DROPINDEX", alias)
+                pipe.execute_command("FT.ALIASADD", alias, index_name)
+                pipe.execute()
+        except ResponseError as ex:
+            if self._get_aliased_index(db, alias) is not None:
+                raise
+            self.logger.error(f"Adding alias {alias} failed after dropping the legacy index: {ex}")
+            Client(index_name, conn=db).aliasadd(alias)
+
+    @staticmethod
+    def _get_aliased_index(db: Redis, alias: str) -> Optional[str]:
+        """
+        :return: name of the index the alias points to, the alias itself for an
+        index created without an alias, or None when neither exists
+        """
+        try:
+            return Client(alias, conn=db).info()["index_name"]
+        except ResponseError:
+            return None
+
+    def _wait_for_index(self, client: Client) -> bool:
+        """
+        Waits until redisearch has indexed the existing hashes.
+        :return: False when the index is still being built after index_build_timeout
+        """
+        deadline = time.monotonic() + self.vars.index_build_timeout
+        while int(client.info().get("indexing", 0)):
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.1)
+        return True
 
     @abstractmethod
     def exists(self) -> bool:
         pass
 
-    @staticmethod
-    def _exists(db: Redis) -> bool:
-        return db.ping()
+    def _exists(self, db: Redis) -> bool:
+        return self.health.check(db)
 
     @staticmethod
     def get_key(obj: T):
@@ -224,6 +991,13 @@ class GenericDatabase(ABC):
     def get_last_updated() -> str:
         return datetime.strftime(datetime.now(), "%Y-%m-%d %H:%M:%S")
 
+    @staticmethod
+    def escape(value: str) -> str:
+        """
+        Escapes the punctuation that redisearch treats as a token separator.
+        """
+        return escape_tag(value)
+
     @staticmethod
     def get_unique_id() -> str:
         return uuid.uuid4().hex
@@ -1,57 +1,103 @@
+import base64
+import binascii
+import json
+import math
 from typing import Optional
 
-from taskmgr.lib.logger import AppLogger
+
+class InvalidCursor(ValueError):
+    pass
 
 
 class Page:
-    def __init__(self, page_num: int = 0, offset: int = 0,
-                 row_limit: int = 0, page_count: int = 0):
-        self.page_number = page_num
-        self.page_count = page_count
-        self.offset = offset
+    """
+    Describes one page of a query result. The page count and offset are
+    computed from the search total when they are read, so no page objects are
+    built up front.
+    """
+    def __init__(self, page_number: int = 0, row_limit: int = 0, total: int = 0):
+        self.page_number = page_number
         self.row_limit = row_limit
-        self.pager_disabled = False
+        self.total = total
+        self.pager_disabled = page_number == 0 or total < row_limit
+        self.next_cursor = None
+        self.prev_cursor = None
 
+    @property
+    def page_count(self) -> int:
+        if self.row_limit <= 0:
+            return 1
+        return max(1, math.ceil(self.total / self.row_limit))
 
-class Pager:
+    @property
+    def offset(self) -> int:
+        if self.page_number <= 1:
+            return 0
+        return (self.page_number - 1) * self.row_limit
 
-    logger = AppLogger("pager").get_logger()
+    def exists(self) -> bool:
+        return 0 <= self.page_number <= self.page_count
 
-    def __init__(self, item_count: int, row_limit: int):
-        self.row_limit = row_limit
-        self.item_count = item_count
-        self.page_count = 1
-        self.offset = 0
-        self.__page_list = list()
-        self.__assemble_pages()
-
-    def __assemble_pages(self):
-
-        # If there are items found using given query
-        if self.item_count >= self.row_limit:
-            self.page_count = int(round(self.item_count / self.row_limit))
-
-            for page_number in range(1, self.page_count+1):
-                page = Page(page_number, self.offset,
-                            self.row_limit, self.page_count)
-                self.__page_list.append(page)
-                self.offset += self.row_limit
-        else:
-            page = Page(1, self.offset,
-                        self.row_limit, self.page_count)
-            page.pager_disabled = True
-            self.__page_list.append(page)
-
-        return self
-
-    def get_page(self, page_number: int) -> Optional[Page]:
-        assert type(page_number) is int
-        if page_number == 0:
-            page = Page(row_limit=self.item_count)
-            page.pager_disabled = True
-            return page
+
+class Cursor:
+    """
+    Opaque position in a result sorted by a timestamp field and the index,
+    both descending. A page is read by filtering on the position of the last
+    row that was shown, so deep pages cost the same as the first page.
+    """
+    FIRST = "first"
+    NEXT = "next"
+    PREVIOUS = "prev"
+
+    def __init__(self, sort_value: int = None, index: int = None, page_number: int = 1, direction: str = NEXT):
+        self.sort_value = sort_value
+        self.index = index
+        self.page_number = page_number
+        self.direction = direction
+
+    def encode(self) -> str:
+        data = json.dumps([self.sort_value, self.index, self.page_number, self.direction],
+                          separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: Optional[str]) -> "Cursor":
+        """
+        :param cursor: next_cursor or prev_cursor of a page, or None or "first"
+        for the first page
+        :return: Cursor object
+        """
+        if not cursor or cursor == cls.FIRST:
+            return cls()
+
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            sort_value, index, page_number, direction = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor(f"Cursor {cursor} is invalid")
+
+        if not all(isinstance(value, int) for value in (sort_value, index, page_number)) or \
+                direction not in (cls.NEXT, cls.PREVIOUS) or page_number < 1:
+            raise InvalidCursor(f"Cursor {cursor} is invalid")
+        return cls(sort_value, index, page_number, direction)
+
+    def is_reversed(self) -> bool:
+        return self.direction == Cursor.PREVIOUS
+
+    def get_query_string(self, sort_key: str, query_string: str = "*") -> str:
+        """
+        Adds the filter that selects the rows after the position, or before it
+        when going back a page.
+        """
+        if self.sort_value is None:
+            return query_string
+
+        value, index = self.sort_value, self.index
+        if self.is_reversed():
+            position = f"(@{sort_key}:[({value} +inf] | (@{sort_key}:[{value} {value}] @index:[({index} +inf]))"
         else:
-            page_list = [pg for pg in self.__page_list if pg.page_number == page_number]
-            if page_list:
-                return page_list[0]
+            position = f"(@{sort_key}:[-inf ({value}] | (@{sort_key}:[{value} {value}] @index:[-inf ({index}]))"
 
+        if query_string == "*":
+            return position
+        return f"({query_string}) {position}"
@@ -0,0 +1,279 @@
+import re
+from abc import ABC, abstractmethod
+from typing import FrozenSet, Iterable, List, Optional
+
+from redisearch.query import Query
+
+# Characters that RediSearch treats as separators when it tokenizes TEXT fields
+TEXT_SEPARATORS = re.compile(r"[\s,.<>{}\[\]\"':;!@#$%^&*()\-+=~|/\\?`]+")
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def escape_tag(value) -> str:
+    """
+    Escapes every character that is not a letter, digit or underscore, so the
+    value is matched literally inside a TAG or term expression.
+    """
+    return re.sub(r"([^\w])", r"\\\1", str(value))
+
+
+def tokenize(value) -> List[str]:
+    """
+    Splits the value into the terms RediSearch stores for a TEXT field. The
+    terms contain no syntax characters, so they never need escaping.
+    """
+    return [term for term in TEXT_SEPARATORS.split(str(value)) if term]
+
+
+class Condition(ABC):
+    """
+    Part of a query. Conditions are combined with & (AND), | (OR) and ~ (NOT).
+    """
+
+    @abstractmethod
+    def to_string(self, tag_fields: FrozenSet[str]) -> str:
+        """
+        :param tag_fields: fields declared as TAG in the index schema, the
+        other fields are treated as TEXT or NUMERIC
+        """
+        pass
+
+    def __and__(self, other: "Condition") -> "Condition":
+        return And(self, other)
+
+    def __or__(self, other: "Condition") -> "Condition":
+        return Or(self, other)
+
+    def __invert__(self) -> "Condition":
+        return Not(self)
+
+
+class Equals(Condition):
+    """
+    Exact match. TAG fields use a tag expression, TEXT fields match the terms
+    of the value as a phrase.
+    """
+    def __init__(self, field: str, value):
+        self.field = field
+        self.value = str(value)
+
+    def to_string(self, tag_fields):
+        if self.field in tag_fields:
+            return f"@{self.field}:{{{escape_tag(self.value)}}}"
+
+        term_list = tokenize(self.value)
+        if not term_list:
+            raise InvalidQuery(f"Value {self.value!r} of {self.field} has no searchable terms")
+        if len(term_list) == 1:
+            return f"@{self.field}:{term_list[0]}"
+        return f"@{self.field}:\"{' '.join(term_list)}\""
+
+
+class OneOf(Condition):
+    """
+    Matches any of the values. TAG fields use a single tag expression.
+    """
+    def __init__(self, field: str, value_list: Iterable):
+        self.field = field
+        self.value_list = [str(value) for value in value_list]
+
+    def to_string(self, tag_fields):
+        if not self.value_list:
+            raise InvalidQuery(f"OneOf {self.field} needs at least one value")
+        if self.field in tag_fields:
+            return f"@{self.field}:{{{' | '.join([escape_tag(value) for value in self.value_list])}}}"
+        return Or(*[Equals(self.field, value) for value in self.value_list]).to_string(tag_fields)
+
+
+class Between(Condition):
+    """
+    Inclusive numeric range. A missing bound is open.
+    """
+    def __init__(self, field: str, min_value=None, max_value=None):
+        self.field = field
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def to_string(self, tag_fields):
+        min_value = "-inf" if self.min_value is None else self.min_value
+        max_value = "+inf" if self.max_value is None else self.max_value
+        return f"@{self.field}:[{min_value} {max_value}]"
+
+
+class Prefix(Condition):
+    """
+    Matches values starting with the prefix. For TEXT fields the last term is
+    matched as a prefix and the other terms exactly.
+    """
+    def __init__(self, field: str, prefix: str):
+        self.field = field
+        self.prefix = str(prefix)
+
+    def to_string(self, tag_fields):
+        if self.field in tag_fields:
+            return f"@{self.field}:{{{escape_tag(self.prefix)}*}}"
+
+        term_list = tokenize(self.prefix)
+        if not term_list:
+            raise InvalidQuery(f"Prefix {self.prefix!r} of {self.field} has no searchable terms")
+        term_list[-1] = f"{term_list[-1]}*"
+        return f"@{self.field}:({' '.join(term_list)})"
+
+
+class Matches(Condition):
+    """
+    Full text match of all the terms, in any order, in one field or in every
+    TEXT field when no field is given.
+    """
+    def __init__(self, text: str, field: str = None):
+        self.text = str(text)
+        self.field = field
+
+    def to_string(self, tag_fields):
+        term_list = tokenize(self.text)
+        if not term_list:
+            raise InvalidQuery(f"Text {self.text!r} has no searchable terms")
+        if self.field is None:
+            return f"({' '.join(term_list)})"
+        return f"@{self.field}:({' '.join(term_list)})"
+
+
+class And(Condition):
+    def __init__(self, *conditions: Condition):
+        self.condition_list = list(conditions)
+
+    def to_string(self, tag_fields):
+        string_list = [condition.to_string(tag_fields) for condition in self.condition_list]
+        if not string_list:
+            return "*"
+        if len(string_list) == 1:
+            return string_list[0]
+        return f"({' '.join(string_list)})"
+
+
+class Or(Condition):
+    def __init__(self, *conditions: Condition):
+        self.condition_list = list(conditions)
+
+    def to_string(self, tag_fields):
+        if not self.condition_list:
+            raise InvalidQuery("Or needs at least one condition")
+        string_list = [condition.to_string(tag_fields) for condition in self.condition_list]
+        if len(string_list) == 1:
+            return string_list[0]
+        return f"({' | '.join(string_list)})"
+
+
+class Not(Condition):
+    def __init__(self, condition: Condition):
+        self.condition = condition
+
+    def to_string(self, tag_fields):
+        return f"-{self.condition.to_string(tag_fields)}"
+
+
+class QueryBuilder:
+    """
+    Builds a redisearch Query from typed conditions. The conditions added with
+    where and the shortcut methods are combined with AND, so a filter on
+    project, status and date range runs as one query on the server.
+
+        QueryBuilder().equals("project", "home").equals("completed", False)
+                      .between("due_date_timestamp", start, end)
+                      .sort_by("due_date_timestamp", asc=False)
+    """
+    def __init__(self):
+        self.__condition_list = list()
+        self.sort_field = None
+        self.sort_asc = True
+        self.offset = None
+        self.row_limit = None
+
+    def where(self, condition: Condition) -> "QueryBuilder":
+        self.__condition_list.append(condition)
+        return self
+
+    def equals(self, field: str, value) -> "QueryBuilder":
+        return self.where(Equals(field, value))
+
+    def one_of(self, field: str, value_list: Iterable) -> "QueryBuilder":
+        return self.where(OneOf(field, value_list))
+
+    def between(self, field: str, min_value=None, max_value=None) -> "QueryBuilder":
+        return self.where(Between(field, min_value, max_value))
+
+    def prefix(self, field: str, prefix: str) -> "QueryBuilder":
+        return self.where(Prefix(field, prefix))
+
+    def matches(self, text: str, field: str = None) -> "QueryBuilder":
+        return self.where(Matches(text, field))
+
+    def any_of(self, *conditions: Condition) -> "QueryBuilder":
+        return self.where(Or(*conditions))
+
+    def exclude(self, condition: Condition) -> "QueryBuilder":
+        return self.where(Not(condition))
+
+    def sort_by(self, field: str, asc: bool = True) -> "QueryBuilder":
+        self.sort_field = field
+        self.sort_asc = asc
+        return self
+
+    def limit(self, offset: int, row_limit: int) -> "QueryBuilder":
+        self.offset = offset
+        self.row_limit = row_limit
+        return self
+
+    def has_limit(self) -> bool:
+        return self.row_limit is not None
+
+    def has_conditions(self) -> bool:
+        return len(self.__condition_list) > 0
+
+    def to_string(self, tag_fields: Iterable[str] = ()) -> str:
+        condition_list = list(self.__condition_list)
+        # A query made only of negations needs something to subtract from
+        if condition_list and all(isinstance(condition, Not) for condition in condition_list):
+            condition_list.insert(0, None)
+        string_list = ["*" if condition is None else condition.to_string(frozenset(tag_fields))
+                       for condition in condition_list]
+        if not string_list:
+            return "*"
+        return " ".join(string_list)
+
+    def build(self, tag_fields: Iterable[str] = ()) -> Query:
+        """
+        :param tag_fields: fields declared as TAG in the index schema
+        :raises InvalidQuery: when a value has no searchable terms
+        """
+        query = Query(self.to_string(tag_fields))
+        if self.sort_field is not None:
+            query.sort_by(self.sort_field, asc=self.sort_asc)
+        if self.has_limit():
+            query.paging(self.offset, self.row_limit)
+        return query
+
+    @staticmethod
+    def select(key: str, value1, value2=None, tag_fields: Iterable[str] = ()) -> Optional[Query]:
+        """
+        Builds a query with a single condition: equality for strings and
+        booleans, a numeric match or range for integers.
+        :return: Query or None when the values are not supported
+        """
+        builder = QueryBuilder()
+        if isinstance(value1, (str, bool)):
+            builder.equals(key, value1)
+        elif isinstance(value1, int) and value2 is None:
+            builder.between(key, value1, value1)
+        elif isinstance(value1, int) and isinstance(value2, int):
+            builder.between(key, value1, value2)
+        else:
+            return None
+
+        try:
+            return builder.build(tag_fields)
+        except InvalidQuery:
+            return None
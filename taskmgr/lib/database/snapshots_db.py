@@ -1,24 +1,46 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-from redis import ResponseError, Redis
-from redisearch import IndexDefinition, TextField, NumericField
+from redis import Redis
+from redis.client import Pipeline
+from redisearch import NumericField, TagField
 from redisearch.client import Client
 from redisearch.query import Query
 
-from taskmgr.lib.database.generic_db import GenericDatabase, QueryParams, QueryResult
+from taskmgr.lib.database.generic_db import GenericDatabase, ClearResult, QueryResult, BulkResult
+from taskmgr.lib.database.query_builder import QueryBuilder
 from taskmgr.lib.logger import AppLogger
+from taskmgr.lib.model.day import Day
 from taskmgr.lib.model.snapshot import Snapshot
+from taskmgr.lib.variables import CommonVariables
 
 
 class SnapshotsDatabase(GenericDatabase):
 
     logger = AppLogger("snapshot_database").get_logger()
-
-    def __init__(self, db: Redis):
-        super().__init__()
+    schema_version = 2
+    tag_fields = ("unique_id", "due_date")
+    # Creates the snapshot of a due_date unless the hash in KEYS[1] maps the
+    # due_date_timestamp in ARGV[1] to a snapshot of that date. KEYS[2] is the
+    # key of the new snapshot, KEYS[3] the id hash, ARGV[2] its unique_id and
+    # the other ARGV its fields. Returns the existing snapshot, empty when the
+    # new one was created.
+    create_script = """
+        local key = redis.call('HGET', KEYS[1], ARGV[1])
+        if key and redis.call('HGET', key, 'due_date_timestamp') == ARGV[1] then
+            return redis.call('HGETALL', key)
+        end
+        redis.call('HSET', KEYS[2], unpack(ARGV, 3))
+        redis.call('HSET', KEYS[1], ARGV[1], KEYS[2])
+        redis.call('HSET', KEYS[3], ARGV[2], KEYS[2])
+        return {}
+    """
+
+    def __init__(self, db: Redis, common_vars: CommonVariables = None):
+        super().__init__("snapshots_inc_key", "snapshots_id_key", common_vars)
+        self.date_key_name = "snapshots_date_key"
         self.__db = db
         self.__client = Client("snapshot:idx", conn=db)
-        self.__page_number = 0
+        self.__field_list = [field for field, _ in Snapshot()]
 
     def exists(self) -> bool:
         return self._exists(self.__db)
@@ -26,72 +48,111 @@ class SnapshotsDatabase(GenericDatabase):
     def append_object(self, obj: Snapshot) -> Snapshot:
         return self._append_object(self.__db, obj)
 
+    def append_if_missing(self, obj: Snapshot) -> Optional[Snapshot]:
+        """
+        Appends the snapshot unless one already exists for its due_date. The
+        check and the write run in one script, so concurrent requests for the
+        same due_date create a single snapshot.
+        :return: the snapshot saved by another request, None when obj was appended
+        """
+        if self.exists():
+            with self.health.track():
+                obj.index = self._get_next_index(self.__db)
+                obj.unique_id = self.get_unique_id()
+                obj.last_updated = self.get_last_updated()
+                field_list = [value for field in dict(obj).items() for value in field]
+                script = self.__db.register_script(self.create_script)
+                row = script(keys=[self.date_key_name, self.get_key(obj), self.id_key_name],
+                             args=[obj.due_date_timestamp, obj.unique_id] + field_list)
+            if row:
+                return self.deserialize(self.to_documents([row]))[0]
+            self._persist(self.__db)
+        return None
+
     def get_object(self, key: str, value) -> Optional[Snapshot]:
-        return self._get_object(self.__client, key, value)
+        return self._get_object(self.__db, self.__client, key, value)
 
-    def append_objects(self, obj_list: List[Snapshot]) -> List[Snapshot]:
-        return self._append_objects(self.__db, obj_list)
+    def append_objects(self, obj_list: List[Snapshot], chunk_size: int = None) -> BulkResult:
+        return self._append_objects(self.__db, obj_list, chunk_size)
 
-    def get_selected(self, key: str, value1, value2=None) -> QueryResult:
-        query = QueryParams(key, value1, value2).build()
-        if query is None:
-            return QueryResult()
-
-        try:
-            key_count = self.get_key_count()
-            page = self.calc_limits(key_count, self.__page_number)
-            query.paging(page.offset, page.row_limit)
-            query.sort_by("due_date_timestamp", asc=False)
+    def replace_objects(self, obj_list: List[Snapshot], chunk_size: int = None) -> BulkResult:
+        return self._replace_objects(self.__db, obj_list, chunk_size)
 
-            total, object_list = self._get_object_list(self.__db, self.__client, query)
-            page = self.calc_limits(total, self.__page_number)
+    def iter_chunks(self, chunk_size: int = None) -> Iterator[List[Snapshot]]:
+        return self._iter_chunks(self.__db, self.__client, chunk_size)
 
-            return QueryResult(object_list, page)
-        except IndexError:
+    def get_selected(self, key: str, value1, value2=None) -> QueryResult:
+        query = QueryBuilder.select(key, value1, value2, tag_fields=self.tag_fields)
+        if query is None:
             return QueryResult()
 
-
-    def set_page_number(self, page: int):
-        self.__page_number = page
-
-    def get_key_count(self) -> int:
-        return len(self.__db.keys("Snapshot:*"))
+        return self._get_page(self.__db, self.__client, query, "due_date_timestamp", self.get_page_number())
+
+    def get_cursor_page(self, cursor: str = None, key: str = None, value=None) -> QueryResult:
+        query_string = "*"
+        if key is not None:
+            query = QueryBuilder.select(key, value, tag_fields=self.tag_fields)
+            if query is None:
+                return QueryResult()
+            query_string = query.query_string()
+        return self._get_cursor_page(self.__db, self.__client, query_string, "due_date_timestamp",
+                                     self.__field_list, cursor)
+
+    def get_by_days(self, day_list: List[Day]) -> QueryResult:
+        return self._get_by_days(self.__db, self.__client, "due_date_timestamp", day_list)
+
+    def _set_lookup_keys(self, pipe: Pipeline, obj_list: List[Snapshot]):
+        """
+        Every write also maps the due_date_timestamp to the snapshot, so
+        append_if_missing finds the snapshots added by the bulk writes of
+        reconcile and rebuild.
+        """
+        super()._set_lookup_keys(pipe, obj_list)
+        pipe.hset(self.date_key_name, mapping={obj.due_date_timestamp: self.get_key(obj) for obj in obj_list})
+
+    def get_lookup_key_names(self) -> List[str]:
+        return super().get_lookup_key_names() + [self.date_key_name]
+
+    def increment_objects(self, increment_list: List[Tuple[Snapshot, dict]]):
+        self._increment_objects(self.__db, increment_list)
+
+    def claim_reconcile(self) -> bool:
+        """
+        Returns True when the snapshot_reconcile_interval has passed since the
+        last reconciliation. The marker key expires after the interval and is
+        set with NX, so only one process reconciles per interval.
+        """
+        interval = self.vars.snapshot_reconcile_interval
+        if interval > 0 and self.exists():
+            with self.health.track():
+                return bool(self.__db.set("snapshots_reconcile_key", self.get_last_updated(),
+                                          nx=True, ex=interval))
+        return False
 
     def replace_object(self, obj: Snapshot, index: int = 0) -> Snapshot:
         return self._replace_object(self.__db, obj, index)
 
     def get_all(self) -> QueryResult:
-
-        try:
-            key_count = self.get_key_count()
-            page = self.calc_limits(key_count, self.__page_number)
-            query = Query("*").paging(page.offset, page.row_limit).sort_by("due_date_timestamp", asc=False)
-            _, object_list = self._get_object_list(self.__db, self.__client, query)
-            return QueryResult(object_list, page)
-        except IndexError:
-            return QueryResult()
+        return self._get_page(self.__db, self.__client, Query("*"), "due_date_timestamp", self.get_page_number())
 
     def deserialize(self, documents) -> List[Snapshot]:
         return [Snapshot().deserialize(document.__dict__) for document in documents]
 
-    def clear(self):
-        self._clear(self.__db, "Snapshot:*")
+    def clear(self, drop_index: bool = False, on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
+        return self._clear(self.__db, "Snapshot:*", self.__client.index_name, drop_index, on_progress)
 
     def create_index(self):
         schema = (
             NumericField("index"),
-            TextField("unique_id"),
-            TextField("due_date"),
-            NumericField("due_date_timestamp"),
+            TagField("unique_id"),
+            TagField("due_date"),
+            NumericField("due_date_timestamp", sortable=True),
             NumericField("count"),
             NumericField("completed"),
             NumericField("incomplete"),
             NumericField("deleted"),
             NumericField("total_time")
-
         )
-        definition = IndexDefinition(prefix=['Snapshot:'])
-        try:
-            self.__client.info()
-        except ResponseError:
-            self.__client.create_index(schema, definition=definition)
+        self._create_index(self.__db, "snapshot:idx", schema, "Snapshot:")
+        self._seed_index(self.__db, "Snapshot:*")
+        self._seed_id_keys(self.__db, "Snapshot:*")
@@ -1,14 +1,17 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from redis import ResponseError, Redis
-from redisearch import IndexDefinition, TextField, NumericField, reducers
+from redisearch import TextField, NumericField, TagField, reducers
 from redisearch.aggregation import AggregateRequest
 from redisearch.client import Client
 from redisearch.query import Query
 
-from taskmgr.lib.database.generic_db import GenericDatabase, QueryParams, QueryResult
+from taskmgr.lib.database.generic_db import GenericDatabase, ClearResult, QueryResult, BulkResult, GroupedResult
+from taskmgr.lib.database.query_builder import QueryBuilder
 from taskmgr.lib.logger import AppLogger
+from taskmgr.lib.model.day import Day
 from taskmgr.lib.model.task import Task
+from taskmgr.lib.variables import CommonVariables
 
 
 class TasksDatabase(GenericDatabase):
@@ -17,16 +20,14 @@ class TasksDatabase(GenericDatabase):
     before save to maintain a consistent state.
     """
     logger = AppLogger("task_database").get_logger()
+    schema_version = 3
+    tag_fields = ("label", "deleted", "project", "completed", "unique_id", "due_date")
 
-    def __init__(self, db: Redis):
-        super().__init__()
-        # self.__inc_key_name = "tasks_inc_key"
+    def __init__(self, db: Redis, common_vars: CommonVariables = None):
+        super().__init__("tasks_inc_key", "tasks_id_key", common_vars)
         self.__db = db
         self.__client = Client("tasks:idx", conn=db)
-        self.__page_number = 0
-
-    def set_page_number(self, page: int):
-        self.__page_number = page
+        self.__field_list = [field for field, _ in Task()]
 
     def exists(self) -> bool:
         return self._exists(self.__db)
@@ -35,45 +36,62 @@ class TasksDatabase(GenericDatabase):
         return self._append_object(self.__db, obj)
 
     def get_object(self, key: str, value) -> Optional[Task]:
-        return self._get_object(self.__client, key, value)
+        return self._get_object(self.__db, self.__client, key, value)
+
+    def append_objects(self, obj_list: List[Task], chunk_size: int = None) -> BulkResult:
+        return self._append_objects(self.__db, obj_list, chunk_size)
+
+    def replace_objects(self, obj_list: List[Task], chunk_size: int = None) -> BulkResult:
+        return self._replace_objects(self.__db, obj_list, chunk_size)
 
-    def append_objects(self, obj_list: List[Task]) -> List[Task]:
-        return self._append_objects(self.__db, obj_list)
+    def iter_chunks(self, chunk_size: int = None) -> Iterator[List[Task]]:
+        return self._iter_chunks(self.__db, self.__client, chunk_size)
 
-    def get_selected(self, key: str, value1, value2=None) -> QueryResult:
-        query = QueryParams(key, value1, value2).build()
+    def get_by_values(self, key: str, value_list: List[str]) -> Dict[str, Task]:
+        return self._get_by_values(self.__db, self.__client, key, value_list)
+
+    def get_selected(self, key: Union[str, QueryBuilder], value1=None, value2=None) -> QueryResult:
+        """
+        :param key: field name, or a QueryBuilder that combines several conditions
+        :raises InvalidQuery: when a value of the builder has no searchable terms
+        """
+        if isinstance(key, QueryBuilder):
+            return self._get_built(self.__db, self.__client, key, "due_date_timestamp", self.get_page_number())
+
+        query = QueryBuilder.select(key, value1, value2, tag_fields=self.tag_fields)
         if query is None:
             return QueryResult()
 
-        try:
-            key_count = self.get_key_count()
-            page = self.calc_limits(key_count, self.__page_number)
-            query.paging(page.offset, page.row_limit)
-            query.sort_by("due_date_timestamp", asc=False)
+        return self._get_page(self.__db, self.__client, query, "due_date_timestamp", self.get_page_number())
 
-            total, object_list = self._get_object_list(self.__db, self.__client, query)
-            page = self.calc_limits(total, self.__page_number)
+    def get_cursor_page(self, cursor: str = None, key: str = None, value=None) -> QueryResult:
+        query_string = "*"
+        if key is not None:
+            query = QueryBuilder.select(key, value, tag_fields=self.tag_fields)
+            if query is None:
+                return QueryResult()
+            query_string = query.query_string()
+        return self._get_cursor_page(self.__db, self.__client, query_string, "due_date_timestamp",
+                                     self.__field_list, cursor)
 
-            return QueryResult(obj_list=object_list, page=page)
-        except IndexError:
-            return QueryResult()
+    def get_by_days(self, day_list: List[Day]) -> QueryResult:
+        return self._get_by_days(self.__db, self.__client, "due_date_timestamp", day_list)
 
-    def get_key_count(self) -> int:
-        return len(self.__db.keys("Task:*"))
+    def get_grouped(self, key: str) -> GroupedResult:
+        return self._get_grouped(self.__db, self.__client, key, "due_date_timestamp", self.__field_list,
+                                 self.get_page_number())
+
+    def get_span(self) -> Optional[Tuple[int, int]]:
+        return self._get_span(self.__db, self.__client, "due_date_timestamp")
+
+    def get_between(self, min_timestamp: int, max_timestamp: int) -> List[Task]:
+        return self._get_between(self.__db, self.__client, "due_date_timestamp", min_timestamp, max_timestamp)
 
     def replace_object(self, obj: Task, index: int = 0) -> Task:
         return self._replace_object(self.__db, obj, index)
 
     def get_all(self) -> QueryResult:
-
-        try:
-            key_count = self.get_key_count()
-            page = self.calc_limits(key_count, self.__page_number)
-            query = Query("*").paging(page.offset, page.row_limit).sort_by("due_date_timestamp", asc=False)
-            _, object_list = self._get_object_list(self.__db, self.__client, query)
-            return QueryResult(obj_list=object_list, page=page)
-        except IndexError:
-            return QueryResult()
+        return self._get_page(self.__db, self.__client, Query("*"), "due_date_timestamp", self.get_page_number())
 
     def unique(self, key: str) -> List[str]:
         if self.exists():
@@ -89,23 +107,25 @@ class TasksDatabase(GenericDatabase):
     def deserialize(self, documents) -> List[Task]:
         return [Task().deserialize(document.__dict__) for document in documents]
 
-    def clear(self):
-        self._clear(self.__db, "Task:*")
+    def clear(self, drop_index: bool = False, on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
+        return self._clear(self.__db, "Task:*", self.__client.index_name, drop_index, on_progress)
+
+    def get_index_info(self) -> dict:
+        return self.__client.info()
 
     def create_index(self):
         schema = (
             NumericField("index"),
             TextField("name"),
-            TextField("label"),
-            TextField("deleted"),
-            TextField("project"),
-            TextField("completed"),
-            TextField("unique_id"),
-            TextField("due_date"),
-            NumericField("due_date_timestamp")
+            TagField("label", separator=self.tag_separator),
+            TagField("deleted"),
+            TagField("project", separator=self.tag_separator),
+            TagField("completed"),
+            TagField("unique_id"),
+            TagField("due_date"),
+            NumericField("due_date_timestamp", sortable=True),
+            NumericField("time_spent", sortable=True)
         )
-        definition = IndexDefinition(prefix=['Task:'])
-        try:
-            self.__client.info()
-        except ResponseError:
-            self.__client.create_index(schema, definition=definition)
+        self._create_index(self.__db, "tasks:idx", schema, "Task:")
+        self._seed_index(self.__db, "Task:*")
+        self._seed_id_keys(self.__db, "Task:*")
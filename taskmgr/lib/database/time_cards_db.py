@@ -1,24 +1,29 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
-from redis import ResponseError, Redis
-from redisearch import IndexDefinition, TextField, NumericField
+from redis import Redis
+from redisearch import NumericField, TagField
 from redisearch.client import Client
 from redisearch.query import Query
 
-from taskmgr.lib.database.generic_db import GenericDatabase, QueryParams, QueryResult
+from taskmgr.lib.database.generic_db import GenericDatabase, ClearResult, QueryResult, BulkResult
+from taskmgr.lib.database.query_builder import QueryBuilder
 from taskmgr.lib.logger import AppLogger
+from taskmgr.lib.model.day import Day
 from taskmgr.lib.model.time_card import TimeCard
+from taskmgr.lib.variables import CommonVariables
 
 
 class TimeCardsDatabase(GenericDatabase):
 
     logger = AppLogger("time_card_database").get_logger()
+    schema_version = 2
+    tag_fields = ("unique_id", "date", "time_in", "time_out", "total")
 
-    def __init__(self, db: Redis):
-        super().__init__()
+    def __init__(self, db: Redis, common_vars: CommonVariables = None):
+        super().__init__("time_cards_inc_key", "time_cards_id_key", common_vars)
         self.__db = db
         self.__client = Client("timecard:idx", conn=db)
-        self.__page_number = 0
+        self.__field_list = [field for field, _ in TimeCard()]
 
     def exists(self) -> bool:
         return self._exists(self.__db)
@@ -27,68 +32,65 @@ class TimeCardsDatabase(GenericDatabase):
         return self._append_object(self.__db, obj)
 
     def get_object(self, key: str, value) -> Optional[TimeCard]:
-        return self._get_object(self.__client, key, value)
+        return self._get_object(self.__db, self.__client, key, value)
 
-    def append_objects(self, obj_list: List[TimeCard]) -> List[TimeCard]:
-        return self._append_objects(self.__db, obj_list)
+    def append_objects(self, obj_list: List[TimeCard], chunk_size: int = None) -> BulkResult:
+        return self._append_objects(self.__db, obj_list, chunk_size)
 
-    def get_selected(self, key: str, value1, value2=None) -> QueryResult:
-        query = QueryParams(key, value1, value2).build()
-        if query is None:
-            return QueryResult()
+    def replace_objects(self, obj_list: List[TimeCard], chunk_size: int = None) -> BulkResult:
+        return self._replace_objects(self.__db, obj_list, chunk_size)
 
-        try:
-            key_count = self.get_key_count()
-            page = self.calc_limits(key_count, self.__page_number)
-            query.paging(page.offset, page.row_limit)
-            query.sort_by("date_timestamp", asc=False)
+    def iter_chunks(self, chunk_size: int = None) -> Iterator[List[TimeCard]]:
+        return self._iter_chunks(self.__db, self.__client, chunk_size)
 
-            total, object_list = self._get_object_list(self.__db, self.__client, query)
-            page = self.calc_limits(total, self.__page_number)
+    def get_by_values(self, key: str, value_list: List[str]) -> Dict[str, TimeCard]:
+        return self._get_by_values(self.__db, self.__client, key, value_list)
 
-            return QueryResult(object_list, page)
-        except IndexError:
+    def get_selected(self, key: str, value1, value2=None) -> QueryResult:
+        query = QueryBuilder.select(key, value1, value2, tag_fields=self.tag_fields)
+        if query is None:
             return QueryResult()
 
+        return self._get_page(self.__db, self.__client, query, "date_timestamp", self.get_page_number())
+
+    def get_cursor_page(self, cursor: str = None, key: str = None, value=None) -> QueryResult:
+        query_string = "*"
+        if key is not None:
+            query = QueryBuilder.select(key, value, tag_fields=self.tag_fields)
+            if query is None:
+                return QueryResult()
+            query_string = query.query_string()
+        return self._get_cursor_page(self.__db, self.__client, query_string, "date_timestamp",
+                                     self.__field_list, cursor)
 
-    def set_page_number(self, page: int):
-        self.__page_number = page
+    def get_by_days(self, day_list: List[Day]) -> QueryResult:
+        return self._get_by_days(self.__db, self.__client, "date_timestamp", day_list)
 
-    def get_key_count(self) -> int:
-        return len(self.__db.keys("TimeCard:*"))
+    def get_between(self, min_timestamp: int, max_timestamp: int) -> List[TimeCard]:
+        return self._get_between(self.__db, self.__client, "date_timestamp", min_timestamp, max_timestamp)
 
     def replace_object(self, obj: TimeCard, index: int = 0) -> TimeCard:
         return self._replace_object(self.__db, obj, index)
 
     def get_all(self) -> QueryResult:
-
-        try:
-            key_count = self.get_key_count()
-            page = self.calc_limits(key_count, self.__page_number)
-            query = Query("*").paging(page.offset, page.row_limit).sort_by("date_timestamp", asc=False)
-            _, object_list = self._get_object_list(self.__db, self.__client, query)
-            return QueryResult(object_list, page)
-        except IndexError:
-            return QueryResult()
+        return self._get_page(self.__db, self.__client, Query("*"), "date_timestamp", self.get_page_number())
 
     def deserialize(self, documents) -> List[TimeCard]:
         return [TimeCard().deserialize(document.__dict__) for document in documents]
 
-    def clear(self):
-        self._clear(self.__db, "TimeCard:*")
+    def clear(self, drop_index: bool = False, on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
+        return self._clear(self.__db, "TimeCard:*", self.__client.index_name, drop_index, on_progress)
 
     def create_index(self):
         schema = (
             NumericField("index"),
-            TextField("unique_id"),
-            TextField("date"),
-            NumericField("date_timestamp"),
-            TextField("time_in"),
-            TextField("time_out"),
-            TextField("total"),
+            TagField("unique_id"),
+            TagField("date"),
+            NumericField("date_timestamp", sortable=True),
+            TagField("time_in"),
+            TagField("time_out"),
+            TagField("total"),
         )
-        definition = IndexDefinition(prefix=['TimeCard:'])
-        try:
-            self.__client.info()
-        except ResponseError:
-            self.__client.create_index(schema, definition=definition)
+        self._create_index(self.__db, "timecard:idx", schema, "TimeCard:")
+        self._seed_index(self.__db, "TimeCard:*")
+        self._seed_id_keys(self.__db, "TimeCard:*")
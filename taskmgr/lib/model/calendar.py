@@ -1,6 +1,5 @@
 import calendar
 import re
-from copy import deepcopy
 from typing import Callable, List
 from datetime import datetime, timedelta
 from dateutil.relativedelta import *
@@ -162,12 +161,10 @@ class Calendar:
 
     @staticmethod
     def get_first_day_in_month(day: Day) -> Day:
-        day.day_number = 1
-        return day
+        return Day(day.to_datetime().replace(day=1))
 
     def get_last_day_in_month(self, day: Day) -> Day:
-        day.day_number = self.get_day_count_in_month(day)
-        return day
+        return Day(day.to_datetime().replace(day=self.get_day_count_in_month(day)))
 
     @staticmethod
     def get_first_day_in_week(day: Day) -> Day:
@@ -191,28 +188,28 @@ class Calendar:
         return [Day(dt) for dt in days]
 
     def get_this_week(self, day: Day) -> List[Day]:
-        return self.fill(self.get_first_day_in_week(deepcopy(day)), self.get_last_day_in_week(deepcopy(day)))
+        return self.fill(self.get_first_day_in_week(day), self.get_last_day_in_week(day))
 
     def get_last_week(self, day: Day) -> List[Day]:
         past_day = Day(day.to_date_object() - timedelta(days=7))
-        return self.fill(self.get_first_day_in_week(deepcopy(past_day)), self.get_last_day_in_week(deepcopy(past_day)))
+        return self.fill(self.get_first_day_in_week(past_day), self.get_last_day_in_week(past_day))
 
     def get_next_week(self, day: Day) -> List[Day]:
         future_day = Day(day.to_date_object() + timedelta(days=7))
-        return self.fill(self.get_first_day_in_week(deepcopy(future_day)), self.get_last_day_in_week(deepcopy(future_day)))
+        return self.fill(self.get_first_day_in_week(future_day), self.get_last_day_in_week(future_day))
 
     def get_this_month(self, day: Day) -> List[Day]:
-        return self.fill(self.get_first_day_in_month(deepcopy(day)), self.get_last_day_in_month(deepcopy(day)))
+        return self.fill(self.get_first_day_in_month(day), self.get_last_day_in_month(day))
 
     def get_last_month(self, day: Day) -> List[Day]:
         first_day = self.get_first_day_in_month(day)
         past_day = Day(first_day.to_date_object() - timedelta(days=1))
-        return self.fill(self.get_first_day_in_month(deepcopy(past_day)), past_day)
+        return self.fill(self.get_first_day_in_month(past_day), past_day)
 
     def get_next_month(self, day: Day) -> List[Day]:
         last_day = self.get_last_day_in_month(day)
         future_day = Day(last_day.to_date_object() + timedelta(days=1))
-        return self.fill(future_day, self.get_last_day_in_month(deepcopy(future_day)))
+        return self.fill(future_day, self.get_last_day_in_month(future_day))
 
     @staticmethod
     def is_short_date(expression: str) -> bool:
@@ -1,21 +1,54 @@
-import calendar
-from datetime import datetime
+from datetime import datetime, time
 
 from taskmgr.lib.variables import CommonVariables
 
 
 class Day:
+    """
+    Wraps the date of a datetime. The values derived from the date, like the
+    week number, date string and date timestamp, are computed on first use and
+    memoised because the recurring handlers create hundreds of days at a time.
+    A Day is immutable, so the DateCache can hand the same objects to every
+    caller. Use Calendar to derive other days.
+    """
     def __init__(self, dt: datetime):
         assert type(dt) is datetime
         self.__dt = dt
-        self.day_number = dt.day
-        self.month = dt.month
-        self.year = dt.year
-        self.timestamp = int(dt.timestamp())
-        self.weekday_number = dt.weekday()
-        self.week = self.get_week(self.day_number, self.weekday_number, self.month, self.year)
-        self.vars = CommonVariables()
+        self.__date = dt.date()
+        self.__week = None
+        self.__date_string = None
+        self.__date_object = None
+        self.__date_timestamp = None
 
+    @property
+    def day_number(self) -> int:
+        return self.__date.day
+
+    @property
+    def month(self) -> int:
+        return self.__date.month
+
+    @property
+    def year(self) -> int:
+        return self.__date.year
+
+    @property
+    def weekday_number(self) -> int:
+        return self.__date.weekday()
+
+    @property
+    def ordinal(self) -> int:
+        return self.__date.toordinal()
+
+    @property
+    def timestamp(self) -> int:
+        return int(self.__dt.timestamp())
+
+    @property
+    def week(self) -> int:
+        if self.__week is None:
+            self.__week = self.get_week(self.day_number, self.weekday_number, self.month, self.year)
+        return self.__week
 
     def to_datetime(self):
         return self.__dt
@@ -24,7 +57,7 @@ class Day:
         """
         Returns the timestamp as integer from the internal datetime object
         """
-        return int(self.timestamp)
+        return self.timestamp
 
     def to_date_list(self):
         """
@@ -36,27 +69,31 @@ class Day:
         """
         Creates single date string in the format YYYY-MM-DD
         """
-        month = self.pad(self.month)
-        day = self.pad(self.day_number)
-        return f"{self.year}-{month}-{day}"
+        if self.__date_string is None:
+            self.__date_string = self.__date.isoformat()
+        return self.__date_string
 
     def to_date_object(self):
         """
         Returns datetime object for YYYY-MM-DD
         """
-        return datetime.strptime(self.to_date_string(), self.vars.date_format)
+        if self.__date_object is None:
+            self.__date_object = datetime.combine(self.__date, time())
+        return self.__date_object
 
     def to_date_timestamp(self):
         """
         Provides timestamp representing YYYY-MM-DD only.
         """
-        return int(self.to_date_object().timestamp())
+        if self.__date_timestamp is None:
+            self.__date_timestamp = int(self.to_date_object().timestamp())
+        return self.__date_timestamp
 
     def to_date_time_string(self):
         """
         Gets string in format YYYY-MM-DD HH:MM:SS
         """
-        return datetime.strftime(self.__dt, self.vars.date_time_format)
+        return datetime.strftime(self.__dt, CommonVariables().date_time_format)
 
     @staticmethod
     def pad(value):
@@ -66,9 +103,9 @@ class Day:
 
     @staticmethod
     def get_week(day, weekday_number, month, year):
-        cal = calendar.Calendar()
-        for week_count, week_list in enumerate(cal.monthdays2calendar(year, month), start=1):
-            for day_tuple in week_list:
-                if day_tuple == (day, weekday_number):
-                    return week_count
-
+        """
+        Returns the week of the month, counting weeks from monday like
+        calendar.monthdays2calendar.
+        """
+        first_weekday_number = (weekday_number - (day - 1)) % 7
+        return (day - 1 + first_weekday_number) // 7 + 1
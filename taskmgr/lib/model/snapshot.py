@@ -6,6 +6,8 @@ class Snapshot(DatabaseObject):
     Contains properties needed to define a data Snapshot. The DatabaseObject
     contains only the properties that are used to maintain consistent data.
     """
+    __slots__ = ("__task_count", "__complete_count", "__incomplete_count", "__delete_count",
+                 "__total_time", "__actual_time", "__due_date", "__due_date_timestamp")
 
     def __init__(self, is_summary=False):
         super().__init__(self.__class__.__name__)
@@ -18,7 +20,6 @@ class Snapshot(DatabaseObject):
         self.__due_date = str()
         self.__due_date_timestamp = 0
 
-
     @property
     def due_date(self):
         return self.__due_date
@@ -84,9 +85,7 @@ class Snapshot(DatabaseObject):
         self.__actual_time = value
 
     def deserialize(self, obj_dict):
-        for key, value in obj_dict.items():
-            setattr(self, key, value)
-        return self
+        return self._set_fields(obj_dict)
 
     def update(self, snapshot):
         self.__task_count = snapshot.task_count
@@ -7,14 +7,16 @@ class Task(DatabaseObject):
     Contains the properties that are needed to represent a task. The DatabaseObject
     contains only the properties that are used to maintain consistent data.
     """
+    __slots__ = ("__name", "__label", "__time_spent", "__project", "__due_date",
+                 "__due_date_timestamp", "__completed", "__deleted")
 
     def __init__(self, name: str = "default"):
         super().__init__(self.__class__.__name__)
-        self.vars = CommonVariables()
+        common_vars = CommonVariables()
         self.__name = name
-        self.__label = self.vars.default_label
+        self.__label = common_vars.default_label
         self.__time_spent = 0
-        self.__project = self.vars.default_project_name
+        self.__project = common_vars.default_project_name
         self.__due_date = str()
         self.__due_date_timestamp = 0
         self.__completed = "False"
@@ -90,10 +92,7 @@ class Task(DatabaseObject):
             self.__time_spent = float(value)
 
     def deserialize(self, obj_dict: dict):
-        for key, value in obj_dict.items():
-            if isinstance(key, str):
-                setattr(self, key, value)
-        return self
+        return self._set_fields(obj_dict)
 
     def __eq__(self, other):
         existing = (self.unique_id, self.__name, self.__label, self.__project)
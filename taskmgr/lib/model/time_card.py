@@ -1,5 +1,4 @@
 from taskmgr.lib.database.db_object import DatabaseObject
-from taskmgr.lib.variables import CommonVariables
 
 
 class TimeCard(DatabaseObject):
@@ -7,9 +6,11 @@ class TimeCard(DatabaseObject):
     Contains the properties that are needed to represent a time card. The DatabaseObject
     contains only the properties that are used to maintain consistent data.
     """
+    __slots__ = ("__date", "__date_timestamp", "__time_in", "__time_out",
+                 "__elapsed_time", "__total", "__deleted")
+
     def __init__(self):
         super().__init__(self.__class__.__name__)
-        self.vars = CommonVariables()
         self.__date = str()
         self.__date_timestamp = 0
         self.__time_in = 0
@@ -80,10 +81,7 @@ class TimeCard(DatabaseObject):
             self.__total = total
 
     def deserialize(self, obj_dict: dict):
-        for key, value in obj_dict.items():
-            if isinstance(key, str):
-                setattr(self, key, value)
-        return self
+        return self._set_fields(obj_dict)
 
     def __eq__(self, other):
         return self.unique_id == other.unique_id
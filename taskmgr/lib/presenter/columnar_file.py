@@ -0,0 +1,246 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Iterable, Iterator, List, Tuple
+
+from taskmgr.lib.logger import AppLogger
+from taskmgr.lib.model.snapshot import Snapshot
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.model.time_card import TimeCard
+
+
+class InvalidColumnarFile(Exception):
+    pass
+
+
+class ColumnarFile:
+    """
+    Reads and writes objects in a compact columnar file used for backups.
+
+    All numbers are little endian. The file starts with a header:
+        magic      8 bytes  b"TMGRCOL1"
+        version    uint16   schema_version
+        kind       uint8 length + utf-8 object name, e.g. "Task"
+        columns    uint16 count, then per column a uint8 length + utf-8 name
+                   and a one byte type code
+
+    The objects follow in row groups, one per written chunk:
+        rows       uint32 number of rows, 0 marks the end of the file
+        columns    per column a uint64 byte length and the column data
+
+    Column data by type code:
+        b  bool    uint8 per row
+        i  int     int64 per row
+        f  float   float64 per row
+        s  string  null bitmap, one bit per row rounded up to whole bytes,
+                   then uint32 offsets (rows + 1) followed by the utf-8 bytes.
+                   A set bit marks a None value, stored as an empty string
+        d  dict    uint32 dictionary size, the dictionary stored like a
+                   string column, then a uint32 dictionary code per row
+    """
+    logger = AppLogger("columnar_file").get_logger()
+    magic = b"TMGRCOL1"
+    schema_version = 2
+    extension = ".tmc"
+    object_class = None
+    columns: List[Tuple[str, str]] = []
+
+    def write(self, path: str, chunk_iter: Iterable[list]) -> int:
+        """
+        Writes one row group per chunk, so only one chunk is held in memory.
+        :return: number of rows written
+        """
+        start = time.perf_counter()
+        row_count = 0
+        with open(path, 'wb') as output:
+            output.write(self.__pack_header())
+            for chunk in chunk_iter:
+                if chunk:
+                    output.write(struct.pack("<I", len(chunk)))
+                    for name, type_code in self.columns:
+                        data = self.__pack_column(type_code, [getattr(obj, name) for obj in chunk])
+                        output.write(struct.pack("<Q", len(data)))
+                        output.write(data)
+                    row_count += len(chunk)
+            output.write(struct.pack("<I", 0))
+
+        seconds = time.perf_counter() - start
+        self.logger.info(f"Saved {row_count} rows, {os.path.getsize(path)} bytes to {path} in {seconds:.3f}s")
+        return row_count
+
+    def read_chunks(self, path: str) -> Iterator[list]:
+        """
+        Memory maps the file and yields the objects of each row group.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Path {path} does not exist")
+
+        with open(path, 'rb') as input_file, \
+                mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            buffer = memoryview(mapped_file)
+            try:
+                offset = self.__read_header(buffer)
+                while True:
+                    (row_count,) = struct.unpack_from("<I", buffer, offset)
+                    offset += 4
+                    if row_count == 0:
+                        break
+
+                    column_dict = dict()
+                    for name, type_code in self.columns:
+                        (length,) = struct.unpack_from("<Q", buffer, offset)
+                        offset += 8
+                        column_dict[name] = self.__unpack_column(type_code, buffer[offset:offset + length],
+                                                                 row_count)
+                        offset += length
+
+                    yield [self.__create_object(column_dict, row) for row in range(row_count)]
+            finally:
+                buffer.release()
+
+    @classmethod
+    def is_columnar(cls, path: str) -> bool:
+        with open(path, 'rb') as input_file:
+            return input_file.read(len(cls.magic)) == cls.magic
+
+    def __create_object(self, column_dict: dict, row: int):
+        obj = self.object_class()
+        for name, _ in self.columns:
+            setattr(obj, name, column_dict[name][row])
+        return obj
+
+    def __pack_header(self) -> bytes:
+        kind = self.object_class.__name__.encode()
+        header = [self.magic, struct.pack("<HB", self.schema_version, len(kind)), kind,
+                  struct.pack("<H", len(self.columns))]
+        for name, type_code in self.columns:
+            header.append(struct.pack("<B", len(name)) + name.encode() + type_code.encode())
+        return b"".join(header)
+
+    def __read_header(self, buffer: memoryview) -> int:
+        if bytes(buffer[:len(self.magic)]) != self.magic:
+            raise InvalidColumnarFile("File is not a taskmgr columnar file")
+
+        offset = len(self.magic)
+        version, kind_length = struct.unpack_from("<HB", buffer, offset)
+        offset += 3
+        if version != self.schema_version:
+            raise InvalidColumnarFile(f"Unsupported schema version {version}")
+
+        kind = bytes(buffer[offset:offset + kind_length]).decode()
+        offset += kind_length
+        if kind != self.object_class.__name__:
+            raise InvalidColumnarFile(f"File contains {kind} objects instead of {self.object_class.__name__}")
+
+        (column_count,) = struct.unpack_from("<H", buffer, offset)
+        offset += 2
+        column_list = list()
+        for _ in range(column_count):
+            name_length = buffer[offset]
+            name = bytes(buffer[offset + 1:offset + 1 + name_length]).decode()
+            type_code = chr(buffer[offset + 1 + name_length])
+            column_list.append((name, type_code))
+            offset += name_length + 2
+
+        if column_list != self.columns:
+            raise InvalidColumnarFile("File columns do not match the schema")
+        return offset
+
+    @staticmethod
+    def __to_bytes(type_code: str, values) -> bytes:
+        values = array(type_code, values)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def __from_bytes(type_code: str, data: memoryview) -> list:
+        if sys.byteorder == "little":
+            return data.cast(type_code).tolist()
+        values = array(type_code, data)
+        values.byteswap()
+        return values.tolist()
+
+    def __pack_strings(self, value_list: list) -> bytes:
+        null_bitmap = bytearray((len(value_list) + 7) // 8)
+        encoded_list = list()
+        for index, value in enumerate(value_list):
+            if value is None:
+                null_bitmap[index // 8] |= 1 << (index % 8)
+                encoded_list.append(b"")
+            else:
+                encoded_list.append(str(value).encode())
+
+        offsets = [0]
+        for encoded in encoded_list:
+            offsets.append(offsets[-1] + len(encoded))
+        return bytes(null_bitmap) + self.__to_bytes("I", offsets) + b"".join(encoded_list)
+
+    def __unpack_strings(self, data: memoryview, count: int) -> Tuple[list, int]:
+        """
+        :return: tuple of the strings and the number of bytes they used
+        """
+        bitmap_size = (count + 7) // 8
+        null_bitmap = bytes(data[:bitmap_size])
+        offset_size = (count + 1) * 4
+        offsets = self.__from_bytes("I", data[bitmap_size:bitmap_size + offset_size])
+        text_start = bitmap_size + offset_size
+        text = bytes(data[text_start:text_start + offsets[-1]])
+        value_list = [None if null_bitmap[index // 8] & (1 << (index % 8))
+                      else text[offsets[index]:offsets[index + 1]].decode() for index in range(count)]
+        return value_list, text_start + offsets[-1]
+
+    def __pack_column(self, type_code: str, value_list: list) -> bytes:
+        if type_code == "b":
+            return bytes([1 if value else 0 for value in value_list])
+        elif type_code == "i":
+            return self.__to_bytes("q", [int(value) for value in value_list])
+        elif type_code == "f":
+            return self.__to_bytes("d", [float(value) for value in value_list])
+        elif type_code == "s":
+            return self.__pack_strings(value_list)
+        elif type_code == "d":
+            dictionary = dict()
+            codes = [dictionary.setdefault(None if value is None else str(value), len(dictionary))
+                     for value in value_list]
+            return struct.pack("<I", len(dictionary)) + self.__pack_strings(list(dictionary)) + \
+                self.__to_bytes("I", codes)
+        raise InvalidColumnarFile(f"Unknown column type {type_code}")
+
+    def __unpack_column(self, type_code: str, data: memoryview, row_count: int) -> list:
+        if type_code == "b":
+            return [value == 1 for value in data]
+        elif type_code == "i":
+            return self.__from_bytes("q", data)
+        elif type_code == "f":
+            return self.__from_bytes("d", data)
+        elif type_code == "s":
+            return self.__unpack_strings(data, row_count)[0]
+        elif type_code == "d":
+            (dictionary_size,) = struct.unpack_from("<I", data, 0)
+            dictionary, length = self.__unpack_strings(data[4:], dictionary_size)
+            return [dictionary[code] for code in self.__from_bytes("I", data[4 + length:])]
+        raise InvalidColumnarFile(f"Unknown column type {type_code}")
+
+
+class ColumnarTasksFile(ColumnarFile):
+    object_class = Task
+    columns = [("index", "i"), ("name", "s"), ("label", "d"), ("project", "d"), ("time_spent", "f"),
+               ("due_date", "d"), ("due_date_timestamp", "i"), ("completed", "b"), ("deleted", "b"),
+               ("unique_id", "s"), ("last_updated", "s")]
+
+
+class ColumnarTimeCardsFile(ColumnarFile):
+    object_class = TimeCard
+    columns = [("index", "i"), ("date", "d"), ("date_timestamp", "i"), ("time_in", "d"), ("time_out", "d"),
+               ("elapsed_time", "d"), ("deleted", "b"), ("unique_id", "s"), ("last_updated", "s")]
+
+
+class ColumnarSnapshotsFile(ColumnarFile):
+    object_class = Snapshot
+    columns = [("index", "i"), ("due_date", "s"), ("due_date_timestamp", "i"), ("task_count", "i"),
+               ("complete_count", "i"), ("incomplete_count", "i"), ("delete_count", "i"),
+               ("total_time", "f"), ("actual_time", "s"), ("unique_id", "s"), ("last_updated", "s")]
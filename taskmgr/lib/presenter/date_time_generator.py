@@ -1,7 +1,9 @@
+import re
+import threading
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple, Pattern
 
 from taskmgr.lib.model.calendar import Calendar
 from taskmgr.lib.model.day import Day
@@ -9,226 +11,204 @@ from taskmgr.lib.model.time import Time
 from taskmgr.lib.variables import CommonVariables
 
 
-class DateContainer:
+class ParsedDate:
+    """
+    Result of resolving a date expression, with the name of the handler that
+    matched it. The days are kept in a tuple because the result is shared
+    through the DateCache.
+    """
+    __slots__ = ("expression", "handler_name", "single_date", "day_list")
 
-    def __init__(self, expression, day):
-        assert type(expression) is str
-        self.expression = str(expression).lower()
-        self.today = day
-        self.day_list = []
-        self.handler_name = str()
+    def __init__(self, expression: str, handler_name: str, single_date: bool, day_list: Tuple[Day, ...]):
+        self.expression = expression
+        self.handler_name = handler_name
+        self.single_date = single_date
+        self.day_list = day_list
 
+    def __repr__(self):
+        return f"ParsedDate({self.expression!r}, {self.handler_name}, {len(self.day_list)} days)"
 
-class Handler(ABC):
 
-    SINGLE = "single"
-    MULTIPLE = "multiple"
+class DateCache:
+    """
+    Process wide LRU cache of resolved date expressions. Entries are keyed by
+    the expression, the date it is relative to and the recurring month limit.
+    All entries are dropped when the date changes at midnight, since most of
+    them are relative to today.
+    """
+    max_size = 256
 
     def __init__(self):
-        self.next_handler = None
-        self.calendar = Calendar()
-        self.vars = CommonVariables()
+        self.lock = threading.RLock()
+        self.__entries = OrderedDict()
+        self.__date = None
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key: tuple, today_date):
+        """
+        :param key: tuple of the expression, date ordinal and month limit
+        :param today_date: current date, used to expire the entries at midnight
+        :return: tuple of (found, ParsedDate or None)
+        """
+        with self.lock:
+            if self.__date != today_date:
+                self.__entries.clear()
+                self.__date = today_date
+
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.hit_count += 1
+                return True, self.__entries[key]
+            self.miss_count += 1
+            return False, None
+
+    def put(self, key: tuple, parsed_date: Optional[ParsedDate]):
+        with self.lock:
+            self.__entries[key] = parsed_date
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.__entries.clear()
+            self.hit_count = 0
+            self.miss_count = 0
 
-    def handle(self, request):
-        self.next_handler.handle(request)
 
-    @abstractmethod
-    def parse_expression(self, parser): pass
+class Handler(ABC):
+    """
+    Resolves one family of date expressions. Handlers keep no per-request
+    state, so a single instance can serve any number of threads.
+    """
+    # Handlers that produce exactly one day can be used for single dates
+    single_date = True
+    keyword_list: Tuple[str, ...] = ()
+    pattern: Optional[Pattern] = None
+
+    def __init__(self, calendar: Calendar, common_vars: CommonVariables):
+        self.calendar = calendar
+        self.vars = common_vars
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__
 
     @abstractmethod
-    def validate(self, expression): pass
+    def parse_expression(self, expression: str, today: Day, match=None) -> List[Day]:
+        """
+        :param expression: lower case expression
+        :param today: Day the expression is relative to
+        :param match: re.Match when the handler was selected by its pattern
+        :return: list of Day objects, empty when the expression is not a valid date
+        """
+        pass
 
 
 class DayOfWeekHandler(Handler):
+    keyword_list = ('su', 'm', 'tu', 'w', 'th', 'f', 'sa')
 
-    def __init__(self):
-        super().__init__()
-        self.expression_list = ['su', 'm', 'tu', 'w', 'th', 'f', 'sa']
-
-    def handle(self, parser):
-        if self.validate(parser.expression):
-            self.parse_expression(parser)
-        else:
-            super(DayOfWeekHandler, self).handle(parser)
-
-    def parse_expression(self, parser):
-        parser.handler_name = DayOfWeekHandler.__name__
-        parser.day_list = [self.calendar.get_day_using_abbrev(parser.today, parser.expression)]
-
-    def validate(self, expression):
-        return expression in self.expression_list
+    def parse_expression(self, expression, today, match=None):
+        return [self.calendar.get_day_using_abbrev(today, expression)]
 
 
 class NormalLanguageDateHandler(Handler):
+    keyword_list = ("today", "tomorrow", "yesterday")
 
-    def __init__(self):
-        super().__init__()
-        self.expression_list = ["today", "tomorrow", "yesterday"]
-
-    def handle(self, parser):
-        if self.validate(parser.expression):
-            self.parse_expression(parser)
-        else:
-            super(NormalLanguageDateHandler, self).handle(parser)
-
-    def parse_expression(self, parser):
-        parser.handler_name = NormalLanguageDateHandler.__name__
-
-        if parser.expression == "today":
-            parser.day_list = [parser.today]
-
-        if parser.expression == "tomorrow":
-            parser.day_list = [self.calendar.get_tomorrow(parser.today)]
-
-        if parser.expression == "yesterday":
-            parser.day_list = [self.calendar.get_yesterday(parser.today)]
-
-    def validate(self, expression):
-        return expression in self.expression_list
+    def parse_expression(self, expression, today, match=None):
+        if expression == "tomorrow":
+            return [self.calendar.get_tomorrow(today)]
+        elif expression == "yesterday":
+            return [self.calendar.get_yesterday(today)]
+        return [today]
 
 
 class DateRangeHandler(Handler):
+    single_date = False
+    keyword_list = ("this week", "next week", "last week", "this month", "next month", "last month")
 
-    def __init__(self):
-        super().__init__()
-        self.expression_list = ["this week", "next week", "last week",
-                                "this month", "next month", "last month"]
-
-    def handle(self, parser):
-        if self.validate(parser.expression):
-            self.parse_expression(parser)
-        else:
-            super(DateRangeHandler, self).handle(parser)
-
-    def parse_expression(self, parser):
-        parser.handler_name = DateRangeHandler.__name__
-
-        if parser.expression == "this week":
-            parser.day_list = self.calendar.get_this_week(parser.today)
-
-        if parser.expression == "next week":
-            parser.day_list = self.calendar.get_next_week(parser.today)
-
-        if parser.expression == "last week":
-            parser.day_list = self.calendar.get_last_week(parser.today)
-
-        if parser.expression == "this month":
-            parser.day_list = self.calendar.get_this_month(parser.today)
-
-        if parser.expression == "next month":
-            parser.day_list = self.calendar.get_next_month(parser.today)
-
-        if parser.expression == "last month":
-            parser.day_list = self.calendar.get_last_month(parser.today)
-
-    def validate(self, expression):
-        return expression in self.expression_list
+    def parse_expression(self, expression, today, match=None):
+        parse_func = {"this week": self.calendar.get_this_week,
+                      "next week": self.calendar.get_next_week,
+                      "last week": self.calendar.get_last_week,
+                      "this month": self.calendar.get_this_month,
+                      "next month": self.calendar.get_next_month,
+                      "last month": self.calendar.get_last_month}[expression]
+        return parse_func(today)
 
 
 class RecurringDateHandler(Handler):
+    single_date = False
+    keyword_list = ("every day", "every weekday", "every su", "every m", "every tu", "every w", "every th",
+                    "every f", "every sa")
 
-    def __init__(self):
-        super().__init__()
-        self.expression_list = ["every day", "every weekday", "every su", "every m", "every tu", "every w", "every th",
-                                "every f", "every sa"]
-        self.week_abbrev_list = ['su', 'm', 'tu', 'w', 'th', 'f', 'sa']
-
-    def handle(self, parser):
-        if self.validate(parser.expression):
-            self.parse_expression(parser)
-        else:
-            super(RecurringDateHandler, self).handle(parser)
-
-    def parse_expression(self, parser):
-        parser.handler_name = RecurringDateHandler.__name__
-        if parser.expression == "every day":
-            parser.day_list = self.calendar.get_days(parser.today,
-                                                     self.vars.recurring_month_limit)
-        elif parser.expression == "every weekday":
-            parser.day_list = self.calendar.get_work_week_days(parser.today,
-                                                               self.vars.recurring_month_limit)
-        elif str(parser.expression).startswith("every"):
-            parser.day_list = self.calendar.parse_recurring_abbrev(parser.today, parser.expression,
-                                                                   self.vars.recurring_month_limit)
-
-    def validate(self, expression):
-        return expression in self.expression_list
+    def parse_expression(self, expression, today, match=None):
+        month_limit = self.vars.recurring_month_limit
+        if expression == "every day":
+            return self.calendar.get_days(today, month_limit)
+        elif expression == "every weekday":
+            return self.calendar.get_work_week_days(today, month_limit)
+        return self.calendar.parse_recurring_abbrev(today, expression, month_limit)
 
 
 class ShortDateHandler(Handler):
+    """
+    Resolves a month abbreviation and day number, e.g. "jan 12", in the year of
+    the current day.
+    """
+    month_list = ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+    pattern = re.compile(r"^(" + "|".join(month_list) + r") (\d{1,2})$")
 
-    def __init__(self):
-        super().__init__()
-        self.expression_list = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-
-    def handle(self, parser):
-        if self.validate(parser.expression):
-            self.parse_expression(parser)
-        else:
-            super(ShortDateHandler, self).handle(parser)
-
-    def parse_expression(self, parser):
-        parser.day_list = [self.calendar.parse_date_time(parser.expression)]
-
-    def validate(self, expression):
-        return self.calendar.is_short_date(expression)
+    def parse_expression(self, expression, today, match=None):
+        month = self.month_list.index(match.group(1)) + 1
+        try:
+            return [Day(datetime(today.year, month, int(match.group(2))))]
+        except ValueError:
+            return []
 
 
 class YearMonthDateHandler(Handler):
+    pattern = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
 
-    def __init__(self):
-        super().__init__()
-        self.vars = CommonVariables()
-
-    def validate(self, expression):
-        format_valid = self.vars.validate_date_format(expression)
-        date_valid = self.calendar.is_valid(expression)
-        return format_valid is True and date_valid is True
-
-    def parse_expression(self, parser):
-        parser.handler_name = YearMonthDateHandler.__name__
-        parser.day_list = [self.calendar.parse_date_time(parser.expression)]
-
-    def handle(self, parser):
-        if self.validate(parser.expression):
-            self.parse_expression(parser)
-        else:
-            super(YearMonthDateHandler, self).handle(parser)
-
-
-class ErrorHandler(Handler):
-
-    def validate(self, expression):
-        pass
-
-    def parse_expression(self, parser):
-        pass
-
-    def handle(self, parser):
-        print("Invalid request: expression {}".format(parser.expression))
+    def parse_expression(self, expression, today, match=None):
+        try:
+            return [Day(datetime(int(match.group(1)), int(match.group(2)), int(match.group(3))))]
+        except ValueError:
+            return []
 
 
 class DateTimeGenerator(object):
+    """
+    Converts date expressions into Day objects. Each expression is resolved once
+    through a dispatch table: an exact keyword lookup followed by the compiled
+    patterns. The table is built when the generator is created and never
+    changes afterwards, so concurrent calls do not interfere. The results are
+    memoised in the shared DateCache.
+    """
+    cache = DateCache()
+    handler_class_list = [DayOfWeekHandler,
+                          NormalLanguageDateHandler,
+                          DateRangeHandler,
+                          RecurringDateHandler,
+                          ShortDateHandler,
+                          YearMonthDateHandler]
 
     def __init__(self):
         self.vars = CommonVariables()
         self.__current_day = None
-        self.handler_1 = DayOfWeekHandler()
-        self.handler_2 = NormalLanguageDateHandler()
-        self.handler_3 = RecurringDateHandler()
-        self.handler_4 = ShortDateHandler()
-        self.handler_5 = YearMonthDateHandler()
-        self.handler_6 = DateRangeHandler()
-        self.multiple_date_handler_list = [self.handler_1,
-                                           self.handler_2,
-                                           self.handler_3,
-                                           self.handler_4,
-                                           self.handler_5,
-                                           self.handler_6]
-        self.single_date_handler_list = [self.handler_1,
-                                         self.handler_2,
-                                         self.handler_4,
-                                         self.handler_5]
+        calendar = Calendar()
+        self.__keyword_dict: Dict[str, Handler] = dict()
+        self.__pattern_list: List[Handler] = list()
+        for handler_class in self.handler_class_list:
+            handler = handler_class(calendar, self.vars)
+            for keyword in handler.keyword_list:
+                self.__keyword_dict[keyword] = handler
+            if handler.pattern is not None:
+                self.__pattern_list.append(handler)
 
     @property
     def current_day(self):
@@ -247,45 +227,65 @@ class DateTimeGenerator(object):
         day = Calendar().parse_date_time(expression)
         return Time(day.to_datetime())
 
+    def __find_handler(self, expression: str):
+        handler = self.__keyword_dict.get(expression)
+        if handler is not None:
+            return handler, None
+
+        for handler in self.__pattern_list:
+            match = handler.pattern.match(expression)
+            if match is not None:
+                return handler, match
+        return None, None
+
+    def parse(self, expression: str, single_date: bool = False) -> Optional[ParsedDate]:
+        """
+        Resolves the expression to a list of days.
+        :param expression: date expression, e.g. "today", "every m" or "2021-07-12"
+        :param single_date: only accept expressions that resolve to one day
+        :return: ParsedDate or None when the expression is not supported
+        """
+        if expression is None:
+            return None
+
+        expression = str(expression).strip().lower()
+        today = self.current_day
+        key = (expression, today.ordinal, self.vars.recurring_month_limit)
+        found, parsed_date = self.cache.get(key, datetime.now().date())
+        if not found:
+            parsed_date = self.__resolve(expression, today)
+            self.cache.put(key, parsed_date)
+
+        if parsed_date is None or (single_date and not parsed_date.single_date):
+            return None
+        return parsed_date
+
+    def __resolve(self, expression: str, today: Day) -> Optional[ParsedDate]:
+        handler, match = self.__find_handler(expression)
+        if handler is None:
+            return None
+
+        day_list = handler.parse_expression(expression, today, match)
+        if not day_list:
+            return None
+        return ParsedDate(expression, handler.name, handler.single_date, tuple(day_list))
+
     def get_day(self, expression: str) -> Optional[Day]:
         assert type(expression) is str
-        parser = DateContainer(expression, self.current_day)
-
-        self.handler_1.next_handler = self.handler_2
-        self.handler_2.next_handler = self.handler_4
-        self.handler_4.next_handler = self.handler_5
-        self.handler_5.next_handler = ErrorHandler()
-        self.handler_1.handle(parser)
-
-        if len(parser.day_list) == 1:
-            return deque(parser.day_list).popleft()
-        return None
+        parsed_date = self.parse(expression, single_date=True)
+        if parsed_date is None:
+            print("Invalid request: expression {}".format(expression))
+            return None
+        return parsed_date.day_list[0]
 
     def get_days(self, expression: str) -> List[Day]:
         assert type(expression) is str
-        parser = DateContainer(expression, self.current_day)
-
-        self.handler_1.next_handler = self.handler_2
-        self.handler_2.next_handler = self.handler_3
-        self.handler_3.next_handler = self.handler_4
-        self.handler_4.next_handler = self.handler_5
-        self.handler_5.next_handler = self.handler_6
-        self.handler_6.next_handler = ErrorHandler()
-        self.handler_1.handle(parser)
-        return parser.day_list
+        parsed_date = self.parse(expression)
+        if parsed_date is None:
+            print("Invalid request: expression {}".format(expression))
+            return []
+        return list(parsed_date.day_list)
 
     def validate_input(self, date_expression: str,
                        single_date: bool = False) -> bool:
-
-        if date_expression is None:
-            return False
-
-        if single_date:
-            handler_list = self.single_date_handler_list
-        else:
-            handler_list = self.multiple_date_handler_list
-
-        for handler in handler_list:
-            if handler.validate(date_expression):
-                return True
-        return False
+        return self.parse(date_expression, single_date) is not None
@@ -1,65 +1,201 @@
 import csv
+import gzip
+import io
+import json
 import os
 import time
 from abc import abstractmethod
 from operator import attrgetter
-from typing import List
+from itertools import chain
+from typing import Iterable, Iterator, List, TextIO
 
 from taskmgr.lib.logger import AppLogger
+from taskmgr.lib.presenter.columnar_file import ColumnarFile, ColumnarTasksFile, ColumnarTimeCardsFile, \
+    ColumnarSnapshotsFile
 from taskmgr.lib.model.snapshot import Snapshot
 from taskmgr.lib.model.task import Task
 from taskmgr.lib.model.time_card import TimeCard
 from taskmgr.lib.variables import CommonVariables
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
 
 class UnmatchedColumns(Exception):
     pass
 
 
+class UnsupportedCompression(Exception):
+    pass
+
+
 class File:
     logger = AppLogger("file").get_logger()
+    columnar_file = None
 
-    def __init__(self):
-        if len(CommonVariables().export_dir) > 0:
-            self.__output_dir = CommonVariables().export_dir
+    def __init__(self, file_format: str = None, compression: str = None):
+        common_vars = CommonVariables()
+        if len(common_vars.export_dir) > 0:
+            self.__output_dir = common_vars.export_dir
         else:
-            self.__output_dir = CommonVariables().resources_dir
+            self.__output_dir = common_vars.resources_dir
+
+        self.file_format = file_format if file_format is not None else common_vars.export_format
+        self.compression = compression if compression is not None else common_vars.export_compression
+
+    @property
+    def output_dir(self) -> str:
+        return self.__output_dir
+
+    @output_dir.setter
+    def output_dir(self, value: str):
+        self.__output_dir = value
 
     @staticmethod
     def get_timestamp():
         return time.strftime(CommonVariables().file_name_timestamp)
 
-    def open(self, path: str, field_names: list):
-        obj_list = list()
-        if os.path.exists(path):
-            self.logger.info(f"Reading file {path}")
-            with open(path, 'r') as csvfile:
-                reader = csv.DictReader(csvfile)
-                if set(reader.fieldnames) == set(field_names):
-                    for row in reader:
-                        obj_list.append(row)
-                else:
-                    raise UnmatchedColumns(f"Found unexpected column(s) in csv file")
-
-            return obj_list
-        else:
+    def get_extension(self) -> str:
+        if self.file_format == "columnar":
+            return ColumnarFile.extension
+
+        extension = f".{self.file_format}"
+        if self.compression == "gzip":
+            extension += ".gz"
+        elif self.compression == "zstd":
+            extension += ".zst"
+        return extension
+
+    def open(self, path: str, field_names: list) -> list:
+        return [row for chunk in self.open_chunks(path, field_names) for row in chunk]
+
+    def open_chunks(self, path: str, field_names: list, chunk_size: int = None) -> Iterator[List[dict]]:
+        """
+        Reads the csv or JSON Lines file lazily and yields the rows in lists
+        of chunk_size, so only one chunk of the file is held in memory. gzip
+        and zstd files are detected by their magic bytes and the format by the
+        first character, so every export except columnar can be read back.
+        :param path: path to the file
+        :param field_names: expected column names
+        :param chunk_size: number of rows per chunk, defaults to bulk_chunk_size
+        """
+        if not os.path.exists(path):
             raise FileNotFoundError(f"Path {path} does not exist")
 
-    def save(self, file_name: str, obj_list: list, field_names: list, row_func) -> str:
+        if chunk_size is None:
+            chunk_size = CommonVariables().bulk_chunk_size
+
+        self.logger.info(f"Reading file {path}")
+        with self.__open_input(path) as input_file:
+            first_line = input_file.readline()
+            line_iter = chain([first_line], input_file)
+            if first_line.lstrip().startswith("{"):
+                row_iter = self.__read_json_lines(line_iter, field_names)
+            else:
+                row_iter = self.__read_csv(line_iter, field_names)
+
+            chunk = list()
+            for row in row_iter:
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = list()
+            if chunk:
+                yield chunk
+
+    @staticmethod
+    def __open_input(path: str) -> TextIO:
+        with open(path, 'rb') as input_file:
+            magic = input_file.read(4)
+
+        if magic[:2] == GZIP_MAGIC:
+            return gzip.open(path, 'rt', newline='')
+        elif magic == ZSTD_MAGIC:
+            if zstandard is None:
+                raise UnsupportedCompression("zstd compression requires the zstandard package")
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')), newline='')
+        return open(path, 'r', newline='')
+
+    @staticmethod
+    def __read_csv(line_iter: Iterable[str], field_names: list) -> Iterator[dict]:
+        reader = csv.DictReader(line_iter)
+        if set(reader.fieldnames or []) != set(field_names):
+            raise UnmatchedColumns(f"Found unexpected column(s) in csv file")
+        return reader
 
+    @staticmethod
+    def __read_json_lines(line_iter: Iterable[str], field_names: list) -> Iterator[dict]:
+        """
+        Yields the rows with their values converted to the strings the csv
+        export holds, so the importers handle both formats the same way.
+        """
+        field_set = set(field_names)
+        for line_number, line in enumerate(line_iter, start=1):
+            if line.strip():
+                row = json.loads(line)
+                if set(row) != field_set:
+                    raise UnmatchedColumns(f"Found unexpected column(s) on line {line_number} of JSON Lines file")
+                yield {key: "" if value is None else str(value) for key, value in row.items()}
+
+    def save(self, file_name: str, obj_list: list, field_names: list, row_func) -> str:
+        return self.save_chunks(file_name, [obj_list], field_names, row_func)
+
+    def save_chunks(self, file_name: str, chunk_iter: Iterable[list], field_names: list, row_func) -> str:
+        """
+        Writes each chunk to the file as soon as it is received, as csv or
+        JSON Lines and optionally compressed with gzip or zstd. The objects
+        are sorted by index within each chunk, so chunks that are produced in
+        index order give a file sorted by index. The columnar format is
+        written by the columnar_file of the subclass.
+        """
         if os.path.exists(self.__output_dir):
             path = self.__make_path(self.__output_dir, file_name)
-            with open(path, 'w', newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=field_names)
-                writer.writeheader()
-                for obj in sorted(obj_list, key=attrgetter('index')):
-                    writer.writerow(row_func(obj))
-
-            self.logger.info(f"Saved results to {path}")
+            if self.file_format == "columnar":
+                self.columnar_file().write(path, chunk_iter)
+                return path
+
+            start = time.perf_counter()
+            with self.__open_output(path) as output:
+                row_count = self.__write_rows(output, chunk_iter, field_names, row_func)
+
+            seconds = time.perf_counter() - start
+            byte_count = os.path.getsize(path)
+            self.logger.info(f"Saved {row_count} rows, {byte_count} bytes to {path} in {seconds:.3f}s "
+                             f"({row_count / seconds:.0f} rows/sec, {byte_count / seconds:.0f} bytes/sec)")
             return path
         else:
             raise FileNotFoundError(f"{self.__output_dir} directory does not exist")
 
+    def __open_output(self, path: str) -> TextIO:
+        if self.compression == "gzip":
+            return gzip.open(path, 'wt', newline='')
+        elif self.compression == "zstd":
+            if zstandard is None:
+                raise UnsupportedCompression("zstd compression requires the zstandard package")
+            return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(path, 'wb')), newline='')
+        return open(path, 'w', newline='')
+
+    def __write_rows(self, output: TextIO, chunk_iter: Iterable[list], field_names: list, row_func) -> int:
+        row_count = 0
+        if self.file_format == "jsonl":
+            for chunk in chunk_iter:
+                output.writelines([json.dumps(row_func(obj), default=str) + "\n"
+                                   for obj in sorted(chunk, key=attrgetter('index'))])
+                row_count += len(chunk)
+        else:
+            writer = csv.DictWriter(output, fieldnames=field_names)
+            writer.writeheader()
+            for chunk in chunk_iter:
+                writer.writerows([row_func(obj) for obj in sorted(chunk, key=attrgetter('index'))])
+                row_count += len(chunk)
+        return row_count
+
     @staticmethod
     def __make_path(file_path, file_name) -> str:
         if str(file_path).endswith("/"):
@@ -76,6 +212,13 @@ class File:
     def read_file(self, path):
         pass
 
+    def write_chunks(self, chunk_iter: Iterable[list]) -> str:
+        return self.save_chunks(self.get_filename(), chunk_iter,
+                                self.get_field_names(), self.write_row)
+
+    def read_chunks(self, path: str) -> Iterator[List[dict]]:
+        return self.open_chunks(path, self.get_field_names())
+
     @abstractmethod
     def get_filename(self):
         pass
@@ -84,12 +227,13 @@ class File:
 class CsvTasksFile(File):
 
     logger = AppLogger("csv_tasks_file").get_logger()
+    columnar_file = ColumnarTasksFile
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, file_format: str = None, compression: str = None):
+        super().__init__(file_format, compression)
 
     def get_filename(self):
-        return f"tasks_{self.get_timestamp()}.csv"
+        return f"tasks_{self.get_timestamp()}{self.get_extension()}"
 
     def write_file(self, task_list: List[Task]):
         self.save(self.get_filename(), task_list,
@@ -119,12 +263,13 @@ class CsvTasksFile(File):
 class CsvTimeCardsFile(File):
 
     logger = AppLogger("csv_time_cards_file").get_logger()
+    columnar_file = ColumnarTimeCardsFile
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, file_format: str = None, compression: str = None):
+        super().__init__(file_format, compression)
 
     def get_filename(self):
-        return f"time_cards_{self.get_timestamp()}.csv"
+        return f"time_cards_{self.get_timestamp()}{self.get_extension()}"
 
     def write_file(self, time_card_list: List[TimeCard]):
         self.save(self.get_filename(), time_card_list,
@@ -148,12 +293,13 @@ class CsvTimeCardsFile(File):
                 }
 
 class CsvSnapshotsFile(File):
+    columnar_file = ColumnarSnapshotsFile
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, file_format: str = None, compression: str = None):
+        super().__init__(file_format, compression)
 
     def get_filename(self):
-        return f"snapshots_{self.get_timestamp()}.csv"
+        return f"snapshots_{self.get_timestamp()}{self.get_extension()}"
 
     def write_file(self, snapshot_list: List[Snapshot]):
         self.save(self.get_filename(), snapshot_list,
@@ -189,11 +335,32 @@ class FileManager:
         else:
             FileManager.logger.info("Cannot export empty list")
 
+    @staticmethod
+    def save_task_chunks(chunk_iter: Iterable[List[Task]], file_format: str = None, compression: str = None):
+        return FileManager.save_chunks(CsvTasksFile(file_format, compression), chunk_iter)
+
     @staticmethod
     def open_tasks(path: str) -> list:
         assert type(path) is str
         return CsvTasksFile().read_file(path)
 
+    @staticmethod
+    def open_task_chunks(path: str) -> Iterator[List[dict]]:
+        assert type(path) is str
+        return CsvTasksFile().read_chunks(path)
+
+    @staticmethod
+    def open_columnar_tasks(path: str) -> Iterator[List[Task]]:
+        assert type(path) is str
+        return ColumnarTasksFile().read_chunks(path)
+
+    @staticmethod
+    def is_columnar(path: str) -> bool:
+        assert type(path) is str
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Path {path} does not exist")
+        return ColumnarFile.is_columnar(path)
+
     @staticmethod
     def save_snapshots(snapshot_list: List[Snapshot]):
         assert type(snapshot_list) is list
@@ -206,6 +373,17 @@ class FileManager:
     def open_time_cards(path: str) -> list:
         assert type(path) is str
         return CsvTimeCardsFile().read_file(path)
+
+    @staticmethod
+    def open_time_card_chunks(path: str) -> Iterator[List[dict]]:
+        assert type(path) is str
+        return CsvTimeCardsFile().read_chunks(path)
+
+    @staticmethod
+    def open_columnar_time_cards(path: str) -> Iterator[List[TimeCard]]:
+        assert type(path) is str
+        return ColumnarTimeCardsFile().read_chunks(path)
+
     @staticmethod
     def get_time_card_columns():
         return CsvTimeCardsFile().get_field_names()
@@ -221,3 +399,21 @@ class FileManager:
             return CsvTimeCardsFile().write_file(time_card_list)
         else:
             FileManager.logger.info("Cannot export empty list")
+
+    @staticmethod
+    def save_time_card_chunks(chunk_iter: Iterable[List[TimeCard]], file_format: str = None,
+                              compression: str = None):
+        return FileManager.save_chunks(CsvTimeCardsFile(file_format, compression), chunk_iter)
+
+    @staticmethod
+    def save_chunks(file: File, chunk_iter: Iterable[list]):
+        """
+        Streams the chunks to the file. Nothing is written when the first
+        chunk is empty.
+        """
+        chunk_iter = iter(chunk_iter)
+        first_chunk = next(chunk_iter, None)
+        if first_chunk:
+            return file.write_chunks(chain([first_chunk], chunk_iter))
+        else:
+            FileManager.logger.info("Cannot export empty list")
@@ -1,8 +1,12 @@
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
 
-from taskmgr.lib.database.generic_db import QueryResult
+from taskmgr.lib.database.generic_db import ClearResult, QueryResult, GroupedResult
 from taskmgr.lib.database.snapshots_db import SnapshotsDatabase
 from taskmgr.lib.logger import AppLogger
+from taskmgr.lib.model.day import Day
 from taskmgr.lib.model.snapshot import Snapshot
 from taskmgr.lib.model.task import Task
 from taskmgr.lib.model.time_card import TimeCard
@@ -11,8 +15,39 @@ from taskmgr.lib.presenter.tasks import Tasks
 from taskmgr.lib.presenter.time_cards import TimeCards
 
 
+class RebuildProgress:
+    """Counts the partitions, tasks and snapshots processed by a rebuild."""
+
+    def __init__(self, partition_count: int = 0):
+        self.partition_count = partition_count
+        self.completed_count = 0
+        self.task_count = 0
+        self.snapshot_count = 0
+        self.__start = time.perf_counter()
+
+    def add_partition(self, task_count: int, snapshot_count: int):
+        self.completed_count += 1
+        self.task_count += task_count
+        self.snapshot_count += snapshot_count
+
+    def get_duration(self) -> float:
+        return time.perf_counter() - self.__start
+
+    def get_tasks_per_second(self) -> float:
+        duration = self.get_duration()
+        if duration > 0:
+            return self.task_count / duration
+        return 0.0
+
+    def get_summary(self) -> str:
+        return f"partitions: {self.completed_count}/{self.partition_count}, tasks: {self.task_count}, " \
+               f"snapshots: {self.snapshot_count}, duration: {self.get_duration():.3f}s, " \
+               f"tasks/sec: {self.get_tasks_per_second():.0f}"
+
+
 class Snapshots:
     logger = AppLogger("snapshots").get_logger()
+    counter_fields = ["task_count", "complete_count", "incomplete_count", "delete_count", "total_time"]
 
     def __init__(self, tasks: Tasks, time_cards: TimeCards, database: SnapshotsDatabase):
         assert isinstance(tasks, Tasks)
@@ -24,7 +59,8 @@ class Snapshots:
         self.__db = database
         self.__date_generator = DateTimeGenerator()
 
-    def build_snapshot(self, task_list: List[Task],
+    @staticmethod
+    def build_snapshot(task_list: List[Task],
                        time_card_list: List[TimeCard] = None) -> Snapshot:
         """
         Creates a single snapshot when all tasks have the same due_date.
@@ -46,11 +82,12 @@ class Snapshots:
                 snapshot.due_date_timestamp = task.due_date_timestamp
 
         if time_card_list is not None and len(time_card_list) > 0:
-            snapshot.actual_time = self.__time_cards.sum_total_times(time_card_list)
+            snapshot.actual_time = TimeCards.sum_total_times(time_card_list)
 
         return snapshot
 
-    def summarize_tasks(self, task_list: List[Task]) -> List[Snapshot]:
+    @staticmethod
+    def summarize_tasks(task_list: List[Task]) -> List[Snapshot]:
         """
         Creates one snapshot for each due_date. Only
         the tasks provided will be summarized and are not expected to be
@@ -64,7 +101,7 @@ class Snapshots:
             due_date_list = sorted(list(set([task.due_date for task in task_list])))
             for due_date in due_date_list:
                 filtered_list = [task for task in task_list if task.due_date == due_date]
-                snapshot = self.build_snapshot(filtered_list)
+                snapshot = Snapshots.build_snapshot(filtered_list)
                 snapshot_list.append(snapshot)
 
         return snapshot_list
@@ -75,39 +112,246 @@ class Snapshots:
         to fetch all tasks for each day. Only one task is needed from
         each due_date because other tasks may already exist.
         """
+        due_date_list = list(set([task.due_date for task in task_list]))
+        return self.build_snapshots(due_date_list)
+
+    def build_snapshots(self, due_date_list: List[str]) -> List[Snapshot]:
         snapshot_list = list()
-        if len(task_list) > 0:
-            snapshot_list = []
-            due_date_list = list(set([task.due_date for task in task_list]))
-            for index, due_date_string in enumerate(due_date_list, start=1):
-                task_query_result = self.__tasks.get_tasks_by_date(due_date_string)
-                time_card_query_result = self.__time_cards.get_time_cards_by_date(due_date_string)
-                snapshot = self.build_snapshot(task_query_result.to_list(),
-                                               time_card_query_result.to_list())
-                snapshot_list.append(snapshot)
+        for due_date_string in due_date_list:
+            task_query_result = self.__tasks.get_tasks_by_date(due_date_string)
+            time_card_query_result = self.__time_cards.get_time_cards_by_date(due_date_string)
+            snapshot = self.build_snapshot(task_query_result.to_list(),
+                                           time_card_query_result.to_list())
+            snapshot_list.append(snapshot)
 
         return snapshot_list
 
     def update(self, task_list: List[Task]):
         if task_list is not None:
-            snapshot_list = self.summarize_and_fill(task_list)
-            for snapshot in snapshot_list:
-                existing_snapshot = self.__db.get_object("due_date_timestamp", snapshot.due_date_timestamp)
-                if existing_snapshot is None:
-                    self.__db.append_object(snapshot)
-                else:
-                    existing_snapshot.update(snapshot)
-                    self.__db.replace_object(existing_snapshot)
+            for snapshot in self.summarize_and_fill(task_list):
+                self.save(snapshot)
 
-    def rebuild(self):
-        result = self.__tasks.get_all()
-        snapshot_list = self.summarize_and_fill(result.to_list())
-        self.__db.append_objects(snapshot_list)
+    def save(self, snapshot: Snapshot):
+        """
+        Saves a snapshot built from all the tasks of its due_date. A new
+        snapshot is created with append_if_missing, so concurrent requests
+        for the same due_date do not create duplicates. When the snapshot
+        already exists, its counters are replaced.
+        """
+        existing_snapshot = self.__db.get_object("due_date_timestamp", snapshot.due_date_timestamp)
+        if existing_snapshot is None:
+            existing_snapshot = self.__db.append_if_missing(snapshot)
+        if existing_snapshot is not None:
+            existing_snapshot.update(snapshot)
+            self.__db.replace_object(existing_snapshot)
+
+    @staticmethod
+    def get_task_counters(task: Task, sign: int = 1) -> dict:
+        """
+        Returns the counters a single task adds to the snapshot of its due_date.
+        """
+        return {"task_count": sign,
+                "complete_count": sign if task.completed else 0,
+                "incomplete_count": 0 if task.completed else sign,
+                "delete_count": sign if task.deleted else 0,
+                "total_time": sign * float(task.time_spent)}
+
+    @staticmethod
+    def get_deltas(change_list: List[Tuple[Optional[Task], Optional[Task]]]) -> Dict[int, dict]:
+        """
+        Sums the counter changes for each due_date using the state of each task
+        before and after the change. A new task has no state before the change.
+        Due dates where the changes cancel out are left out.
+        """
+        delta_dict = dict()
+        for before_task, after_task in change_list:
+            for task, sign in [(before_task, -1), (after_task, 1)]:
+                if task is not None:
+                    delta = delta_dict.setdefault(task.due_date_timestamp,
+                                                  {"due_date": task.due_date, "total_time": 0.0,
+                                                   "task_count": 0, "complete_count": 0,
+                                                   "incomplete_count": 0, "delete_count": 0})
+                    for field, value in Snapshots.get_task_counters(task, sign).items():
+                        delta[field] += value
+
+        for delta in delta_dict.values():
+            delta["total_time"] = round(delta["total_time"], 6)
+
+        return {timestamp: delta for timestamp, delta in delta_dict.items()
+                if any(delta[field] for field in Snapshots.counter_fields)}
+
+    def apply_task_changes(self, change_list: List[Tuple[Optional[Task], Optional[Task]]]):
+        """
+        Updates the snapshot counters with HINCRBY and HINCRBYFLOAT using the
+        state of each task before and after the change, so the other tasks of
+        the day are not read again. A due_date without a snapshot is built from
+        all its tasks and time cards. Drift is repaired by reconcile, which
+        runs from the count reconcile command and the api background job.
+        """
+        increment_list = list()
+        missing_date_list = list()
+        for timestamp, delta in self.get_deltas(change_list).items():
+            snapshot = self.__db.get_object("due_date_timestamp", timestamp)
+            if snapshot is None:
+                missing_date_list.append(delta["due_date"])
+            else:
+                increment_list.append((snapshot, {field: delta[field] for field in self.counter_fields
+                                                  if delta[field]}))
+
+        self.__db.increment_objects(increment_list)
+        for snapshot in self.build_snapshots(missing_date_list):
+            if snapshot.task_count > 0:
+                self.save(snapshot)
+
+    @staticmethod
+    def summarize_groups(result: GroupedResult, time_card_list: List[TimeCard]) -> Dict[int, Snapshot]:
+        """
+        Creates the expected snapshot of every due_date from tasks grouped by
+        due_date and the time cards, keyed by due_date_timestamp.
+        """
+        time_card_dict = dict()
+        for time_card in time_card_list:
+            time_card_dict.setdefault(time_card.date, []).append(time_card)
+
+        snapshot_dict = dict()
+        for due_date, task_list in result.get_groups():
+            snapshot = Snapshots.build_snapshot(task_list, time_card_dict.get(due_date))
+            snapshot_dict[snapshot.due_date_timestamp] = snapshot
+        return snapshot_dict
+
+    @staticmethod
+    def get_drifted(expected_dict: Dict[int, Snapshot],
+                    existing_list: List[Snapshot]) -> Tuple[List[Tuple[Snapshot, dict]], List[Snapshot]]:
+        """
+        Compares the stored snapshots with the expected ones. Drifted counters
+        are returned as the difference to add, so HINCRBY calls made by
+        apply_task_changes after the snapshots were read are kept.
+        :return: tuple of increments for the stored snapshots and snapshots to append
+        """
+        increment_list = list()
+        found_set = set()
+        for existing_snapshot in existing_list:
+            expected_snapshot = expected_dict.get(existing_snapshot.due_date_timestamp, Snapshot())
+            found_set.add(existing_snapshot.due_date_timestamp)
+
+            field_dict = dict()
+            for field in Snapshots.counter_fields:
+                difference = getattr(expected_snapshot, field) - getattr(existing_snapshot, field)
+                if isinstance(difference, float):
+                    difference = round(difference, 6)
+                if difference:
+                    field_dict[field] = difference
+            if expected_snapshot.actual_time and expected_snapshot.actual_time != existing_snapshot.actual_time:
+                field_dict["actual_time"] = expected_snapshot.actual_time
+            if field_dict:
+                increment_list.append((existing_snapshot, field_dict))
+
+        append_list = [snapshot for timestamp, snapshot in expected_dict.items() if timestamp not in found_set]
+        return increment_list, append_list
+
+    def reconcile_if_due(self) -> int:
+        """
+        Reconciles the snapshots when snapshot_reconcile_interval has passed
+        since the last reconciliation by any process.
+        :return: number of snapshots saved
+        """
+        if self.__db.claim_reconcile():
+            return self.reconcile()
+        return 0
+
+    def reconcile(self) -> int:
+        """
+        Recomputes every snapshot from the tasks and time cards and adds the
+        drift to the stored counters. Missing snapshots are created with
+        append_if_missing, so one created meanwhile by a request is kept.
+        :return: number of snapshots saved
+        """
+        expected_dict = self.summarize_groups(self.__tasks.group_by("due_date"),
+                                              self.__time_cards.get_all().to_list())
+        self.__db.set_page_number(0)
+        increment_list, append_list = self.get_drifted(expected_dict, self.__db.get_all().to_list())
+
+        self.__db.increment_objects(increment_list)
+        added_count = 0
+        for snapshot in append_list:
+            if self.__db.append_if_missing(snapshot) is None:
+                added_count += 1
+
+        self.logger.info(f"Reconciled snapshots: corrected {len(increment_list)}, added {added_count}")
+        return len(increment_list) + added_count
+
+    @staticmethod
+    def get_partitions(min_timestamp: int, max_timestamp: int, partition_days: int) -> List[Tuple[int, int]]:
+        """
+        Splits the dates between the two due_date timestamps into ranges of
+        partition_days days.
+        :return: list of tuples with the first and last due_date timestamp of each range
+        """
+        partition_list = list()
+        first_date = datetime.fromtimestamp(min_timestamp)
+        last_date = datetime.fromtimestamp(max_timestamp)
+        while first_date <= last_date:
+            end_date = min(first_date + timedelta(days=partition_days - 1), last_date)
+            partition_list.append((Day(first_date).to_date_timestamp(), Day(end_date).to_date_timestamp()))
+            first_date = end_date + timedelta(days=1)
+        return partition_list
+
+    def rebuild_partition(self, partition: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Counts the tasks in one date range with a single pass and saves the
+        snapshots using the chunked pipeline of append_objects.
+        :return: tuple of the number of tasks read and snapshots saved
+        """
+        min_timestamp, max_timestamp = partition
+        task_list = self.__tasks.get_tasks_between(min_timestamp, max_timestamp)
+        time_card_list = self.__time_cards.get_time_cards_between(min_timestamp, max_timestamp)
+        snapshot_dict = self.summarize_groups(GroupedResult("due_date", task_list), time_card_list)
+        if snapshot_dict:
+            self.__db.append_objects(list(snapshot_dict.values()))
+        return len(task_list), len(snapshot_dict)
+
+    def rebuild(self, workers: int = None,
+                on_progress: Callable[[RebuildProgress], None] = None) -> RebuildProgress:
+        """
+        Replaces all snapshots using the stored tasks and time cards. The due
+        dates are split into partitions of rebuild_partition_days, so only one
+        partition per worker is held in memory, and the partitions are counted
+        by a pool of rebuild_workers threads.
+        :param workers: number of threads, defaults to rebuild_workers
+        :param on_progress: called with the progress after each partition
+        :return: RebuildProgress with the totals and duration
+        """
+        common_vars = self.__db.vars
+        if workers is None:
+            workers = common_vars.rebuild_workers
+
+        self.__db.clear()
+        span = self.__tasks.get_date_span()
+        if span is None:
+            return RebuildProgress()
+
+        partition_list = self.get_partitions(span[0], span[1], common_vars.rebuild_partition_days)
+        progress = RebuildProgress(len(partition_list))
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for task_count, snapshot_count in executor.map(self.rebuild_partition, partition_list):
+                progress.add_partition(task_count, snapshot_count)
+                if on_progress is not None:
+                    on_progress(progress)
+
+        self.logger.info(f"Rebuilt snapshots: {progress.get_summary()}")
+        return progress
 
     def get_all(self, page: int = 0) -> QueryResult:
         self.__db.set_page_number(page)
         return self.__db.get_all()
 
+    def get_all_by_cursor(self, cursor: str = None) -> QueryResult:
+        """
+        Gets the page at the cursor, newest first.
+        :param cursor: next_cursor or prev_cursor of a page, None for the first page
+        """
+        return self.__db.get_cursor_page(cursor)
+
     def get_by_due_date_range(self, min_date: str, max_date: str, page: int = 0) -> QueryResult:
         assert type(min_date) is str
         assert type(max_date) is str
@@ -125,14 +369,8 @@ class Snapshots:
             return QueryResult()
 
     def get_by_due_date(self, date_expression: str) -> QueryResult:
-        snapshot_list = list()
         days = self.__date_generator.get_days(date_expression)
-        for day in days:
-            snapshot = self.__db.get_object("due_date_timestamp", day.to_date_timestamp())
-            if snapshot is not None:
-                snapshot_list.append(snapshot)
-
-        return QueryResult(snapshot_list)
+        return self.__db.get_by_days(days)
 
-    def clear(self):
-        self.__db.clear()
\ No newline at end of file
+    def clear(self, drop_index: bool = False, on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
+        return self.__db.clear(drop_index, on_progress)
\ No newline at end of file
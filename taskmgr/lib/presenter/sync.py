@@ -1,3 +1,4 @@
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 
@@ -14,6 +15,23 @@ class SyncResultsList:
         self.__deleted_count = 0
         self.__updated_count = 0
         self.__skipped_count = 0
+        self.__start = time.perf_counter()
+        self.__duration = None
+
+    def stop(self):
+        """Records the duration of the import."""
+        self.__duration = time.perf_counter() - self.__start
+
+    def get_duration(self) -> float:
+        if self.__duration is None:
+            return time.perf_counter() - self.__start
+        return self.__duration
+
+    def get_rows_per_second(self) -> float:
+        duration = self.get_duration()
+        if duration > 0:
+            return len(self.__sync_results) / duration
+        return 0.0
 
     def get_list(self):
         return self.__sync_results
@@ -32,9 +50,13 @@ class SyncResultsList:
 
         self.__sync_results.append(sync_action)
 
+    def extend(self, sync_results):
+        for sync_action in sync_results.get_list():
+            self.append(sync_action)
+
     def get_summary(self):
         return f"added: {self.__added_count}, deleted: {self.__deleted_count}, updated: {self.__updated_count}, " \
-               f"skipped: {self.__skipped_count} "
+               f"skipped: {self.__skipped_count}, rows/sec: {self.get_rows_per_second():.0f}"
 
 
 class Rules:
@@ -34,45 +34,57 @@ class TaskImporter:
 
     def import_objects(self, remote_obj_list, bulk_save: bool = False) -> SyncResultsList:
         """
-        Manage task import from csv file
+        Manage task import from csv file. The local tasks are fetched up front
+        with batched queries, so each row is compared against a dict instead
+        of running one query per row.
         :param remote_obj_list: Tasks contained in file
         :param bulk_save: Save all changes after sorting each Task object
         :return ImportResultsList:
         """
         assert type(remote_obj_list) is list
         sync_results = SyncResultsList()
-        object_list = list()
+        insert_list = list()
+        replace_list = list()
+
+        local_task_dict = self.__tasks.get_tasks_by_ids([task.unique_id for task in remote_obj_list])
+        TaskImporter.logger.debug(f"Found {len(local_task_dict)} existing tasks")
 
         for remote_task in remote_obj_list:
             assert type(remote_task) is Task
 
-            local_task = self.__tasks.get_task_by_id(remote_task.unique_id)
+            local_task = local_task_dict.get(remote_task.unique_id)
             action = ImportActions(local_task, remote_task)
 
             if action.can_delete():
                 TaskImporter.logger.debug("deleting task")
-                object_list.append(self.__tasks.delete(local_task, not bulk_save))
+                replace_list.append(self.__tasks.delete(local_task, not bulk_save))
                 sync_results.append(SyncAction.DELETED)
 
             elif action.can_update():
                 TaskImporter.logger.debug("updating task")
-                object_list.append(self.__tasks.replace(local_task, remote_task, not bulk_save))
+                replaced_task = self.__tasks.replace(local_task, remote_task, not bulk_save)
+                local_task_dict[replaced_task.unique_id] = replaced_task
+                replace_list.append(replaced_task)
                 sync_results.append(SyncAction.UPDATED)
 
             elif action.can_insert():
                 TaskImporter.logger.debug("inserting task")
-                object_list.append(self.__tasks.insert(remote_task, not bulk_save))
+                insert_list.append(self.__tasks.insert(remote_task, not bulk_save))
                 sync_results.append(SyncAction.ADDED)
 
             else:
                 sync_results.append(SyncAction.SKIPPED)
                 TaskImporter.logger.debug(f"Skipping local task {remote_task.name}")
 
-        if object_list and bulk_save is True:
-            TaskImporter.logger.info(f"Saving all {len(object_list)} tasks to database")
-            self.__tasks.update_all(object_list)
-
+        if bulk_save is True:
+            if replace_list:
+                TaskImporter.logger.info(f"Replacing {len(replace_list)} tasks in database")
+                bulk_result = self.__tasks.replace_all(replace_list)
+                TaskImporter.logger.info(f"Bulk replace summary: {bulk_result.get_summary()}")
+            if insert_list:
+                TaskImporter.logger.info(f"Saving {len(insert_list)} new tasks to database")
+                bulk_result = self.__tasks.update_all(insert_list)
+                TaskImporter.logger.info(f"Bulk save summary: {bulk_result.get_summary()}")
+
+        sync_results.stop()
         return sync_results
-
-
-
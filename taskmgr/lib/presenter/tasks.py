@@ -1,7 +1,8 @@
 from copy import deepcopy
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-from taskmgr.lib.database.generic_db import QueryResult
+from taskmgr.lib.database.generic_db import ClearResult, QueryResult, GroupedResult, BulkResult
+from taskmgr.lib.database.query_builder import QueryBuilder
 from taskmgr.lib.database.tasks_db import TasksDatabase
 from taskmgr.lib.logger import AppLogger
 from taskmgr.lib.model.calendar import Calendar, Today
@@ -43,8 +44,9 @@ class Tasks:
             raise DueDateError(f"Provided due date {date_expression} is empty")
 
         task_list = list()
-        if self.__date_generator.validate_input(date_expression):
-            for day in self.__date_generator.get_days(date_expression):
+        parsed_date = self.__date_generator.parse(date_expression)
+        if parsed_date is not None:
+            for day in parsed_date.day_list:
                 task = Task(name)
                 task.label = label
                 task.project = project
@@ -62,6 +64,13 @@ class Tasks:
         self.__db.set_page_number(page)
         return self.__db.get_all()
 
+    def get_all_by_cursor(self, cursor: str = None) -> QueryResult:
+        """
+        Gets the page at the cursor, newest first.
+        :param cursor: next_cursor or prev_cursor of a page, None for the first page
+        """
+        return self.__db.get_cursor_page(cursor)
+
     def get_tasks_containing_name(self, value: str, page: int = 0) -> QueryResult:
         assert type(value) is str
         self.__db.set_page_number(page)
@@ -81,12 +90,8 @@ class Tasks:
 
     def get_tasks_by_date(self, date_expression: str) -> QueryResult:
         assert type(date_expression) is str
-        result = QueryResult()
         days = self.__date_generator.get_days(date_expression)
-        for day in days:
-            selection = self.__db.get_selected("due_date_timestamp", day.to_date_timestamp())
-            result.extend(selection.to_list())
-        return result
+        return self.__db.get_by_days(days)
 
     def get_tasks_within_date_range(self, min_date: str, max_date: str, page: int) -> QueryResult:
         assert type(min_date) is str
@@ -100,6 +105,18 @@ class Tasks:
                                       min_day.to_date_timestamp(),
                                       max_day.to_date_timestamp())
 
+    def get_date_span(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns the lowest and highest due_date_timestamp, or None when there
+        are no tasks.
+        """
+        return self.__db.get_span()
+
+    def get_tasks_between(self, min_timestamp: int, max_timestamp: int) -> List[Task]:
+        assert type(min_timestamp) is int
+        assert type(max_timestamp) is int
+        return self.__db.get_between(min_timestamp, max_timestamp)
+
     def get_tasks_by_status(self, is_completed: bool, page: int) -> QueryResult:
         assert type(is_completed) is bool
         self.__db.set_page_number(page)
@@ -118,10 +135,58 @@ class Tasks:
         self.__db.set_page_number(page)
         return self.__db.get_selected("label", label)
 
+    @staticmethod
+    def create_filter(date_generator: DateTimeGenerator, project: str = None, label: str = None,
+                      is_completed: bool = None, name: str = None, min_date: str = None,
+                      max_date: str = None) -> QueryBuilder:
+        """
+        Combines the provided conditions into one query. Conditions that are
+        None are left out, a single date bound leaves the range open.
+        :raises DueDateError: when a date expression is not a single date
+        """
+        builder = QueryBuilder()
+        if project is not None:
+            builder.equals("project", project)
+        if label is not None:
+            builder.equals("label", label)
+        if is_completed is not None:
+            builder.equals("completed", str(is_completed))
+        if name is not None:
+            builder.matches(name.lower(), "name")
+
+        timestamp_list = list()
+        for date_expression in [min_date, max_date]:
+            if date_expression is None:
+                timestamp_list.append(None)
+                continue
+            parsed_date = date_generator.parse(date_expression, single_date=True)
+            if parsed_date is None:
+                raise DueDateError(f"Provided due date {date_expression} is invalid")
+            timestamp_list.append(parsed_date.day_list[0].to_date_timestamp())
+
+        if timestamp_list != [None, None]:
+            builder.between("due_date_timestamp", *timestamp_list)
+        return builder
+
+    def get_filtered(self, project: str = None, label: str = None, is_completed: bool = None,
+                     name: str = None, min_date: str = None, max_date: str = None,
+                     page: int = 0) -> QueryResult:
+        """
+        Gets the tasks that match every provided condition with one query.
+        :raises DueDateError: when a date expression is not a single date
+        :raises InvalidQuery: when a value has no searchable terms
+        """
+        builder = self.create_filter(self.__date_generator, project, label, is_completed, name, min_date, max_date)
+        self.__db.set_page_number(page)
+        return self.__db.get_selected(builder)
+
     def get_undeleted_tasks(self, page: int = 0) -> QueryResult:
         self.__db.set_page_number(page)
         return self.__db.get_selected("deleted", "False")
 
+    def get_undeleted_tasks_by_cursor(self, cursor: str = None) -> QueryResult:
+        return self.__db.get_cursor_page(cursor, "deleted", "False")
+
     def delete(self, task: Task, save: bool = True) -> Optional[Task]:
         """
         Changes the deleted state to True
@@ -192,9 +257,26 @@ class Tasks:
             return self.__db.append_object(task)
         return task
 
-    def update_all(self, task_list: List[Task]) -> List[Task]:
+    def update_all(self, task_list: List[Task]) -> BulkResult:
         return self.__db.append_objects(task_list)
 
+    def replace_all(self, task_list: List[Task]) -> BulkResult:
+        return self.__db.replace_objects(task_list)
+
+    def iter_chunks(self) -> Iterator[List[Task]]:
+        """
+        Yields all the tasks in index order, one chunk of bulk_chunk_size
+        indexes at a time.
+        """
+        return self.__db.iter_chunks()
+
+    def get_tasks_by_ids(self, task_id_list: List[str]) -> Dict[str, Task]:
+        """
+        Gets the stored tasks for all the unique ids using batched queries.
+        :return: dict of tasks keyed by unique_id
+        """
+        return self.__db.get_by_values("unique_id", task_id_list)
+
     def edit(self, index: int,
              name: str = None,
              label: str = None,
@@ -211,8 +293,9 @@ class Tasks:
             new_task.time_spent = time_spent
 
             if date_expression is not None:
-                if self.__date_generator.validate_input(date_expression):
-                    day = self.__date_generator.get_day(date_expression)
+                parsed_date = self.__date_generator.parse(date_expression, single_date=True)
+                if parsed_date is not None:
+                    day = parsed_date.day_list[0]
                     new_task.due_date = day.to_date_string()
                     new_task.due_date_timestamp = day.to_date_timestamp()
                 else:
@@ -246,5 +329,14 @@ class Tasks:
     def get_due_date_list(self) -> List[str]:
         return sorted(self.__db.unique("due_date"))
 
-    def clear(self):
-        self.__db.clear()
+    def group_by(self, key: str, page: int = 0) -> GroupedResult:
+        """
+        Groups the tasks by project, label or due_date on the server and
+        includes the number of tasks in each group. Page 0 returns every task.
+        """
+        assert key in ["project", "label", "due_date"]
+        self.__db.set_page_number(page)
+        return self.__db.get_grouped(key)
+
+    def clear(self, drop_index: bool = False, on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
+        return self.__db.clear(drop_index, on_progress)
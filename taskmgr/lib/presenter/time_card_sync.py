@@ -15,7 +15,13 @@ class TimeCardImporter:
         self.__date_generator = DateTimeGenerator()
 
     def convert(self, obj_list: list) -> List[TimeCard]:
+        """
+        Creates time cards from the csv rows. Exports repeat the same dates
+        and times on many rows, so each distinct string is only parsed once.
+        """
         time_card_list = list()
+        day_cache = dict()
+        time_cache = dict()
 
         for obj_dict in obj_list:
 
@@ -35,9 +41,10 @@ class TimeCardImporter:
                     added_time_out = value
 
                 elif key == "date":
-                    day = self.__date_generator.get_day(value)
-                    time_card.date = day.to_date_string()
-                    time_card.date_timestamp = day.to_date_timestamp()
+                    if value not in day_cache:
+                        day = self.__date_generator.get_day(value)
+                        day_cache[value] = (day.to_date_string(), day.to_date_timestamp())
+                    time_card.date, time_card.date_timestamp = day_cache[value]
 
                 else:
                     setattr(time_card, key, value)
@@ -46,8 +53,11 @@ class TimeCardImporter:
                 time_card.unique_id = uuid.uuid4().hex
 
             if added_time_in is not None and added_time_out is not None:
-                time_in_obj = self.__date_generator.get_time(added_time_in)
-                time_out_obj = self.__date_generator.get_time(added_time_out)
+                for time_string in [added_time_in, added_time_out]:
+                    if time_string not in time_cache:
+                        time_cache[time_string] = self.__date_generator.get_time(time_string)
+                time_in_obj = time_cache[added_time_in]
+                time_out_obj = time_cache[added_time_out]
 
                 time_card.time_in = time_in_obj.to_text()
                 time_card.time_out = time_out_obj.to_text()
@@ -55,45 +65,62 @@ class TimeCardImporter:
                 time_card.elapsed_time = self.__time_cards.get_duration(time_in_obj, time_out_obj)
 
             time_card_list.append(time_card)
-            
+
         return time_card_list
 
-    def import_objects(self, remote_obj_list) -> SyncResultsList:
+    def import_objects(self, remote_obj_list, bulk_save: bool = False) -> SyncResultsList:
         """
-        Manage time card import from csv file
+        Manage time card import from csv file. The local time cards are fetched
+        up front with batched queries, so each row is compared against a dict
+        instead of running one query per row.
         :param remote_obj_list: TimeCards contained in file
+        :param bulk_save: Save all changes after sorting each TimeCard object
         :return SyncResultsList:
         """
         assert type(remote_obj_list) is list
         sync_results = SyncResultsList()
-        object_list = list()
+        insert_list = list()
+        replace_list = list()
+
+        local_object_dict = self.__time_cards.get_time_cards_by_ids([obj.unique_id for obj in remote_obj_list])
+        self.logger.debug(f"Found {len(local_object_dict)} existing time cards")
 
         for remote_object in remote_obj_list:
             assert type(remote_object) is TimeCard
 
-            local_object = self.__time_cards.get_time_card_by_id(remote_object.unique_id)
+            local_object = local_object_dict.get(remote_object.unique_id)
             action = ImportActions(local_object, remote_object)
 
             if action.can_delete():
                 self.logger.debug("deleting time card")
-                object_list.append(self.__time_cards.delete(local_object))
+                replace_list.append(self.__time_cards.delete(local_object, not bulk_save))
                 sync_results.append(SyncAction.DELETED)
 
             elif action.can_update():
                 self.logger.debug("updating time card")
-                object_list.append(self.__time_cards.replace(local_object, remote_object))
+                replaced_object = self.__time_cards.replace(local_object, remote_object, not bulk_save)
+                local_object_dict[replaced_object.unique_id] = replaced_object
+                replace_list.append(replaced_object)
                 sync_results.append(SyncAction.UPDATED)
 
             elif action.can_insert():
                 self.logger.debug("inserting time card")
-                object_list.append(self.__time_cards.insert(remote_object))
+                insert_list.append(self.__time_cards.insert(remote_object, not bulk_save))
                 sync_results.append(SyncAction.ADDED)
 
             else:
                 sync_results.append(SyncAction.SKIPPED)
-                self.logger.debug(f"Skipping local time card {remote_object.name}")
-
+                self.logger.debug(f"Skipping local time card {remote_object.unique_id}")
+
+        if bulk_save is True:
+            if replace_list:
+                self.logger.info(f"Replacing {len(replace_list)} time cards in database")
+                bulk_result = self.__time_cards.replace_all(replace_list)
+                self.logger.info(f"Bulk replace summary: {bulk_result.get_summary()}")
+            if insert_list:
+                self.logger.info(f"Saving {len(insert_list)} new time cards to database")
+                bulk_result = self.__time_cards.update_all(insert_list)
+                self.logger.info(f"Bulk save summary: {bulk_result.get_summary()}")
+
+        sync_results.stop()
         return sync_results
-
-
-
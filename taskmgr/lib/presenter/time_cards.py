@@ -1,8 +1,8 @@
 from copy import deepcopy
 from datetime import timedelta
-from typing import Tuple, Optional, List
+from typing import Callable, Dict, Iterator, Tuple, Optional, List
 
-from taskmgr.lib.database.generic_db import QueryResult
+from taskmgr.lib.database.generic_db import ClearResult, QueryResult, BulkResult
 from taskmgr.lib.database.time_cards_db import TimeCardsDatabase
 from taskmgr.lib.logger import AppLogger
 from taskmgr.lib.model.calendar import Calendar
@@ -45,6 +45,13 @@ class TimeCards:
         self.__db.set_page_number(page)
         return self.__db.get_all()
 
+    def get_all_by_cursor(self, cursor: str = None) -> QueryResult:
+        """
+        Gets the page at the cursor, newest first.
+        :param cursor: next_cursor or prev_cursor of a page, None for the first page
+        """
+        return self.__db.get_cursor_page(cursor)
+
     def get_time_card_by_id(self, time_card_id: str) -> TimeCard:
         assert type(time_card_id) is str
         return self.__db.get_object("unique_id", time_card_id)
@@ -52,11 +59,8 @@ class TimeCards:
     def get_time_cards_by_date(self, date_expression: str,
                                add_total: bool = False) -> QueryResult:
         assert type(date_expression) is str
-        result = QueryResult()
         days = self.__date_generator.get_days(date_expression)
-        for day in days:
-            selection = self.__db.get_selected("date_timestamp", day.to_date_timestamp())
-            result.extend(selection.to_list())
+        result = self.__db.get_by_days(days)
 
         if add_total and result.has_data():
             time_card_list = result.to_list()
@@ -77,13 +81,18 @@ class TimeCards:
                                       min_day.to_date_timestamp(),
                                       max_day.to_date_timestamp())
 
+    def get_time_cards_between(self, min_timestamp: int, max_timestamp: int) -> List[TimeCard]:
+        assert type(min_timestamp) is int
+        assert type(max_timestamp) is int
+        return self.__db.get_between(min_timestamp, max_timestamp)
+
     def add(self, time_in: str, time_out: str, date_expression: str) -> TimeCard:
 
         if not date_expression:
             raise DueDateError(f"Provided date {date_expression} is empty")
 
-        if self.__date_generator.validate_input(date_expression,
-                                                single_date=True):
+        parsed_date = self.__date_generator.parse(date_expression, single_date=True)
+        if parsed_date is not None:
             time_card = TimeCard()
             time_in_obj = self.__date_generator.get_time(time_in)
             time_card.time_in = time_in_obj.to_text()
@@ -91,7 +100,7 @@ class TimeCards:
             time_out_obj = self.__date_generator.get_time(time_out)
             time_card.time_out = time_out_obj.to_text()
 
-            date = self.__date_generator.get_day(date_expression)
+            date = parsed_date.day_list[0]
             time_card.date = date.to_date_string()
             time_card.date_timestamp = date.to_date_timestamp()
 
@@ -147,13 +156,32 @@ class TimeCards:
             self.logger.debug(f"Replaced local_time_card: {dict(local_time_card)} with remote_time_card: {dict(remote_time_card)}")
         return remote_time_card
 
-    def insert(self, time_card: TimeCard) -> TimeCard:
+    def insert(self, time_card: TimeCard, save: bool = True) -> TimeCard:
         assert isinstance(time_card, TimeCard)
-        return self.__db.append_object(time_card)
+        if save:
+            return self.__db.append_object(time_card)
+        return time_card
 
-    def update_all(self, time_card_list: List[TimeCard]) -> List[TimeCard]:
+    def update_all(self, time_card_list: List[TimeCard]) -> BulkResult:
         return self.__db.append_objects(time_card_list)
 
+    def replace_all(self, time_card_list: List[TimeCard]) -> BulkResult:
+        return self.__db.replace_objects(time_card_list)
+
+    def iter_chunks(self) -> Iterator[List[TimeCard]]:
+        """
+        Yields all the time cards in index order, one chunk of bulk_chunk_size
+        indexes at a time.
+        """
+        return self.__db.iter_chunks()
+
+    def get_time_cards_by_ids(self, time_card_id_list: List[str]) -> Dict[str, TimeCard]:
+        """
+        Gets the stored time cards for all the unique ids using batched queries.
+        :return: dict of time cards keyed by unique_id
+        """
+        return self.__db.get_by_values("unique_id", time_card_id_list)
+
     def edit(self, index: int,
              time_in: str = None,
              time_out: str = None,
@@ -183,8 +211,9 @@ class TimeCards:
             new_time_card.elapsed_time = self.get_duration(time_in_obj, time_out_obj)
 
             if date_expression is not None:
-                if self.__date_generator.validate_input(date_expression):
-                    day = self.__date_generator.get_day(date_expression)
+                parsed_date = self.__date_generator.parse(date_expression, single_date=True)
+                if parsed_date is not None:
+                    day = parsed_date.day_list[0]
                     new_time_card.date = day.to_date_string()
                     new_time_card.date_timestamp = day.to_date_timestamp()
                 else:
@@ -194,7 +223,8 @@ class TimeCards:
         else:
             raise TimeCardKeyError()
 
-    def sum_total_times(self, time_cards: List[TimeCard]) -> str:
+    @staticmethod
+    def sum_total_times(time_cards: List[TimeCard]) -> str:
         """
         Adds list of time in format hh:mm
         """
@@ -204,7 +234,7 @@ class TimeCards:
             time_list.append(timedelta(hours=int(hours), minutes=int(minutes)))
 
         delta = sum(time_list, start=timedelta())
-        return self.to_time_string(delta.seconds)
+        return TimeCards.to_time_string(delta.seconds)
 
     @staticmethod
     def to_time_string(total_seconds: int):
@@ -222,5 +252,5 @@ class TimeCards:
         total_seconds = (end.to_datetime() - start.to_datetime()).total_seconds()
         return self.to_time_string(total_seconds)
 
-    def clear(self):
-        self.__db.clear()
\ No newline at end of file
+    def clear(self, drop_index: bool = False, on_progress: Callable[[ClearResult], None] = None) -> ClearResult:
+        return self.__db.clear(drop_index, on_progress)
\ No newline at end of file
@@ -1,11 +1,120 @@
 import os
 import re
+import threading
+import time
 from configparser import RawConfigParser, NoSectionError, NoOptionError
 from pathlib import Path
 
 
+class CachedFile:
+
+    def __init__(self, signature: tuple, parser: RawConfigParser):
+        self.signature = signature
+        self.parser = parser
+        self.values = dict()
+        self.checked = time.monotonic()
+
+
+class ConfigCache:
+    """
+    Process wide cache of the parsed ini files. A file is parsed again only when
+    its mtime or size changes, and the typed values are memoised until then. The
+    file is stat'ed at most once per check_interval seconds; writes made through
+    CommonVariables invalidate the entry immediately.
+    """
+    check_interval = 1.0
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.__entries = dict()
+        self.stat_count = 0
+        self.parse_count = 0
+
+    def contains(self, path: str) -> bool:
+        return path in self.__entries
+
+    def invalidate(self, path: str):
+        with self.lock:
+            self.__entries.pop(path, None)
+
+    def get_value(self, path: str, defaults: dict, section: str, key: str, kind: str = "str"):
+        with self.lock:
+            entry = self.__load(path, defaults)
+            memo_key = (section, key, kind)
+            if memo_key not in entry.values:
+                if section != "DEFAULT" and not entry.parser.has_section(section):
+                    # A file without the section holds only the defaults
+                    section = "DEFAULT"
+                if kind == "int":
+                    entry.values[memo_key] = entry.parser.getint(section, key)
+                elif kind == "boolean":
+                    entry.values[memo_key] = entry.parser.getboolean(section, key)
+                else:
+                    entry.values[memo_key] = entry.parser.get(section, key)
+            return entry.values[memo_key]
+
+    def __load(self, path: str, defaults: dict) -> CachedFile:
+        entry = self.__entries.get(path)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked < self.check_interval:
+            return entry
+
+        stat = os.stat(path)
+        self.stat_count += 1
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if entry is None or entry.signature != signature:
+            parser = RawConfigParser()
+            parser.read_dict({'DEFAULT': defaults})
+            with open(path, 'r') as configfile:
+                parser.read_file(configfile)
+            self.parse_count += 1
+            entry = CachedFile(signature, parser)
+            self.__entries[path] = entry
+
+        entry.checked = now
+        return entry
+
+
 class CommonVariables:
 
+    durability_modes = ["none", "bgsave", "sync"]
+    export_formats = ["csv", "jsonl", "columnar"]
+    export_compressions = ["none", "gzip", "zstd"]
+    cache = ConfigCache()
+    invalid_durability_set = set()
+    default_values = {'recurring_month_limit': 2,
+                      'default_name_field_length': 50,
+                      'date_format': '%Y-%m-%d',
+                      'date_time_format': '%Y-%m-%d %H:%M:%S',
+                      'time_format': '%H:%M:%S',
+                      'rfc3339_date_time_format': '%Y-%m-%dT%H:%M:%S.%fZ',
+                      'file_name_timestamp': '%Y%m%d_%H%M%S',
+                      'default_project_name': '',
+                      'default_label': '',
+                      'default_name': '',
+                      'redis_host': 'localhost',
+                      'redis_port': 6379,
+                      'redis_username': 'Unset',
+                      'redis_password': 'Unset',
+                      'redis_max_connections': 50,
+                      'redis_pool_timeout': 20,
+                      'redis_socket_timeout': 5,
+                      'redis_socket_keepalive': True,
+                      'export_dir': '',
+                      'export_format': 'csv',
+                      'export_compression': 'none',
+                      'max_rows': 10,
+                      'durability': 'bgsave',
+                      'bgsave_interval': 60,
+                      'bulk_chunk_size': 500,
+                      'health_check_ttl': 30,
+                      'reconnect_attempts': 3,
+                      'snapshot_reconcile_interval': 3600,
+                      'rebuild_partition_days': 31,
+                      'rebuild_workers': 4,
+                      'index_build_timeout': 300,
+                      'scan_count': 1000}
+
     def __init__(self, ini_file_name=None):
         self.task_section = "task"
         self.database_section = "database"
@@ -16,24 +125,10 @@ class CommonVariables:
         else:
             self.ini_file = ini_file_name
 
-        self.cfg = RawConfigParser()
-        self.cfg['DEFAULT'] = {'recurring_month_limit': 2,
-                               'default_name_field_length': 50,
-                               'date_format': '%Y-%m-%d',
-                               'date_time_format': '%Y-%m-%d %H:%M:%S',
-                               'time_format': '%H:%M:%S',
-                               'rfc3339_date_time_format': '%Y-%m-%dT%H:%M:%S.%fZ',
-                               'file_name_timestamp': '%Y%m%d_%H%M%S',
-                               'default_project_name': '',
-                               'default_label': '',
-                               'default_name': '',
-                               'redis_host': 'localhost',
-                               'redis_port': 6379,
-                               'redis_username': 'Unset',
-                               'redis_password': 'Unset',
-                               'export_dir': '',
-                               'max_rows': 10}
-        self.create_file()
+        self.__cfg = None
+        self.__file_path = f"{self.resources_dir}/{self.ini_file}"
+        if not self.cache.contains(self.__get_file_path()):
+            self.create_file()
 
     def create_file(self):
         if not Path(self.__get_file_path()).exists():
@@ -41,30 +136,40 @@ class CommonVariables:
             self.__save()
 
     def __get_file_path(self):
-        return f"{self.resources_dir}/{self.ini_file}"
+        return self.__file_path
+
+    @property
+    def cfg(self) -> RawConfigParser:
+        if self.__cfg is None:
+            self.__cfg = RawConfigParser()
+            self.__cfg['DEFAULT'] = self.default_values
+        return self.__cfg
 
     def __read_file(self):
         path = self.__get_file_path()
         with open(path, 'r') as configfile:
             self.cfg.read_file(configfile)
 
-    def __get(self, key, section):
-        self.__read_file()
+    def __lookup(self, key, section, kind):
+        path = self.__get_file_path()
         try:
-            return self.cfg.get(section, key)
-        except NoSectionError or NoOptionError:
+            return self.cache.get_value(path, self.default_values, section, key, kind)
+        except FileNotFoundError:
+            self.create_file()
+            return self.cache.get_value(path, self.default_values, section, key, kind)
+        except (NoSectionError, NoOptionError):
             self.__delete()
             self.create_file()
-            return self.cfg.get(self.default_section, key)
+            return self.cache.get_value(path, self.default_values, self.default_section, key, kind)
+
+    def __get(self, key, section):
+        return self.__lookup(key, section, "str")
 
     def __getint(self, key, section):
-        self.__read_file()
-        try:
-            return self.cfg.getint(section, key)
-        except NoSectionError or NoOptionError:
-            self.__delete()
-            self.create_file()
-            return self.cfg.getint(self.default_section, key)
+        return self.__lookup(key, section, "int")
+
+    def __getboolean(self, key, section):
+        return self.__lookup(key, section, "boolean")
 
     def __set(self, key, value, section):
         self.__read_file()
@@ -75,20 +180,23 @@ class CommonVariables:
 
     def __save(self):
         path = self.__get_file_path()
-        with open(path, 'w') as configfile:
-            self.cfg.write(configfile)
+        with self.cache.lock:
+            with open(path, 'w') as configfile:
+                self.cfg.write(configfile)
+            self.cache.invalidate(path)
 
     def __delete(self):
-        try:
-            os.remove(self.__get_file_path())
-        except FileExistsError:
-            pass
+        path = self.__get_file_path()
+        with self.cache.lock:
+            try:
+                os.remove(path)
+            except FileExistsError:
+                pass
+            self.cache.invalidate(path)
 
     def reset(self):
         self.cfg.clear()
-        path = self.__get_file_path()
-        with open(path, 'w') as configfile:
-            self.cfg.write(configfile)
+        self.__save()
 
     @property
     def log_dir(self):
@@ -211,6 +319,150 @@ class CommonVariables:
         if value is not None:
             self.__set("redis_password", str(value), self.database_section)
 
+    @property
+    def redis_max_connections(self):
+        return self.__getint("redis_max_connections", self.database_section)
+
+    @redis_max_connections.setter
+    def redis_max_connections(self, value):
+        if value is not None:
+            self.__set("redis_max_connections", int(value), self.database_section)
+
+    @property
+    def redis_pool_timeout(self):
+        return self.__getint("redis_pool_timeout", self.database_section)
+
+    @redis_pool_timeout.setter
+    def redis_pool_timeout(self, value):
+        if value is not None:
+            self.__set("redis_pool_timeout", int(value), self.database_section)
+
+    @property
+    def redis_socket_timeout(self):
+        return self.__getint("redis_socket_timeout", self.database_section)
+
+    @redis_socket_timeout.setter
+    def redis_socket_timeout(self, value):
+        if value is not None:
+            self.__set("redis_socket_timeout", int(value), self.database_section)
+
+    @property
+    def redis_socket_keepalive(self):
+        return self.__getboolean("redis_socket_keepalive", self.database_section)
+
+    @redis_socket_keepalive.setter
+    def redis_socket_keepalive(self, value):
+        if value is not None:
+            self.__set("redis_socket_keepalive", str(bool(value)), self.database_section)
+
+    @property
+    def durability(self):
+        """
+        An unknown mode in a hand edited file would silently turn off every
+        save, so it is logged once and the default mode is used instead.
+        """
+        value = self.__get("durability", self.database_section)
+        if value not in self.durability_modes:
+            default_value = self.default_values["durability"]
+            with self.cache.lock:
+                logged = value in self.invalid_durability_set
+                self.invalid_durability_set.add(value)
+            if not logged:
+                # Imported here since the logger reads its directory from these variables
+                from taskmgr.lib.logger import AppLogger
+                AppLogger("variables").get_logger().error(
+                    f"durability {value!r} is not one of {self.durability_modes}, using {default_value!r}")
+            return default_value
+        return value
+
+    @durability.setter
+    def durability(self, value):
+        if value is not None:
+            if value not in self.durability_modes:
+                raise ValueError(f"durability must be one of {self.durability_modes}")
+            self.__set("durability", str(value), self.database_section)
+
+    @property
+    def bgsave_interval(self):
+        return self.__getint("bgsave_interval", self.database_section)
+
+    @bgsave_interval.setter
+    def bgsave_interval(self, value):
+        if value is not None:
+            self.__set("bgsave_interval", int(value), self.database_section)
+
+    @property
+    def bulk_chunk_size(self):
+        return self.__getint("bulk_chunk_size", self.database_section)
+
+    @bulk_chunk_size.setter
+    def bulk_chunk_size(self, value):
+        if value is not None:
+            self.__set("bulk_chunk_size", int(value), self.database_section)
+
+    @property
+    def health_check_ttl(self):
+        return self.__getint("health_check_ttl", self.database_section)
+
+    @health_check_ttl.setter
+    def health_check_ttl(self, value):
+        if value is not None:
+            self.__set("health_check_ttl", int(value), self.database_section)
+
+    @property
+    def reconnect_attempts(self):
+        return self.__getint("reconnect_attempts", self.database_section)
+
+    @reconnect_attempts.setter
+    def reconnect_attempts(self, value):
+        if value is not None:
+            self.__set("reconnect_attempts", int(value), self.database_section)
+
+    @property
+    def snapshot_reconcile_interval(self):
+        return self.__getint("snapshot_reconcile_interval", self.database_section)
+
+    @snapshot_reconcile_interval.setter
+    def snapshot_reconcile_interval(self, value):
+        if value is not None:
+            self.__set("snapshot_reconcile_interval", int(value), self.database_section)
+
+    @property
+    def rebuild_partition_days(self):
+        return self.__getint("rebuild_partition_days", self.database_section)
+
+    @rebuild_partition_days.setter
+    def rebuild_partition_days(self, value):
+        if value is not None:
+            self.__set("rebuild_partition_days", int(value), self.database_section)
+
+    @property
+    def rebuild_workers(self):
+        return self.__getint("rebuild_workers", self.database_section)
+
+    @rebuild_workers.setter
+    def rebuild_workers(self, value):
+        if value is not None:
+            self.__set("rebuild_workers", int(value), self.database_section)
+
+    @property
+    def index_build_timeout(self):
+        return self.__getint("index_build_timeout", self.database_section)
+
+    @index_build_timeout.setter
+    def index_build_timeout(self, value):
+        if value is not None:
+            self.__set("index_build_timeout", int(value), self.database_section)
+
+    @property
+    def scan_count(self):
+        return self.__getint("scan_count", self.database_section)
+
+    @scan_count.setter
+    def scan_count(self, value):
+        if value is not None:
+            self.__set("scan_count", int(value), self.database_section)
+
     @property
     def export_dir(self):
         return self.__get("export_dir", self.default_section)
@@ -220,6 +472,28 @@ class CommonVariables:
         if value is not None:
             self.__set("export_dir", str(value), self.default_section)
 
+    @property
+    def export_format(self):
+        return self.__get("export_format", self.default_section)
+
+    @export_format.setter
+    def export_format(self, value):
+        if value is not None:
+            if value not in self.export_formats:
+                raise ValueError(f"export_format must be one of {self.export_formats}")
+            self.__set("export_format", str(value), self.default_section)
+
+    @property
+    def export_compression(self):
+        return self.__get("export_compression", self.default_section)
+
+    @export_compression.setter
+    def export_compression(self, value):
+        if value is not None:
+            if value not in self.export_compressions:
+                raise ValueError(f"export_compression must be one of {self.export_compressions}")
+            self.__set("export_compression", str(value), self.default_section)
+
     def __iter__(self):
         yield 'default_name_field_length', self.default_name_field_length
         yield 'default_project_name', self.default_project_name
@@ -229,6 +503,22 @@ class CommonVariables:
         yield 'redis_port', self.redis_port
         yield 'redis_username', self.redis_username
         yield 'redis_password', "***********"
+        yield 'redis_max_connections', self.redis_max_connections
+        yield 'redis_pool_timeout', self.redis_pool_timeout
+        yield 'redis_socket_timeout', self.redis_socket_timeout
+        yield 'redis_socket_keepalive', self.redis_socket_keepalive
+        yield 'durability', self.durability
+        yield 'bgsave_interval', self.bgsave_interval
+        yield 'bulk_chunk_size', self.bulk_chunk_size
+        yield 'health_check_ttl', self.health_check_ttl
+        yield 'reconnect_attempts', self.reconnect_attempts
+        yield 'snapshot_reconcile_interval', self.snapshot_reconcile_interval
+        yield 'rebuild_partition_days', self.rebuild_partition_days
+        yield 'rebuild_workers', self.rebuild_workers
+        yield 'index_build_timeout', self.index_build_timeout
+        yield 'scan_count', self.scan_count
         yield 'export_dir', self.export_dir
+        yield 'export_format', self.export_format
+        yield 'export_compression', self.export_compression
         yield 'max_rows', self.max_rows
 
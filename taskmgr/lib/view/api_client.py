@@ -1,4 +1,4 @@
-from taskmgr.lib.database.generic_db import QueryResult
+from taskmgr.lib.database.generic_db import QueryResult, GroupedResult
 from taskmgr.lib.view.client import Client
 
 
@@ -10,13 +10,19 @@ class ApiClient(Client):
     def display_tasks(self, result: QueryResult):
         page = result.get_page()
         if page.pager_disabled:
-            return {"tasks": [dict(task) for task in result.to_list()],
+            json = {"tasks": [dict(task) for task in result.to_list()],
                     "info": {"item_count": result.item_count}}
         else:
-            return {"tasks": [dict(task) for task in result.to_list()],
+            json = {"tasks": [dict(task) for task in result.to_list()],
                     "info": {"item_count": result.item_count,
                              "page_number": page.page_number,
-                             "page_count": page.page_count}}
+                             "page_count": page.page_count,
+                             "next_cursor": page.next_cursor,
+                             "prev_cursor": page.prev_cursor}}
+
+        if isinstance(result, GroupedResult):
+            json["info"]["group_counts"] = result.get_counts()
+        return json
 
     def display_invalid_index_error(self, index: int):
         return {"error": True, "detail": [{"loc": ["param", "index"]}], "msg": f"Provided index {index} is invalid",
@@ -31,7 +37,9 @@ class ApiClient(Client):
             return {"snapshot": {"list": [dict(snapshot) for snapshot in result.to_list()]},
                     "info": {"item_count": result.item_count,
                              "page_number": page.page_number,
-                             "page_count": page.page_count}}
+                             "page_count": page.page_count,
+                             "next_cursor": page.next_cursor,
+                             "prev_cursor": page.prev_cursor}}
 
     def display_attribute_error(self, param: str, message: str):
         return {"error": True, "detail": [{"loc": ["param", param]}], "msg": message, "type": "attribute_error"}
@@ -1,8 +1,10 @@
 from datetime import datetime
 
-from taskmgr.lib.database.generic_db import QueryResult
+from taskmgr.lib.database.generic_db import ClearResult, QueryResult, GroupedResult
 from taskmgr.lib.logger import AppLogger
-from taskmgr.lib.presenter.file_manager import FileManager
+from taskmgr.lib.presenter.file_manager import FileManager, UnmatchedColumns, UnsupportedCompression
+from taskmgr.lib.presenter.sync import SyncResultsList
+from taskmgr.lib.presenter.snapshots import RebuildProgress
 from taskmgr.lib.presenter.task_sync import TaskImporter
 from taskmgr.lib.presenter.time_card_sync import TimeCardImporter
 from taskmgr.lib.view.client import Client
@@ -36,6 +38,14 @@ class CliClient(Client):
             CliClient.logger.info(f"Displaying {result.item_count} row(s)")
         else:
             CliClient.logger.info(f"Displaying {result.item_count} row(s) on page {page.page_number} of {page.page_count}")
+            if page.next_cursor is not None:
+                CliClient.logger.info(f"Next page: --cursor {page.next_cursor}")
+            if page.prev_cursor is not None:
+                CliClient.logger.info(f"Previous page: --cursor {page.prev_cursor}")
+
+        if isinstance(result, GroupedResult):
+            group_counts = [f"{name} ({count})" for name, count in result.get_counts().items()]
+            CliClient.logger.info(f"Groups: {', '.join(group_counts)}")
 
     def display_time_cards(self, result: QueryResult):
         assert isinstance(result, QueryResult)
@@ -85,6 +95,12 @@ class CliClient(Client):
     def display_invalid_index_error(self, index: int):
         self.logger.info(f"Provided index {index} is invalid")
 
+    def display_rebuild_progress(self, progress: RebuildProgress):
+        self.logger.info(f"Rebuilding snapshots: {progress.get_summary()}")
+
+    def display_clear_progress(self, result: ClearResult):
+        self.logger.info(f"Removing: {result.get_summary()}")
+
     def list_labels(self):
         """
         Lists all labels contained in the tasks
@@ -113,6 +129,12 @@ class CliClient(Client):
     def export_time_cards(self, time_card_list: list):
         self.__file_manager.save_time_cards(time_card_list)
 
+    def export_all_tasks(self, file_format: str = None, compression: str = None):
+        self.__file_manager.save_task_chunks(self.tasks.iter_chunks(), file_format, compression)
+
+    def export_all_time_cards(self, file_format: str = None, compression: str = None):
+        self.__file_manager.save_time_card_chunks(self.time_cards.iter_chunks(), file_format, compression)
+
     def print_task_import_columns(self):
         print(f"Column names: {', '.join(self.__file_manager.get_task_columns())}")
 
@@ -127,23 +149,29 @@ class CliClient(Client):
         start_datetime = datetime.now()
         self.logger.info(f"Starting import")
         try:
-            obj_list = self.__file_manager.open_time_cards(path)
-            self.logger.info(f"Retrieved {len(obj_list)} time cards from file")
-            time_card_list = importer.convert(obj_list)
-            self.logger.info(f"Converted rows into time card objects")
-            sync_results = importer.import_objects(time_card_list)
+            sync_results = SyncResultsList()
+            if self.__file_manager.is_columnar(path):
+                chunk_iter = self.__file_manager.open_columnar_time_cards(path)
+            else:
+                chunk_iter = map(importer.convert, self.__file_manager.open_time_card_chunks(path))
+
+            for time_card_list in chunk_iter:
+                sync_results.extend(importer.import_objects(time_card_list, bulk_save=True))
+                self.logger.debug(f"Imported {len(sync_results.get_list())} time cards")
+            sync_results.stop()
             self.logger.info(f"Import summary: {sync_results.get_summary()}")
 
             self.logger.info(f"Import complete: Duration: {self.get_duration(start_datetime)}")
-        except Exception as ex:
-            self.logger.info(f"ERROR: {ex}")
+        except (OSError, ValueError, UnmatchedColumns, UnsupportedCompression) as ex:
+            self.logger.error(f"Import of {path} failed: {ex.__class__.__name__}: {ex}")
 
 
     def import_tasks(self, importer: TaskImporter, path: str):
         """
-        Imports tasks from the Csv file.
+        Imports tasks from a csv, JSON Lines or columnar file. csv and JSON
+        Lines files may be compressed with gzip or zstd.
         :param importer: TaskImporter class
-        :param path: path to csv file
+        :param path: path to the exported file
         :return: None
         """
         assert isinstance(importer, TaskImporter)
@@ -152,17 +180,22 @@ class CliClient(Client):
         start_datetime = datetime.now()
         self.logger.info(f"Starting import")
         try:
-            obj_list = self.__file_manager.open_tasks(path)
-            self.logger.info(f"Retrieved {len(obj_list)} tasks from file")
-            task_list = importer.convert(obj_list)
-            self.logger.info(f"Converted rows into task objects")
-            sync_results = importer.import_objects(task_list, bulk_save=True)
+            sync_results = SyncResultsList()
+            if self.__file_manager.is_columnar(path):
+                chunk_iter = self.__file_manager.open_columnar_tasks(path)
+            else:
+                chunk_iter = map(importer.convert, self.__file_manager.open_task_chunks(path))
+
+            for task_list in chunk_iter:
+                sync_results.extend(importer.import_objects(task_list, bulk_save=True))
+                self.logger.debug(f"Imported {len(sync_results.get_list())} tasks")
+            sync_results.stop()
             self.logger.info(f"Import summary: {sync_results.get_summary()}")
-            self.snapshots.rebuild()
             self.logger.info(f"Rebuilding snapshots")
+            self.rebuild_snapshots()
 
             self.logger.info(f"Import complete: Duration: {self.get_duration(start_datetime)}")
-        except Exception as ex:
-            self.logger.info(f"ERROR: {ex}")
+        except (OSError, ValueError, UnmatchedColumns, UnsupportedCompression) as ex:
+            self.logger.error(f"Import of {path} failed: {ex.__class__.__name__}: {ex}")
 
 
@@ -1,15 +1,19 @@
 from abc import abstractmethod
+from copy import deepcopy
 from datetime import datetime
 from typing import List
 
 from taskmgr.lib.database.db_manager import DatabaseManager
-from taskmgr.lib.database.generic_db import QueryResult
+from taskmgr.lib.database.generic_db import ClearResult, QueryResult
+from taskmgr.lib.database.pager import InvalidCursor
+from taskmgr.lib.database.query_builder import InvalidQuery
 from taskmgr.lib.logger import AppLogger
 from taskmgr.lib.model.calendar import Today
 from taskmgr.lib.model.snapshot import Snapshot
 from taskmgr.lib.model.task import Task
 from taskmgr.lib.model.time_card import TimeCard
 from taskmgr.lib.presenter.date_time_generator import DateTimeGenerator
+from taskmgr.lib.presenter.snapshots import RebuildProgress
 from taskmgr.lib.presenter.tasks import TaskKeyError, DueDateError
 from taskmgr.lib.variables import CommonVariables
 from taskmgr.lib.view.client_args import *
@@ -53,6 +57,13 @@ class Client:
     def display_attribute_error(self, param: str, message: str):
         pass
 
+    @abstractmethod
+    def display_rebuild_progress(self, progress: RebuildProgress):
+        pass
+
+    def display_clear_progress(self, result: ClearResult):
+        pass
+
     def get_task(self, args: GetArg) -> List[Task]:
         task = self.tasks.get_task_by_index(args.index)
         return self.display_tasks(QueryResult([task]))
@@ -90,26 +101,26 @@ class Client:
         result = self.tasks.get_tasks_containing_name(args.name, args.page)
         return self.display_tasks(result)
 
-    def group_tasks_by_project(self) -> List[Task]:
-        result = QueryResult()
-        for project in self.get_unique_project_list():
-            for task in self.tasks.get_tasks_by_project(project).to_list():
-                result.append(task)
+    def filter_tasks(self, args: FilterArgs) -> List[Task]:
+        assert args.status in [None, "incomplete", "complete"]
+        is_completed = None if args.status is None else args.status == "complete"
+        try:
+            result = self.tasks.get_filtered(args.project, args.label, is_completed, args.name,
+                                             args.min_date, args.max_date, args.page)
+        except DueDateError as ex:
+            return self.display_attribute_error("due_date", str(ex))
+        except InvalidQuery as ex:
+            return self.display_attribute_error("filter", str(ex))
         return self.display_tasks(result)
 
-    def group_tasks_by_due_date(self) -> List[Task]:
-        result = QueryResult()
-        for due_date_string in self.__get_unique_due_date_list():
-            for task in self.tasks.get_tasks_by_date(due_date_string).to_list():
-                result.append(task)
-        return self.display_tasks(result)
+    def group_tasks_by_project(self, page: int = 0) -> List[Task]:
+        return self.display_tasks(self.tasks.group_by("project", page))
 
-    def group_tasks_by_label(self) -> List[Task]:
-        result = QueryResult()
-        for label in self.get_unique_label_list():
-            for task in self.tasks.get_tasks_by_label(label).to_list():
-                result.append(task)
-        return self.display_tasks(result)
+    def group_tasks_by_due_date(self, page: int = 0) -> List[Task]:
+        return self.display_tasks(self.tasks.group_by("due_date", page))
+
+    def group_tasks_by_label(self, page: int = 0) -> List[Task]:
+        return self.display_tasks(self.tasks.group_by("label", page))
 
     def get_unique_label_list(self) -> List[str]:
         """Returns a list of labels from the tasks."""
@@ -119,12 +130,23 @@ class Client:
         """Returns list of project names from the tasks. """
         return self.tasks.get_project_list()
 
-    def __get_unique_due_date_list(self) -> List[str]:
-        """Returns list of due_date strings from the tasks."""
-        return self.tasks.get_due_date_list()
+    def reconcile_snapshots(self) -> int:
+        return self.snapshots.reconcile()
+
+    def reconcile_snapshots_if_due(self) -> int:
+        return self.snapshots.reconcile_if_due()
+
+    def rebuild_snapshots(self, workers: int = None) -> RebuildProgress:
+        return self.snapshots.rebuild(workers, self.display_rebuild_progress)
 
-    def count_all_tasks(self, page: int = 0) -> List[Snapshot]:
-        result = self.snapshots.get_all(page)
+    def count_all_tasks(self, page: int = 0, cursor: str = None) -> List[Snapshot]:
+        try:
+            if cursor is not None:
+                result = self.snapshots.get_all_by_cursor(cursor)
+            else:
+                result = self.snapshots.get_all(page)
+        except InvalidCursor as ex:
+            return self.display_attribute_error("cursor", str(ex))
         return self.display_snapshots(result)
 
     def count_tasks_by_due_date_range(self, args: DueDateRangeArgs) -> List[Snapshot]:
@@ -153,11 +175,11 @@ class Client:
     def reschedule_tasks(self):
         for task in self.tasks.reschedule():
             original_task, new_task = self.tasks.edit(index=task.index, date_expression=task.due_date)
-            self.snapshots.update([original_task, new_task])
+            self.snapshots.apply_task_changes([(original_task, new_task)])
 
-    def remove_all_tasks(self):
-        self.tasks.clear()
-        self.snapshots.clear()
+    def remove_all_tasks(self, drop_index: bool = False):
+        self.tasks.clear(drop_index, self.display_clear_progress)
+        self.snapshots.clear(drop_index, self.display_clear_progress)
 
     def set_default_variables(self, **kwargs):
         """
@@ -188,15 +210,17 @@ class Client:
 
     def group_edit(self, args: GroupEditArgs) -> List[Task]:
         task_list = list()
+        change_list = list()
         for index in args.indexes:
             try:
-                _, new_task = self.tasks.edit(index, None, args.label,
-                                              args.project, args.due_date, args.time_spent)
+                original_task, new_task = self.tasks.edit(index, None, args.label,
+                                                          args.project, args.due_date, args.time_spent)
                 task_list.append(new_task)
+                change_list.append((original_task, new_task))
             except TaskKeyError:
                 return self.display_invalid_index_error(index)
 
-        self.snapshots.update(task_list)
+        self.snapshots.apply_task_changes(change_list)
         return self.display_tasks(QueryResult(task_list))
 
     def edit_task(self, args: EditArgs) -> List[Task]:
@@ -210,7 +234,7 @@ class Client:
             original_task, new_task = self.tasks.edit(args.index, args.name, args.label,
                                                       args.project, args.due_date, args.time_spent)
 
-            self.snapshots.update([original_task, new_task])
+            self.snapshots.apply_task_changes([(original_task, new_task)])
             return self.display_tasks(QueryResult([new_task]))
         except TaskKeyError:
             return self.display_invalid_index_error(args.index)
@@ -221,71 +245,90 @@ class Client:
                 return self.display_attribute_error("name", f"Empty name parameter")
             else:
                 task_list = self.tasks.add(args.name, args.label, args.project, args.due_date)
-                self.snapshots.update(task_list)
+                self.snapshots.apply_task_changes([(None, task) for task in task_list])
                 return self.display_tasks(QueryResult(task_list))
         except DueDateError as ex:
             return self.display_attribute_error("due_date", str(ex))
 
     def delete_task(self, args: DeleteArgs) -> List[Task]:
         task_list = list()
+        change_list = list()
         for index in args.indexes:
             task = self.tasks.get_task_by_index(index)
             if task is not None:
+                original_task = deepcopy(task)
                 task_list.append(self.tasks.delete(task))
+                change_list.append((original_task, task))
             else:
                 return self.display_invalid_index_error(index)
 
-        self.snapshots.update(task_list)
+        self.snapshots.apply_task_changes(change_list)
         return self.display_tasks(QueryResult(task_list))
 
     def complete_task(self, args: CompleteArgs) -> List[Task]:
         task_list = list()
+        change_list = list()
         for index in args.indexes:
             task = self.tasks.get_task_by_index(index)
             if task is not None:
+                original_task = deepcopy(task)
                 if args.time_spent > 0:
                     task.time_spent = args.time_spent
 
                 task_list.append(self.tasks.complete(task))
+                change_list.append((original_task, task))
             else:
                 return self.display_invalid_index_error(index)
 
-        self.snapshots.update(task_list)
+        self.snapshots.apply_task_changes(change_list)
         return self.display_tasks(QueryResult(task_list))
 
     def incomplete_task(self, args: IncompleteArgs) -> List[Task]:
         task_list = list()
+        change_list = list()
         for index in args.indexes:
             task = self.tasks.get_task_by_index(index)
             if task is not None:
+                original_task = deepcopy(task)
                 task_list.append(self.tasks.incomplete(task))
+                change_list.append((original_task, task))
             else:
                 return self.display_invalid_index_error(index)
 
-        self.snapshots.update(task_list)
+        self.snapshots.apply_task_changes(change_list)
         return self.display_tasks(QueryResult(task_list))
 
     def undelete_task(self, args: UndeleteArgs) -> List[Task]:
         task_list = list()
+        change_list = list()
         for index in args.indexes:
             task = self.tasks.get_task_by_index(index)
             if task is not None:
+                original_task = deepcopy(task)
                 task_list.append(self.tasks.undelete(task))
+                change_list.append((original_task, task))
             else:
                 return self.display_invalid_index_error(index)
 
-        self.snapshots.update(task_list)
+        self.snapshots.apply_task_changes(change_list)
         return self.display_tasks(QueryResult(task_list))
 
     def list_all_tasks(self, args: ListArgs) -> List[Task]:
-        if args.all:
-            result = self.tasks.get_all(args.page)
-        else:
-            result = self.tasks.get_undeleted_tasks(args.page)
+        try:
+            if args.cursor is not None and args.all:
+                result = self.tasks.get_all_by_cursor(args.cursor)
+            elif args.cursor is not None:
+                result = self.tasks.get_undeleted_tasks_by_cursor(args.cursor)
+            elif args.all:
+                result = self.tasks.get_all(args.page)
+            else:
+                result = self.tasks.get_undeleted_tasks(args.page)
+        except InvalidCursor as ex:
+            return self.display_attribute_error("cursor", str(ex))
         return self.display_tasks(result)
 
-    def clear_tasks(self):
-        self.tasks.clear()
+    def clear_tasks(self, drop_index: bool = False):
+        self.tasks.clear(drop_index, self.display_clear_progress)
 
 
     # TimeCards
@@ -328,7 +371,12 @@ class Client:
             return self.display_invalid_index_error(args.index)
 
     def list_all_time_cards(self, args: ListArgs) -> List[TimeCard]:
-        if args.all:
+        if args.cursor is not None:
+            try:
+                result = self.time_cards.get_all_by_cursor(args.cursor)
+            except InvalidCursor as ex:
+                return self.display_attribute_error("cursor", str(ex))
+        elif args.all:
             result = self.time_cards.get_all()
         else:
             result = self.time_cards.get_all(args.page)
@@ -347,6 +395,6 @@ class Client:
         result = self.time_cards.get_time_cards_by_date(date_string, add_total=True)
         return self.display_time_cards(result)
 
-    def clear_time_cards(self):
-        self.time_cards.clear()
+    def clear_time_cards(self, drop_index: bool = False):
+        self.time_cards.clear(drop_index, self.display_clear_progress)
 
@@ -41,6 +41,7 @@ class ListArgs(BaseModel):
     all: bool
     export: bool = False
     page: int
+    cursor: Optional[str] = None
 
 
 class DeleteArgs(BaseModel):
@@ -88,6 +89,17 @@ class NameArgs(BaseModel):
     page: int = 0
 
 
+class FilterArgs(BaseModel):
+    project: Optional[str] = None
+    label: Optional[str] = None
+    status: Optional[str] = None
+    name: Optional[str] = None
+    min_date: Optional[str] = None
+    max_date: Optional[str] = None
+    export: bool = False
+    page: int = 0
+
+
 class DueDateRangeArgs(BaseModel):
     min_date: str
     max_date: str
@@ -0,0 +1,66 @@
+"""
+Compares the size and read time of a task backup in the columnar format with
+the csv export. Does not need a redis server.
+
+    python -m tests.benchmarks.bench_columnar
+"""
+import os
+import tempfile
+import time
+
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.presenter.columnar_file import ColumnarTasksFile
+from taskmgr.lib.presenter.file_manager import CsvTasksFile
+from taskmgr.lib.presenter.task_sync import TaskImporter
+
+TASK_COUNT = 50000
+CHUNK_SIZE = 5000
+
+
+def create_chunks() -> list:
+    chunk_list = list()
+    for first_index in range(1, TASK_COUNT + 1, CHUNK_SIZE):
+        chunk = list()
+        for index in range(first_index, first_index + CHUNK_SIZE):
+            task = Task(f"task{index}")
+            task.index = index
+            task.label = ["call", "waiting", "computer", "office"][index % 4]
+            task.project = ["home", "work"][index % 2]
+            task.time_spent = 0.5
+            task.due_date = "2021-07-12"
+            task.due_date_timestamp = 1626048000
+            task.completed = index % 2 == 0
+            task.unique_id = f"{index:032x}"
+            chunk.append(task)
+        chunk_list.append(chunk)
+    return chunk_list
+
+
+def main():
+    chunk_list = create_chunks()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_file = CsvTasksFile("csv", "none")
+        csv_file.output_dir = temp_dir
+        csv_path = csv_file.save_chunks("tasks.csv", chunk_list, csv_file.get_field_names(), csv_file.write_row)
+
+        columnar_path = os.path.join(temp_dir, "tasks.tmc")
+        ColumnarTasksFile().write(columnar_path, chunk_list)
+
+        start = time.perf_counter()
+        for obj_list in csv_file.read_chunks(csv_path):
+            TaskImporter.convert(obj_list)
+        csv_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in ColumnarTasksFile().read_chunks(columnar_path):
+            pass
+        columnar_seconds = time.perf_counter() - start
+
+        print(f"{'format':>10} {'bytes':>12} {'read s':>10} {'rows/sec':>10}")
+        print(f"{'csv':>10} {os.path.getsize(csv_path):>12} {csv_seconds:>10.3f} {TASK_COUNT / csv_seconds:>10.0f}")
+        print(f"{'columnar':>10} {os.path.getsize(columnar_path):>12} {columnar_seconds:>10.3f} "
+              f"{TASK_COUNT / columnar_seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
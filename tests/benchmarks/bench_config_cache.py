@@ -0,0 +1,59 @@
+"""
+Counts the file system calls made by CommonVariables while deserialising a
+page of tasks. Each Task reads its defaults from variables.ini, so before the
+cache every property read opened and parsed the file.
+
+    python -m tests.benchmarks.bench_config_cache
+"""
+import sys
+import time
+
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.variables import CommonVariables, ConfigCache
+
+PAGE_SIZE = 1000
+open_count = 0
+
+
+def count_opens(event, args):
+    global open_count
+    if event == "open" and str(args[0]).endswith(".ini"):
+        open_count += 1
+
+
+def build_page() -> list:
+    document_list = list()
+    for number in range(PAGE_SIZE):
+        task = Task(f"task{number}")
+        task.due_date = "2021-01-01"
+        document_list.append(dict(task))
+    return document_list
+
+
+def measure(document_list: list, check_interval: float):
+    global open_count
+    ConfigCache.check_interval = check_interval
+    CommonVariables.cache.invalidate(f"{CommonVariables().resources_dir}/variables.ini")
+
+    open_count = 0
+    stat_count = CommonVariables.cache.stat_count
+    start = time.perf_counter()
+    task_list = [Task().deserialize(document) for document in document_list]
+    duration = (time.perf_counter() - start) * 1000
+    assert len(task_list) == PAGE_SIZE
+
+    return open_count, CommonVariables.cache.stat_count - stat_count, duration
+
+
+def main():
+    sys.addaudithook(count_opens)
+    document_list = build_page()
+
+    print(f"{'check interval':>16} {'opens':>8} {'stats':>8} {'ms':>10}")
+    for check_interval in [0.0, ConfigCache.check_interval]:
+        opens, stats, duration = measure(document_list, check_interval)
+        print(f"{check_interval:>16} {opens:>8} {stats:>8} {duration:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measures DateTimeGenerator.parse over a corpus of date expressions, per
+handler with an empty cache, compares the YYYY-MM-DD case with the dateutil
+validate and parse that the handler chain used to run, and reports the
+throughput once the cache is warm. Does not need a redis server.
+
+    python -m tests.benchmarks.bench_date_parser
+"""
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from taskmgr.lib.model.calendar import Calendar
+from taskmgr.lib.model.day import Day
+from taskmgr.lib.presenter.date_time_generator import DateTimeGenerator
+
+ROUNDS = 20
+SINGLE_EXPRESSIONS = ["su", "m", "tu", "w", "th", "f", "sa", "today", "tomorrow", "yesterday",
+                      "jan 3", "apr 14", "sep 24", "dec 31"]
+RANGE_EXPRESSIONS = ["this week", "next week", "last week", "this month", "next month", "last month",
+                     "every weekday", "every m", "every f"]
+INVALID_EXPRESSIONS = ["every", "monday", "24", "2021-02-30", "apr"]
+
+
+def create_corpus() -> list:
+    first_date = datetime(2021, 1, 1)
+    date_list = [Day(first_date + timedelta(days=number)).to_date_string() for number in range(200)]
+    return SINGLE_EXPRESSIONS + RANGE_EXPRESSIONS + INVALID_EXPRESSIONS + date_list
+
+
+def main():
+    corpus = create_corpus()
+    date_generator = DateTimeGenerator()
+    date_generator.current_day = Day(datetime(2021, 7, 12))
+
+    seconds_dict = defaultdict(float)
+    count_dict = defaultdict(int)
+    for _ in range(ROUNDS):
+        for expression in corpus:
+            DateTimeGenerator.cache.clear()
+            start = time.perf_counter()
+            parsed_date = date_generator.parse(expression)
+            handler_name = "invalid" if parsed_date is None else parsed_date.handler_name
+            seconds_dict[handler_name] += time.perf_counter() - start
+            count_dict[handler_name] += 1
+
+    print(f"{'handler':>26} {'count':>8} {'exprs/sec':>12}")
+    for handler_name in sorted(seconds_dict):
+        print(f"{handler_name:>26} {count_dict[handler_name]:>8} "
+              f"{count_dict[handler_name] / seconds_dict[handler_name]:>12.0f}")
+
+    date_list = [expression for expression in corpus if expression[:1].isdigit()]
+    calendar = Calendar()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for expression in date_list:
+            if calendar.is_valid(expression):
+                calendar.parse_date_time(expression)
+    dateutil_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for expression in date_list:
+            DateTimeGenerator.cache.clear()
+            date_generator.parse(expression, single_date=True)
+    parse_seconds = time.perf_counter() - start
+
+    count = ROUNDS * len(date_list)
+    print(f"{'YYYY-MM-DD dateutil':>26} {count:>8} {count / dateutil_seconds:>12.0f}")
+    print(f"{'YYYY-MM-DD parse':>26} {count:>8} {count / parse_seconds:>12.0f}")
+
+    DateTimeGenerator.cache.clear()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for expression in corpus:
+            date_generator.parse(expression)
+    cached_seconds = time.perf_counter() - start
+
+    count = ROUNDS * len(corpus)
+    cache = DateTimeGenerator.cache
+    print(f"{'cached corpus':>26} {count:>8} {count / cached_seconds:>12.0f} "
+          f"(hits {cache.hit_count}, misses {cache.miss_count})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Measures DateTimeGenerator.get_days("every day") with a 24 month recurring
+limit, including the date string and timestamp conversion done by Tasks.add
+for every generated day.
+
+    python -m tests.benchmarks.bench_day
+"""
+import statistics
+import time
+
+from taskmgr.lib.presenter.date_time_generator import DateTimeGenerator
+from taskmgr.lib.variables import CommonVariables
+
+RECURRING_MONTH_LIMIT = 24
+RUN_COUNT = 20
+
+
+def measure(generator: DateTimeGenerator, convert: bool) -> list:
+    duration_list = list()
+    for _ in range(RUN_COUNT):
+        start = time.perf_counter()
+        day_list = generator.get_days("every day")
+        if convert:
+            for day in day_list:
+                day.to_date_string()
+                day.to_date_timestamp()
+        duration_list.append((time.perf_counter() - start) * 1000)
+    return duration_list
+
+
+def main():
+    common_vars = CommonVariables('bench_variables.ini')
+    common_vars.recurring_month_limit = RECURRING_MONTH_LIMIT
+
+    generator = DateTimeGenerator()
+    generator.handler_3.vars = common_vars
+    day_count = len(generator.get_days("every day"))
+
+    print(f"{'days':>6} {'step':>18} {'mean ms':>10} {'min ms':>10}")
+    for step, convert in [("get_days", False), ("get_days+convert", True)]:
+        duration_list = measure(generator, convert)
+        print(f"{day_count:>6} {step:>18} {statistics.mean(duration_list):>10.3f} {min(duration_list):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures task edit latency against dataset size for each durability mode.
+Requires a running redis server with the redisearch module.
+
+    python -m tests.benchmarks.bench_durability
+"""
+import statistics
+import time
+
+from taskmgr.lib.database.db_manager import DatabaseManager
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.variables import CommonVariables
+
+DATASET_SIZES = [1000, 10000, 50000]
+EDIT_COUNT = 100
+
+
+def fill(db, size: int):
+    db.clear()
+    task_list = list()
+    for number in range(size):
+        task = Task(f"task{number}")
+        task.due_date = "2021-01-01"
+        task_list.append(task)
+    db.append_objects(task_list)
+
+
+def measure_edits(db) -> list:
+    latency_list = list()
+    for index in range(1, EDIT_COUNT + 1):
+        task = db.get_object("index", index)
+        task.label = f"edited{index}"
+        start = time.perf_counter()
+        db.replace_object(task)
+        latency_list.append((time.perf_counter() - start) * 1000)
+    return latency_list
+
+
+def main():
+    common_vars = CommonVariables('bench_variables.ini')
+    db = DatabaseManager(common_vars).get_tasks_db()
+
+    print(f"{'size':>8} {'mode':>8} {'mean ms':>10} {'p95 ms':>10}")
+    for size in DATASET_SIZES:
+        fill(db, size)
+        for mode in CommonVariables.durability_modes:
+            common_vars.durability = mode
+            latency_list = measure_edits(db)
+            p95 = statistics.quantiles(latency_list, n=20)[-1]
+            print(f"{size:>8} {mode:>8} {statistics.mean(latency_list):>10.3f} {p95:>10.3f}")
+
+    db.clear()
+
+
+if __name__ == "__main__":
+    main()
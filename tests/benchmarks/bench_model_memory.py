@@ -0,0 +1,57 @@
+"""
+Reports the memory held per model object when a large result set, such as
+a full export or the Snapshots.rebuild working set, is kept in memory.
+
+    python -m tests.benchmarks.bench_model_memory
+"""
+import gc
+import tracemalloc
+
+from taskmgr.lib.model.snapshot import Snapshot
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.model.time_card import TimeCard
+
+OBJECT_COUNT = 100000
+
+
+def build_task(number: int) -> Task:
+    task = Task(f"task{number}")
+    task.index = number
+    task.due_date = "2021-01-01"
+    task.due_date_timestamp = 1609459200
+    return task
+
+
+def build_time_card(number: int) -> TimeCard:
+    time_card = TimeCard()
+    time_card.index = number
+    time_card.date = "2021-01-01"
+    return time_card
+
+
+def build_snapshot(number: int) -> Snapshot:
+    snapshot = Snapshot()
+    snapshot.index = number
+    snapshot.due_date = "2021-01-01"
+    return snapshot
+
+
+def measure(factory) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    object_list = [factory(number) for number in range(OBJECT_COUNT)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(object_list) == OBJECT_COUNT
+    return (end - start) / OBJECT_COUNT
+
+
+def main():
+    print(f"{'model':>10} {'objects':>10} {'bytes/object':>14}")
+    for name, factory in [("Task", build_task), ("TimeCard", build_time_card), ("Snapshot", build_snapshot)]:
+        print(f"{name:>10} {OBJECT_COUNT:>10} {measure(factory):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measures Snapshots.rebuild over five years of tasks for a few worker counts.
+Requires a running redis server with the redisearch module.
+
+    python -m tests.benchmarks.bench_snapshot_rebuild
+"""
+from datetime import datetime, timedelta
+
+from taskmgr.lib.database.db_manager import DatabaseManager
+from taskmgr.lib.model.day import Day
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.variables import CommonVariables
+
+DAY_COUNT = 5 * 365
+TASKS_PER_DAY = 10
+WORKER_COUNTS = [1, 4, 8]
+
+
+def fill(db):
+    db.clear()
+    task_list = list()
+    first_date = datetime(2017, 1, 1)
+    for day_number in range(DAY_COUNT):
+        day = Day(first_date + timedelta(days=day_number))
+        for number in range(TASKS_PER_DAY):
+            task = Task(f"task{day_number}_{number}")
+            task.due_date = day.to_date_string()
+            task.due_date_timestamp = day.to_date_timestamp()
+            task.completed = number % 2 == 0
+            task.time_spent = 0.5
+            task_list.append(task)
+    db.append_objects(task_list)
+
+
+def main():
+    common_vars = CommonVariables('bench_variables.ini')
+    db_manager = DatabaseManager(common_vars)
+    fill(db_manager.get_tasks_db())
+    snapshots = db_manager.get_snapshots_model()
+
+    print(f"{'workers':>8} {'snapshots':>10} {'seconds':>10} {'tasks/sec':>10}")
+    for workers in WORKER_COUNTS:
+        progress = snapshots.rebuild(workers)
+        print(f"{workers:>8} {progress.snapshot_count:>10} {progress.get_duration():>10.3f} "
+              f"{progress.get_tasks_per_second():>10.0f}")
+
+    snapshots.clear()
+    db_manager.get_tasks_db().clear()
+
+
+if __name__ == "__main__":
+    main()
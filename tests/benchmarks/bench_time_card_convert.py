@@ -0,0 +1,58 @@
+"""
+Measures TimeCardImporter.convert on a time card export where the dates and
+times repeat, compared with parsing every row. Does not need a redis server.
+
+    python -m tests.benchmarks.bench_time_card_convert
+"""
+import time
+from datetime import datetime, timedelta
+
+from redis import Redis
+
+from taskmgr.lib.database.time_cards_db import TimeCardsDatabase
+from taskmgr.lib.model.day import Day
+from taskmgr.lib.presenter.date_time_generator import DateTimeGenerator
+from taskmgr.lib.presenter.time_card_sync import TimeCardImporter
+from taskmgr.lib.presenter.time_cards import TimeCards
+
+ROW_COUNT = 5000
+TIME_PAIRS = [("8:00", "12:00"), ("12:30", "17:00"), ("9:00", "11:30")]
+
+
+def create_rows() -> list:
+    row_list = list()
+    first_date = datetime(2020, 1, 1)
+    for number in range(ROW_COUNT):
+        day = Day(first_date + timedelta(days=number // 10))
+        time_in, time_out = TIME_PAIRS[number % len(TIME_PAIRS)]
+        row_list.append({"time_in": time_in, "time_out": time_out, "date": day.to_date_string()})
+    return row_list
+
+
+def parse_every_row(row_list: list):
+    date_generator = DateTimeGenerator()
+    for row in row_list:
+        date_generator.get_day(row["date"])
+        date_generator.get_time(row["time_in"])
+        date_generator.get_time(row["time_out"])
+
+
+def main():
+    row_list = create_rows()
+    importer = TimeCardImporter(TimeCards(TimeCardsDatabase(Redis())))
+
+    start = time.perf_counter()
+    parse_every_row(row_list)
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    importer.convert(row_list)
+    cached = time.perf_counter() - start
+
+    print(f"{'mode':>10} {'seconds':>10} {'rows/sec':>10}")
+    print(f"{'uncached':>10} {uncached:>10.3f} {ROW_COUNT / uncached:>10.0f}")
+    print(f"{'convert':>10} {cached:>10.3f} {ROW_COUNT / cached:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
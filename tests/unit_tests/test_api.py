@@ -0,0 +1,70 @@
+import time
+import unittest
+
+from taskmgr.lib.database.db_manager import DatabaseManager, DatabaseUnavailable
+from taskmgr.lib.variables import CommonVariables
+from taskmgr.lib.view.api_client import ApiClient
+
+try:
+    from fastapi.testclient import TestClient
+    from taskmgr import api
+except ImportError:
+    api = None
+
+
+class FailingReconcileClient:
+    """Raises on the first reconciliation and counts the calls."""
+
+    def __init__(self):
+        self.call_count = 0
+
+    def reconcile_snapshots_if_due(self) -> int:
+        self.call_count += 1
+        if self.call_count == 1:
+            raise DatabaseUnavailable("Failed to connect to redis. Check redis host and port")
+        return 0
+
+
+@unittest.skipIf(api is None, "fastapi is not installed")
+class TestApi(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vars = CommonVariables('test_variables.ini')
+        self.vars.redis_host = "localhost"
+        self.mgr = DatabaseManager(self.vars)
+        api.db_manager = self.mgr
+        api.api_client = ApiClient(self.mgr)
+        api.api_client.remove_all_tasks()
+        self.client = TestClient(api.app)
+
+    def tearDown(self) -> None:
+        api.api_client.remove_all_tasks()
+
+    def test_add_task_should_return_task(self):
+        response = self.client.post("/tasks", json={"name": "task1", "label": "l1",
+                                                    "project": "p1", "due_date": "today"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tasks"][0]["name"], "task1")
+
+        response = self.client.get("/task/1")
+        self.assertEqual(response.json()["tasks"][0]["project"], "p1")
+
+    def test_pool_stats_should_report_client_pool(self):
+        self.client.get("/task/1")
+        stats = self.client.get("/database/pool").json()
+        self.assertEqual(stats, self.mgr.get_pool_stats())
+        self.assertGreaterEqual(stats["created"], 1)
+
+    def test_reconcile_job_should_continue_after_errors(self):
+        self.vars.snapshot_reconcile_interval = 1
+        reconcile_client = FailingReconcileClient()
+        api_client = api.api_client
+        api.api_client = reconcile_client
+        try:
+            with TestClient(api.app):
+                time.sleep(2.5)
+            self.assertGreaterEqual(reconcile_client.call_count, 2)
+            self.assertTrue(api.app.state.reconcile_task.done())
+        finally:
+            api.api_client = api_client
+            self.vars.reset()
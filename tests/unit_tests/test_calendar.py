@@ -75,6 +75,7 @@ class TestCalendar(unittest.TestCase):
         day_count = self.calendar.get_day_count_in_month(start_day)
         last_day = self.calendar.get_last_day_in_month(self.march1)
         self.assertEqual(last_day.day_number, day_count)
+        self.assertEqual(self.march1.to_date_string(), "2022-03-01")
 
     def test_get_start_of_week(self):
         new_day = self.calendar.get_first_day_in_week(self.june4)
@@ -172,4 +173,18 @@ class TestCalendar(unittest.TestCase):
 
         self.assertTrue(len(day_list) == day_count)
         self.assertEqual(start_day.day_number, 1)
-        self.assertEqual(day_list[-1].day_number, day_count)
\ No newline at end of file
+        self.assertEqual(day_list[-1].day_number, day_count)
+
+    def test_day_conversions(self):
+        day = Day(datetime.strptime("2022-06-07 10:30:00", self.vars.date_time_format))
+        self.assertEqual(day.to_date_string(), "2022-06-07")
+        self.assertEqual(day.to_date_object(), datetime(2022, 6, 7))
+        self.assertEqual(day.to_date_timestamp(), int(datetime(2022, 6, 7).timestamp()))
+        self.assertEqual(day.to_date_time_string(), "2022-06-07 10:30:00")
+        self.assertEqual(day.week, 2)
+
+        day = self.calendar.get_last_day_in_month(day)
+        self.assertEqual(day.to_date_string(), "2022-06-30")
+        self.assertEqual(day.to_date_timestamp(), int(datetime(2022, 6, 30).timestamp()))
+        self.assertEqual(day.weekday_number, 3)
+        self.assertEqual(day.week, 5)
@@ -102,6 +102,16 @@ class TestClient(unittest.TestCase):
         task_list = self.client.group_tasks_by_project()
         self.assertTrue(len(task_list) == 9)
 
+    def test_filter_tasks(self):
+        self.client.add_task(AddArgs(name="Clean car", label="@waiting_on", project="home", due_date="today"))
+        self.client.add_task(AddArgs(name="Clean bathroom", label="", project="home", due_date="tomorrow"))
+        self.client.add_task(AddArgs(name="Clean desk", label="@waiting_on", project="work", due_date="today"))
+        task_list = self.client.filter_tasks(FilterArgs(project="home", status="incomplete", name="clean",
+                                                        min_date="today", max_date="today"))
+        self.assertEqual([task.name for task in task_list], ["Clean car"])
+
+        self.assertIsNone(self.client.filter_tasks(FilterArgs(name="!!")))
+
     def test_encoding_decoding_date_string(self):
         now = datetime.now()
         date_string = now.strftime("%m-%d-%Y")
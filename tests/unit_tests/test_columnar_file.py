@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.model.time_card import TimeCard
+from taskmgr.lib.presenter.columnar_file import ColumnarTasksFile, ColumnarTimeCardsFile, InvalidColumnarFile, \
+    ColumnarFile
+
+
+class TestColumnarFile(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, f"backup{ColumnarFile.extension}")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def create_tasks(count: int) -> list:
+        task_list = list()
+        for index in range(1, count + 1):
+            task = Task(f"task{index}")
+            task.index = index
+            task.label = "call" if index % 2 else "waiting"
+            task.project = "work"
+            task.time_spent = index * 0.25
+            task.due_date = "2021-07-12"
+            task.due_date_timestamp = 1626048000
+            task.completed = index % 3 == 0
+            task.unique_id = f"{index:032x}"
+            task.last_updated = "2021-07-12 10:00:00"
+            task_list.append(task)
+        return task_list
+
+    def test_write_and_read_tasks(self):
+        task_list = self.create_tasks(7)
+        row_count = ColumnarTasksFile().write(self.path, iter([task_list[:4], task_list[4:]]))
+        self.assertEqual(row_count, 7)
+        self.assertTrue(ColumnarFile.is_columnar(self.path))
+
+        chunk_list = list(ColumnarTasksFile().read_chunks(self.path))
+        self.assertListEqual([len(chunk) for chunk in chunk_list], [4, 3])
+        read_list = [task for chunk in chunk_list for task in chunk]
+        self.assertListEqual([dict(task) for task in read_list], [dict(task) for task in task_list])
+        self.assertTrue(read_list[2].completed)
+        self.assertEqual(read_list[6].time_spent, 1.75)
+
+    def test_write_and_read_time_cards(self):
+        time_card = TimeCard()
+        time_card.index = 1
+        time_card.date = "2021-07-12"
+        time_card.date_timestamp = 1626048000
+        time_card.time_in = "08:00"
+        time_card.time_out = "12:00"
+        time_card.elapsed_time = "4:00"
+        time_card.unique_id = "bc2d81c94e3844228ccb9bfe2613c089"
+
+        ColumnarTimeCardsFile().write(self.path, [[time_card]])
+        read_list = [obj for chunk in ColumnarTimeCardsFile().read_chunks(self.path) for obj in chunk]
+        self.assertDictEqual(dict(read_list[0]), dict(time_card))
+
+    def test_none_values_should_be_read_as_none(self):
+        task_list = [Task("no id")] + self.create_tasks(2)
+        task_list[1].last_updated = ""
+        task_list[2].last_updated = None
+        ColumnarTasksFile().write(self.path, [task_list])
+
+        read_list = [task for chunk in ColumnarTasksFile().read_chunks(self.path) for task in chunk]
+        self.assertIsNone(read_list[0].unique_id)
+        self.assertEqual(read_list[1].unique_id, task_list[1].unique_id)
+        self.assertEqual(read_list[1].last_updated, "")
+        self.assertIsNone(read_list[2].last_updated)
+
+    def test_read_with_other_kind(self):
+        ColumnarTasksFile().write(self.path, [self.create_tasks(1)])
+        with self.assertRaises(InvalidColumnarFile):
+            list(ColumnarTimeCardsFile().read_chunks(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from redis import ConnectionError
+
+from taskmgr.lib.database.connection_health import ConnectionHealth
+
+
+class FakeRedis:
+
+    def __init__(self, fail_count: int = 0):
+        self.fail_count = fail_count
+        self.ping_count = 0
+
+    def ping(self):
+        self.ping_count += 1
+        if self.ping_count <= self.fail_count:
+            raise ConnectionError("Connection refused")
+        return True
+
+
+class TestConnectionHealth(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.health = ConnectionHealth(ttl=30, retry_count=3, backoff=0)
+
+    def test_check_should_skip_ping_when_fresh(self):
+        db = FakeRedis()
+        self.assertTrue(self.health.check(db))
+        self.assertTrue(self.health.check(db))
+        self.assertEqual(db.ping_count, 1)
+
+    def test_check_should_ping_when_ttl_expired(self):
+        self.health.ttl = 0
+        db = FakeRedis()
+        self.health.check(db)
+        self.health.check(db)
+        self.assertEqual(db.ping_count, 2)
+
+    def test_check_should_retry_until_connected(self):
+        db = FakeRedis(fail_count=2)
+        self.assertTrue(self.health.check(db))
+        self.assertEqual(db.ping_count, 3)
+
+    def test_check_should_fail_after_retry_count(self):
+        db = FakeRedis(fail_count=3)
+        self.assertFalse(self.health.check(db))
+        self.assertFalse(self.health.is_fresh())
+
+    def test_track_should_mark_failure_on_connection_error(self):
+        self.health.mark_success()
+        with self.assertRaises(ConnectionError):
+            with self.health.track():
+                raise ConnectionError("Connection reset")
+        self.assertFalse(self.health.is_fresh())
@@ -1,7 +1,8 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from taskmgr.lib.model.calendar import Today
+from taskmgr.lib.model.calendar import Calendar, Today
 from taskmgr.lib.model.day import Day
 from taskmgr.lib.presenter.date_time_generator import DateTimeGenerator
 from taskmgr.lib.variables import CommonVariables
@@ -144,6 +145,58 @@ class TestDateTimeGenerator(unittest.TestCase):
         day = self.date_time_generator.get_day("sep 24")
         self.assertIn("09-24", day.to_date_string())
 
+    def test_parse_returns_handler_name(self):
+        self.date_time_generator.current_day = Day(self.march1)
+        self.assertEqual(self.date_time_generator.parse("Tomorrow").handler_name, "NormalLanguageDateHandler")
+        self.assertEqual(self.date_time_generator.parse("every m").handler_name, "RecurringDateHandler")
+        self.assertEqual(self.date_time_generator.parse("mar 4").handler_name, "ShortDateHandler")
+        self.assertEqual(self.date_time_generator.parse("2019-03-04").handler_name, "YearMonthDateHandler")
+        self.assertIsNone(self.date_time_generator.parse("2019-02-30"))
+        self.assertIsNone(self.date_time_generator.parse("every month"))
+
+    def test_parse_single_date(self):
+        self.assertIsNone(self.date_time_generator.parse("this month", single_date=True))
+        self.assertIsNone(self.date_time_generator.parse("every day", single_date=True))
+        self.assertIsNotNone(self.date_time_generator.parse("f", single_date=True))
+
+    def test_parse_from_threads(self):
+        expression_list = ["today", "next week", "every weekday", "2019-03-04", "sep 24", "th"] * 50
+        expected_list = [len(self.date_time_generator.get_days(expression)) for expression in expression_list]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            count_list = list(executor.map(lambda expression: len(self.date_time_generator.get_days(expression)),
+                                           expression_list))
+        self.assertListEqual(count_list, expected_list)
+
+    def test_cache_returns_copies(self):
+        DateTimeGenerator.cache.clear()
+        self.date_time_generator.current_day = Day(self.march1)
+        day_list = self.date_time_generator.get_days("this week")
+        day_list.clear()
+
+        self.assertEqual(len(self.date_time_generator.get_days("This Week ")), 7)
+        self.assertEqual(DateTimeGenerator.cache.miss_count, 1)
+        self.assertEqual(DateTimeGenerator.cache.hit_count, 1)
+        self.assertIsInstance(self.date_time_generator.parse("this week").day_list, tuple)
+
+    def test_cached_day_cannot_be_changed(self):
+        self.date_time_generator.current_day = Day(self.march1)
+        day = self.date_time_generator.get_day("today")
+        with self.assertRaises(AttributeError):
+            day.day_number = 15
+        Calendar().get_last_day_in_month(day)
+        Calendar().get_first_day_in_month(self.date_time_generator.get_day("tomorrow"))
+
+        self.assertEqual(self.date_time_generator.get_day("today").to_date_string(), "2019-03-01")
+        self.assertEqual(self.date_time_generator.get_day("tomorrow").to_date_string(), "2019-03-02")
+        self.assertEqual(self.date_time_generator.current_day.to_date_string(), "2019-03-01")
+
+    def test_cache_is_keyed_by_current_day(self):
+        self.date_time_generator.current_day = Day(self.march1)
+        self.assertEqual(self.date_time_generator.get_day("tomorrow").to_date_string(), "2019-03-02")
+        self.date_time_generator.current_day = Day(datetime.strptime('2019-03-10', self.vars.date_format))
+        self.assertEqual(self.date_time_generator.get_day("tomorrow").to_date_string(), "2019-03-11")
+        self.assertEqual(self.date_time_generator.current_day.to_date_string(), "2019-03-10")
+
     def test_get_time(self):
         time_obj = self.date_time_generator.get_time("10am")
         self.assertEqual(time_obj.hour, 10)
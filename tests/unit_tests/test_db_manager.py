@@ -0,0 +1,45 @@
+import unittest
+
+from taskmgr.lib.database.db_manager import DatabaseManager, DatabaseUnavailable
+from taskmgr.lib.variables import CommonVariables
+
+
+class UnavailableDatabase:
+
+    def __init__(self):
+        self.index_count = 0
+
+    def exists(self) -> bool:
+        return False
+
+    def create_index(self):
+        self.index_count += 1
+
+
+class TestDatabaseManager(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vars = CommonVariables('test_variables.ini')
+
+    def test_get_instance_should_return_shared_manager(self):
+        mgr = DatabaseManager.get_instance(self.vars)
+        self.assertIs(mgr, DatabaseManager.get_instance(CommonVariables('test_variables.ini')))
+
+    def test_pool_stats(self):
+        stats = DatabaseManager(self.vars).get_pool_stats()
+        self.assertEqual(stats["max_connections"], self.vars.redis_max_connections)
+        self.assertEqual(stats["created"], 0)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["waits"], 0)
+
+    def test_models_should_be_reused(self):
+        mgr = DatabaseManager(self.vars)
+        self.assertIs(mgr.get_tasks_model(), mgr.get_tasks_model())
+        self.assertIs(mgr.get_tasks_db(), mgr.get_tasks_db())
+
+    def test_initialize_should_raise_when_redis_is_unavailable(self):
+        mgr = DatabaseManager(self.vars)
+        redis_db = UnavailableDatabase()
+        with self.assertRaises(DatabaseUnavailable):
+            mgr.initialize(redis_db)
+        self.assertEqual(redis_db.index_count, 0)
@@ -0,0 +1,99 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.presenter.file_manager import CsvTasksFile, UnmatchedColumns
+
+
+class TestFileManager(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file = CsvTasksFile()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_file(self, row_count: int) -> str:
+        path = os.path.join(self.temp_dir.name, f"tasks_{row_count}.csv")
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CsvTasksFile.get_field_names())
+            writer.writeheader()
+            for index in range(1, row_count + 1):
+                writer.writerow({"index": index, "done": False, "name": f"task{index}", "project": "home",
+                                 "label": "current", "time_spent": 0.5, "due_date": "2021-07-12",
+                                 "last_updated": "2021-07-12 10:00:00", "deleted": False,
+                                 "unique_id": f"{index:032x}"})
+        return path
+
+    def get_peak_memory(self, path: str) -> int:
+        tracemalloc.start()
+        for _ in self.file.read_chunks(path):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    def test_read_chunks(self):
+        path = self.create_file(1200)
+        chunk_list = list(self.file.open_chunks(path, CsvTasksFile.get_field_names(), 500))
+        self.assertListEqual([len(chunk) for chunk in chunk_list], [500, 500, 200])
+        self.assertEqual(chunk_list[2][-1]["name"], "task1200")
+        self.assertEqual(len(self.file.read_file(path)), 1200)
+
+    def test_read_chunks_with_unexpected_columns(self):
+        path = self.create_file(10)
+        with self.assertRaises(UnmatchedColumns):
+            list(self.file.open_chunks(path, ["index", "name"]))
+
+    def test_save_chunks_as_compressed_json_lines(self):
+        export_file = CsvTasksFile("jsonl", "gzip")
+        export_file.output_dir = self.temp_dir.name
+        task_list = [Task(f"task{index}") for index in range(1, 4)]
+        for index, task in enumerate(task_list, start=1):
+            task.index = index
+
+        file_name = f"tasks{export_file.get_extension()}"
+        self.assertEqual(file_name, "tasks.jsonl.gz")
+        export_file.save_chunks(file_name, iter([task_list[2:], task_list[:2]]),
+                                CsvTasksFile.get_field_names(), CsvTasksFile.write_row)
+
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, file_name)))
+        with gzip.open(os.path.join(self.temp_dir.name, file_name), 'rt') as jsonl_file:
+            row_list = [json.loads(line) for line in jsonl_file]
+        self.assertListEqual([row["name"] for row in row_list], ["task3", "task1", "task2"])
+
+    def test_memory_does_not_grow_with_file_size(self):
+        small_peak = self.get_peak_memory(self.create_file(5000))
+        large_peak = self.get_peak_memory(self.create_file(40000))
+        self.assertLess(large_peak, small_peak * 1.5)
+
+    def test_json_lines_export_should_round_trip(self):
+        export_file = CsvTasksFile("jsonl", "gzip")
+        export_file.output_dir = self.temp_dir.name
+        task_list = [Task(f"task{index}") for index in range(1, 4)]
+        for index, task in enumerate(task_list, start=1):
+            task.index = index
+            task.time_spent = 0.5
+        task_list[0].completed = True
+
+        path = export_file.save_chunks("tasks.jsonl.gz", iter([task_list]),
+                                       CsvTasksFile.get_field_names(), CsvTasksFile.write_row)
+        row_list = self.file.read_file(path)
+        self.assertListEqual([row["name"] for row in row_list], ["task1", "task2", "task3"])
+        self.assertEqual(row_list[0]["done"], "True")
+        self.assertEqual(row_list[0]["time_spent"], "0.5")
+
+        csv_path = self.create_file(3)
+        with open(csv_path, 'rb') as csv_file, gzip.open(f"{csv_path}.gz", 'wb') as gz_file:
+            gz_file.write(csv_file.read())
+        self.assertListEqual(self.file.read_file(f"{csv_path}.gz"), self.file.read_file(csv_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import copy
+import unittest
+
+from taskmgr.lib.model.snapshot import Snapshot
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.model.time_card import TimeCard
+
+
+class TestModels(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.task = Task("Task1")
+        self.task.index = 1
+        self.task.unique_id = "a1"
+        self.task.label = "home"
+        self.task.project = "work"
+        self.task.due_date = "2021-07-13"
+        self.task.due_date_timestamp = 1626159600
+        self.task.time_spent = 1.5
+        self.task.completed = True
+
+        self.time_card = TimeCard()
+        self.time_card.index = 2
+        self.time_card.unique_id = "b2"
+        self.time_card.date = "2021-07-13"
+        self.time_card.date_timestamp = 1626159600
+        self.time_card.time_in = "0800"
+        self.time_card.time_out = "1000"
+        self.time_card.elapsed_time = "2:00"
+
+        self.snapshot = Snapshot()
+        self.snapshot.index = 3
+        self.snapshot.unique_id = "c3"
+        self.snapshot.due_date = "2021-07-13"
+        self.snapshot.due_date_timestamp = 1626159600
+        self.snapshot.task_count = 4
+        self.snapshot.complete_count = 1
+        self.snapshot.incomplete_count = 3
+        self.snapshot.total_time = 2.5
+
+    def test_task_round_trip(self):
+        task = Task().deserialize(dict(self.task))
+        self.assertDictEqual(dict(task), dict(self.task))
+        self.assertTrue(task.completed)
+        self.assertEqual(task, self.task)
+
+    def test_time_card_round_trip(self):
+        time_card = TimeCard().deserialize(dict(self.time_card))
+        self.assertDictEqual(dict(time_card), dict(self.time_card))
+        self.assertEqual(time_card, self.time_card)
+
+    def test_snapshot_round_trip(self):
+        snapshot = Snapshot().deserialize(dict(self.snapshot))
+        self.assertDictEqual(dict(snapshot), dict(self.snapshot))
+
+    def test_deserialize_should_skip_document_keys(self):
+        document = dict(self.task)
+        document.update({"id": "Task:1", "payload": None})
+        task = Task().deserialize(document)
+        self.assertDictEqual(dict(task), dict(self.task))
+
+    def test_models_should_not_have_instance_dict(self):
+        for obj in [self.task, self.time_card, self.snapshot]:
+            self.assertFalse(hasattr(obj, "__dict__"))
+            with self.assertRaises(AttributeError):
+                obj.vars = None
+
+    def test_deepcopy_should_copy_fields(self):
+        task = copy.deepcopy(self.task)
+        self.assertDictEqual(dict(task), dict(self.task))
+        task.name = "Task2"
+        self.assertEqual(self.task.name, "Task1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from taskmgr.lib.database.pager import Pager
+from taskmgr.lib.database.generic_db import GenericDatabase
+from taskmgr.lib.database.pager import Page, Cursor, InvalidCursor
+from taskmgr.lib.model.task import Task
 
 
 class TestPager(unittest.TestCase):
@@ -10,53 +12,86 @@ class TestPager(unittest.TestCase):
     def tearDown(self) -> None: pass
 
     def test_get_page_count(self):
-        pager = Pager(6500, 100)
-        self.assertTrue(pager.page_count == 65)
+        page = Page(1, 100, 6500)
+        self.assertTrue(page.page_count == 65)
+
+    def test_page_count_includes_trailing_items(self):
+        self.assertEqual(Page(1, 10, 54).page_count, 6)
+        self.assertEqual(Page(1, 10, 50).page_count, 5)
 
     def test_when_item_count_is_one_offset_should_start_at_zero(self):
-        pager = Pager(1, 11)
-        page = pager.get_page(1)
+        page = GenericDatabase.calc_limits(1, 1, 11)
         self.assertEqual(page.offset, 0)
+        self.assertTrue(page.pager_disabled)
 
     def test_when_item_count_is_zero(self):
-        pager = Pager(0, 10)
-        page = pager.get_page(1)
+        page = GenericDatabase.calc_limits(0, 1, 10)
         self.assertEqual(page.offset, 0)
         self.assertEqual(page.row_limit, 10)
 
     def test_get_pages(self):
-        pager = Pager(58, 10)
-
-        page = pager.get_page(1)
-        self.assertEqual(page.offset, 0)
-        self.assertEqual(page.row_limit, pager.row_limit)
-
-        page = pager.get_page(2)
-        self.assertEqual(page.offset, 10)
-        self.assertEqual(page.row_limit, pager.row_limit)
-
-        page = pager.get_page(3)
-        self.assertEqual(page.offset, 20)
-        self.assertEqual(page.row_limit, pager.row_limit)
+        for page_number in range(1, 7):
+            page = GenericDatabase.calc_limits(58, page_number, 10)
+            self.assertEqual(page.offset, (page_number - 1) * 10)
+            self.assertEqual(page.row_limit, 10)
+            self.assertEqual(page.page_count, 6)
 
-        page = pager.get_page(4)
-        self.assertEqual(page.offset, 30)
-        self.assertEqual(page.row_limit, pager.row_limit)
-
-        page = pager.get_page(5)
-        self.assertEqual(page.offset, 40)
-        self.assertEqual(page.row_limit, pager.row_limit)
-
-        page = pager.get_page(6)
-        self.assertEqual(page.offset, 50)
-        self.assertEqual(page.row_limit, pager.row_limit)
-
-        page = pager.get_page(7)
-        self.assertIsNone(page)
+        with self.assertRaises(IndexError):
+            GenericDatabase.calc_limits(58, 7, 10)
 
     def test_when_page_is_zero(self):
-        pager = Pager(100, 11)
-        page = pager.get_page(0)
+        page = GenericDatabase.calc_limits(100, 0, 11)
         self.assertEqual(page.offset, 0)
-        self.assertEqual(page.row_limit, 100)
-
+        self.assertTrue(page.pager_disabled)
+
+    def test_encode_cursor(self):
+        cursor = Cursor(1626048000, 42, 3, Cursor.PREVIOUS).encode()
+        position = Cursor.decode(cursor)
+        self.assertEqual((position.sort_value, position.index, position.page_number, position.direction),
+                         (1626048000, 42, 3, Cursor.PREVIOUS))
+
+    def test_decode_first_cursor(self):
+        for cursor in [None, "", Cursor.FIRST]:
+            position = Cursor.decode(cursor)
+            self.assertEqual(position.page_number, 1)
+            self.assertEqual(position.get_query_string("due_date_timestamp", "@deleted:False"), "@deleted:False")
+
+    def test_decode_invalid_cursor(self):
+        for cursor in ["abc", "not a cursor!", Cursor(1, 2, 0).encode(), Cursor(1, 2, 1, "up").encode()]:
+            with self.assertRaises(InvalidCursor):
+                Cursor.decode(cursor)
+
+    def test_cursor_query_string(self):
+        position = Cursor(100, 7, 2)
+        self.assertEqual(position.get_query_string("due_date_timestamp", "@deleted:False"),
+                         "(@deleted:False) (@due_date_timestamp:[-inf (100] | "
+                         "(@due_date_timestamp:[100 100] @index:[-inf (7]))")
+
+        position = Cursor(100, 7, 1, Cursor.PREVIOUS)
+        self.assertEqual(position.get_query_string("due_date_timestamp"),
+                         "(@due_date_timestamp:[(100 +inf] | (@due_date_timestamp:[100 100] @index:[(7 +inf]))")
+
+    def test_create_cursor_page(self):
+        task_list = list()
+        for index in [9, 8]:
+            task = Task()
+            task.index = index
+            task.due_date_timestamp = 100
+            task_list.append(task)
+
+        page = GenericDatabase.create_cursor_page(Cursor(200, 10, 2), task_list, "due_date_timestamp", 2, 6)
+        self.assertFalse(page.pager_disabled)
+        next_position = Cursor.decode(page.next_cursor)
+        self.assertEqual((next_position.sort_value, next_position.index, next_position.page_number), (100, 8, 3))
+        prev_position = Cursor.decode(page.prev_cursor)
+        self.assertEqual((prev_position.index, prev_position.page_number), (9, 1))
+        self.assertTrue(prev_position.is_reversed())
+
+        page = GenericDatabase.create_cursor_page(Cursor(200, 10, 3), task_list, "due_date_timestamp", 2, 6)
+        self.assertIsNone(page.next_cursor)
+
+    def test_to_documents(self):
+        rows = [[b"index", b"3", b"name", b"task3", b"due_date_timestamp", b"100", b"unique_id", b"abc"]]
+        document = GenericDatabase.to_documents(rows)[0]
+        task = Task().deserialize(document.__dict__)
+        self.assertEqual((task.index, task.name, task.due_date_timestamp, task.unique_id), (3, "task3", 100, "abc"))
@@ -1,22 +1,87 @@
 import unittest
+from datetime import datetime
 
-from taskmgr.lib.database.generic_db import QueryParams
+from taskmgr.lib.database.generic_db import DayQuery, GenericDatabase
+from taskmgr.lib.database.query_builder import QueryBuilder, Equals, Between, InvalidQuery
+from taskmgr.lib.model.calendar import Calendar
+from taskmgr.lib.model.day import Day
 
 
 class TestQueryParams(unittest.TestCase):
 
     def test_single_string_param(self):
-        query = QueryParams("label", "my_label").build()
+        query = QueryBuilder.select("label", "my_label")
         self.assertEqual(query.query_string(), '@label:my_label')
 
     def test_single_bool_param(self):
-        query = QueryParams("completed", True).build()
+        query = QueryBuilder.select("completed", True)
         self.assertEqual(query.query_string(), '@completed:True')
 
     def test_single_int_param(self):
-        query = QueryParams("due_date_timestamp", 129345678).build()
+        query = QueryBuilder.select("due_date_timestamp", 129345678)
         self.assertEqual(query.query_string(), '@due_date_timestamp:[129345678 129345678]')
 
     def test_double_int_param(self):
-        query = QueryParams("due_date_timestamp", 129345678, 2324568989).build()
+        query = QueryBuilder.select("due_date_timestamp", 129345678, 2324568989)
         self.assertEqual(query.query_string(), '@due_date_timestamp:[129345678 2324568989]')
+
+    def test_day_query_should_collapse_consecutive_days(self):
+        day_list = Calendar().get_this_month(Day(datetime(2022, 6, 7)))
+        query = DayQuery("due_date_timestamp", day_list).build()
+        first = day_list[0].to_date_timestamp()
+        last = day_list[-1].to_date_timestamp()
+        self.assertEqual(query.query_string(), f'@due_date_timestamp:[{first} {last}]')
+
+    def test_day_query_should_combine_sparse_days(self):
+        day_list = Calendar.get_work_week_days(Day(datetime(2022, 6, 6)), 1)
+        ranges = DayQuery("date_timestamp", day_list).get_ranges()
+        self.assertEqual(len(ranges), 5)
+        self.assertEqual(ranges[0], (day_list[0].to_date_timestamp(), day_list[4].to_date_timestamp()))
+
+        query = DayQuery("date_timestamp", day_list).build()
+        self.assertEqual(query.query_string().count(" | "), 4)
+
+    def test_day_query_without_days(self):
+        self.assertIsNone(DayQuery("due_date_timestamp", []).build())
+
+    def test_escape_punctuation(self):
+        self.assertEqual(GenericDatabase.escape("ABC-1343: Task1"), "ABC\\-1343\\:\\ Task1")
+        self.assertEqual(GenericDatabase.escape("bc2d81c94e3844228ccb9bfe2613c089"), "bc2d81c94e3844228ccb9bfe2613c089")
+
+    def test_select_should_match_text_terms(self):
+        query = QueryBuilder.select("name", "ABC-1343: Task1 | @x")
+        self.assertEqual(query.query_string(), '@name:"ABC 1343 Task1 x"')
+        self.assertIsNone(QueryBuilder.select("name", "-- |"))
+        self.assertIsNone(QueryBuilder.select("name", None))
+
+    def test_select_should_escape_tags(self):
+        query = QueryBuilder.select("project", "home-office 2", tag_fields=["project"])
+        self.assertEqual(query.query_string(), '@project:{home\\-office\\ 2}')
+
+    def test_builder_should_combine_conditions(self):
+        builder = QueryBuilder().equals("project", "home").equals("completed", False)
+        builder.between("due_date_timestamp", 100, 200).sort_by("due_date_timestamp", asc=False)
+        query = builder.build()
+        self.assertEqual(query.query_string(),
+                         '@project:home @completed:False @due_date_timestamp:[100 200]')
+        self.assertEqual(query.get_args()[1:4], ["SORTBY", "due_date_timestamp", "DESC"])
+        self.assertFalse(builder.has_limit())
+
+    def test_builder_operators(self):
+        condition = (Equals("label", "work") | Equals("label", "home")) & ~Between("index", None, 10)
+        builder = QueryBuilder().where(condition).prefix("name", "rev").matches("weekly call", "name")
+        self.assertEqual(builder.to_string(),
+                         '((@label:work | @label:home) -@index:[-inf 10]) @name:(rev*) @name:(weekly call)')
+
+    def test_builder_negation_only(self):
+        builder = QueryBuilder().exclude(Equals("deleted", True))
+        self.assertEqual(builder.to_string(), "* -@deleted:True")
+        self.assertEqual(QueryBuilder().to_string(), "*")
+
+    def test_builder_limit(self):
+        query = QueryBuilder().equals("label", "work").limit(20, 10).build()
+        self.assertEqual(query.get_args()[-3:], ["LIMIT", 20, 10])
+
+    def test_builder_without_terms(self):
+        with self.assertRaises(InvalidQuery):
+            QueryBuilder().matches("!!").build()
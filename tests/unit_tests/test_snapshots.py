@@ -1,7 +1,13 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime
 
 from taskmgr.lib.database.db_manager import DatabaseManager
+from taskmgr.lib.model.day import Day
 from taskmgr.lib.model.snapshot import Snapshot
+from taskmgr.lib.model.task import Task
+from taskmgr.lib.presenter.snapshots import Snapshots
 from taskmgr.lib.variables import CommonVariables
 
 
@@ -22,6 +28,88 @@ class TestSnapshots(unittest.TestCase):
         self.tasks.clear()
         self.snapshots.clear()
 
+    @staticmethod
+    def create_task(name: str, dt: datetime) -> Task:
+        day = Day(dt)
+        task = Task(name)
+        task.due_date = day.to_date_string()
+        task.due_date_timestamp = day.to_date_timestamp()
+        return task
+
+    def test_deltas_of_completed_task(self):
+        before_task = self.create_task("task1", datetime(2021, 7, 12))
+        after_task = deepcopy(before_task)
+        after_task.completed = True
+        after_task.time_spent = 1.5
+
+        delta_dict = Snapshots.get_deltas([(before_task, after_task)])
+        delta = delta_dict[before_task.due_date_timestamp]
+        self.assertEqual(delta["task_count"], 0)
+        self.assertEqual(delta["complete_count"], 1)
+        self.assertEqual(delta["incomplete_count"], -1)
+        self.assertEqual(delta["total_time"], 1.5)
+
+    def test_deltas_of_rescheduled_task(self):
+        before_task = self.create_task("task1", datetime(2021, 7, 12))
+        after_task = self.create_task("task1", datetime(2021, 7, 13))
+        unchanged_task = self.create_task("task2", datetime(2021, 7, 14))
+
+        delta_dict = Snapshots.get_deltas([(before_task, after_task), (unchanged_task, unchanged_task)])
+        self.assertEqual(len(delta_dict), 2)
+        self.assertEqual(delta_dict[before_task.due_date_timestamp]["task_count"], -1)
+        self.assertEqual(delta_dict[after_task.due_date_timestamp]["task_count"], 1)
+
+    def test_drift_should_be_returned_as_increments(self):
+        existing_snapshot = Snapshot()
+        existing_snapshot.due_date_timestamp = 1626048000
+        existing_snapshot.task_count = 3
+        existing_snapshot.incomplete_count = 3
+        existing_snapshot.total_time = 1.0
+
+        expected_snapshot = deepcopy(existing_snapshot)
+        expected_snapshot.task_count = 2
+        expected_snapshot.incomplete_count = 2
+        expected_snapshot.total_time = 1.5
+        expected_snapshot.actual_time = "1:00"
+        missing_snapshot = Snapshot()
+        missing_snapshot.due_date_timestamp = 1626134400
+
+        increment_list, append_list = Snapshots.get_drifted(
+            {1626048000: expected_snapshot, 1626134400: missing_snapshot}, [existing_snapshot])
+        self.assertEqual(increment_list, [(existing_snapshot, {"task_count": -1, "incomplete_count": -1,
+                                                               "total_time": 0.5, "actual_time": "1:00"})])
+        self.assertEqual(append_list, [missing_snapshot])
+
+    def test_apply_task_changes(self):
+        t1_list = self.tasks.add("task1", "label1", "project1", "2021-07-12")
+        self.snapshots.apply_task_changes([(None, task) for task in t1_list])
+        t2_list = self.tasks.add("task2", "label1", "project1", "2021-07-12")
+        self.snapshots.apply_task_changes([(None, task) for task in t2_list])
+
+        t1 = self.tasks.get_task_by_name("task1")
+        before_task = deepcopy(t1)
+        self.tasks.complete(t1)
+        self.snapshots.apply_task_changes([(before_task, t1)])
+
+        summary = self.snapshots.get_all().to_list()[0]
+        self.assertEqual(summary.task_count, 2)
+        self.assertEqual(summary.complete_count, 1)
+        self.assertEqual(summary.incomplete_count, 1)
+        self.assertEqual(self.snapshots.reconcile(), 0)
+
+    def test_concurrent_changes_should_create_one_snapshot(self):
+        def add_task(index):
+            task_list = self.tasks.add(f"task{index}", "label1", "project1", "2021-07-12")
+            self.snapshots.apply_task_changes([(None, task) for task in task_list])
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(add_task, range(8)))
+        self.snapshots.reconcile()
+
+        snapshot_list = self.snapshots.get_all().to_list()
+        self.assertEqual(len(snapshot_list), 1)
+        self.assertEqual(snapshot_list[0].task_count, 8)
+
     def test_count_all(self):
         self.tasks.add("task1", "label1", "project1", "today")
         t1 = self.tasks.get_task_by_name("task1")
@@ -115,10 +203,33 @@ class TestSnapshots(unittest.TestCase):
         self.assertEqual(snapshot.actual_time, "8:15")
         self.assertEqual(snapshot.due_date, "2021-07-12")
 
+    def test_get_partitions(self):
+        min_timestamp = Day(datetime(2021, 1, 1)).to_date_timestamp()
+        max_timestamp = Day(datetime(2021, 3, 15)).to_date_timestamp()
+        partition_list = Snapshots.get_partitions(min_timestamp, max_timestamp, 31)
 
+        self.assertEqual(len(partition_list), 3)
+        self.assertEqual(partition_list[0], (min_timestamp, Day(datetime(2021, 1, 31)).to_date_timestamp()))
+        self.assertEqual(partition_list[1][0], Day(datetime(2021, 2, 1)).to_date_timestamp())
+        self.assertEqual(partition_list[2][1], max_timestamp)
 
+    def test_rebuild(self):
+        self.tasks.add("task1", "label1", "project1", "2021-07-12")
+        self.tasks.add("task2", "label1", "project1", "2021-07-12")
+        self.tasks.add("task3", "label1", "project1", "2021-09-01")
+        self.tasks.add("task4", "label1", "project1", "2022-01-03")
+        self.time_cards.add("8am", "12pm", "2021-07-12")
 
+        progress = self.snapshots.rebuild(workers=2)
+        self.assertEqual(progress.task_count, 4)
+        self.assertEqual(progress.snapshot_count, 3)
 
+        snapshot_list = self.snapshots.get_all().to_list()
+        self.assertEqual(len(snapshot_list), 3)
+        first_snapshot = snapshot_list[-1]
+        self.assertEqual(first_snapshot.due_date, "2021-07-12")
+        self.assertEqual(first_snapshot.task_count, 2)
+        self.assertEqual(first_snapshot.actual_time, "4:00")
 
-
-
+        self.snapshots.rebuild()
+        self.assertEqual(self.snapshots.get_all().item_count, 3)
@@ -1,5 +1,7 @@
 import unittest
 
+from redis import Redis
+
 from taskmgr.lib.database.db_manager import DatabaseManager
 from taskmgr.lib.model.snapshot import Snapshot
 from taskmgr.lib.variables import CommonVariables
@@ -73,6 +75,20 @@ class TestSnapshotsDatabase(unittest.TestCase):
         snapshot = self.db.get_object("unique_id", self.s1.unique_id)
         self.assertEqual(snapshot.unique_id, self.s1.unique_id)
 
+    def test_append_if_missing_should_find_bulk_appended_snapshots(self):
+        self.db.append_objects([self.s1, self.s2])
+        snapshot = Snapshot()
+        snapshot.due_date = self.s2.due_date
+        snapshot.due_date_timestamp = self.s2.due_date_timestamp
+
+        existing_snapshot = self.db.append_if_missing(snapshot)
+        self.assertEqual(existing_snapshot.unique_id, self.s2.unique_id)
+        self.assertEqual(self.db.get_all().item_count, 2)
+
+        self.db.clear()
+        db = Redis(host=self.vars.redis_host, port=self.vars.redis_port)
+        self.assertFalse(db.exists(self.db.date_key_name))
+
     def test_object_serialization(self):
         self.db.append_object(self.s1)
         result = self.db.get_all()
@@ -56,3 +56,27 @@ class TestTaskImporter(unittest.TestCase):
         self.assertTrue(sync_results_list[0] == SyncAction.ADDED)
         self.assertTrue(sync_results_list[1] == SyncAction.UPDATED)
         self.assertTrue(sync_results_list[2] == SyncAction.DELETED)
+
+    def test_import_tasks_with_bulk_save(self):
+        self.tasks.add("Task1", "current", "home", "2021-07-12")
+        self.tasks.add("Task2", "current", "home", "2021-07-13")
+        task1 = self.tasks.get_task_by_name("Task1")
+        task2 = self.tasks.get_task_by_name("Task2")
+
+        updated_task = Task("Task1")
+        updated_task.label = "updated"
+        updated_task.unique_id = task1.unique_id
+
+        deleted_task = Task("Task2")
+        deleted_task.deleted = True
+        deleted_task.unique_id = task2.unique_id
+
+        added_task = Task("Task3")
+        added_task.unique_id = "3413035ab1f14cccb70a315e42c3242e"
+
+        sync_results = self.importer.import_objects([updated_task, deleted_task, added_task], bulk_save=True)
+        self.assertListEqual(sync_results.get_list(), [SyncAction.UPDATED, SyncAction.DELETED, SyncAction.ADDED])
+
+        self.assertEqual(self.tasks.get_all().item_count, 3)
+        self.assertEqual(self.tasks.get_task_by_index(task1.index).label, "updated")
+        self.assertTrue(self.tasks.get_task_by_index(task2.index).deleted)
@@ -19,11 +19,9 @@ class TestTaskSync(unittest.TestCase):
     def test_import_action_can_delete(self):
 
         remote_task = Task("Task1")
-        remote_task.external_id = "100"
         remote_task.deleted = True
 
         local_task = Task("Task1")
-        local_task.external_id = "100"
         local_task.deleted = False
 
         action = ImportActions(local_task, remote_task)
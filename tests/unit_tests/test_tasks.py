@@ -36,6 +36,28 @@ class TestTasks(unittest.TestCase):
         task_list = result.to_list()
         self.assertTrue(len(task_list) == 10)
 
+    def test_get_all_by_cursor(self):
+        for number in range(25):
+            self.tasks.add(f"Task{number}", "waiting", "work", ["may 2", "may 3", "may 4"][number % 3])
+
+        index_list = list()
+        cursor = None
+        page_number = 0
+        while True:
+            result = self.tasks.get_all_by_cursor(cursor)
+            page = result.get_page()
+            page_number += 1
+            self.assertEqual(page.page_number, page_number)
+            self.assertEqual(page.page_count, 3)
+            index_list.extend([task.index for task in result.to_list()])
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(sorted(index_list), list(range(1, 26)))
+        previous_result = self.tasks.get_all_by_cursor(page.prev_cursor)
+        self.assertEqual([task.index for task in previous_result.to_list()], index_list[10:20])
+
     def test_edit_label_task(self):
         self.tasks.add("Task1", "waiting", "work", "may 2")
         original_task = self.tasks.get_task_by_name("Task1")
@@ -107,6 +129,23 @@ class TestTasks(unittest.TestCase):
         unique_label_list = self.tasks.get_label_list()
         self.assertListEqual(unique_label_list, ['call', 'computer', 'office', 'waiting'])
 
+    def test_group_by_label(self):
+        self.tasks.add("Task1", "call", "work", "may 7")
+        self.tasks.add("Task2", "waiting", "home", "may 2")
+        self.tasks.add("Task3", "call", "home", "may 3")
+        result = self.tasks.group_by("label")
+        self.assertDictEqual(result.get_counts(), {"call": 2, "waiting": 1})
+        self.assertListEqual([task.name for task in result.to_list()], ["Task1", "Task3", "Task2"])
+
+    def test_group_by_label_should_page_rows(self):
+        for index in range(12):
+            self.tasks.add(f"Task{index}", "call" if index < 7 else "waiting", "work", "may 7")
+        result = self.tasks.group_by("label", 2)
+        self.assertDictEqual(result.get_counts(), {"call": 7, "waiting": 5})
+        self.assertEqual(result.item_count, 2)
+        self.assertEqual(result.get_page().page_count, 2)
+        self.assertListEqual([label for label, _ in result.get_groups()], ["waiting"])
+
     def test_get_list_by_date_expression(self):
         self.tasks.add("FutureTask", "waiting", "work", "tomorrow")
         result = self.tasks.get_tasks_by_date("tomorrow")
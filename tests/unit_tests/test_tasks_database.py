@@ -1,4 +1,8 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from redis import Redis
+from redisearch import Client, IndexDefinition, TextField
 
 from taskmgr.lib.database.db_manager import DatabaseManager
 from taskmgr.lib.model.task import Task
@@ -37,6 +41,15 @@ class TestTasksDatabase(unittest.TestCase):
     def tearDown(self) -> None:
         self.db.clear()
 
+    def test_page_number_should_be_kept_per_thread(self):
+        self.db.set_page_number(2)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(self.db.set_page_number, 5).result()
+            worker_page = executor.submit(self.db.get_page_number).result()
+
+        self.assertEqual(self.db.get_page_number(), 2)
+        self.assertEqual(worker_page, 5)
+
     def test_insert_should_create_object(self):
         self.db.append_object(self.t1)
         self.db.replace_object(self.t1)
@@ -80,6 +93,44 @@ class TestTasksDatabase(unittest.TestCase):
         task = self.db.get_object("label", self.t1.label)
         self.assertEqual(task.label, self.t1.label)
 
+    def test_append_objects_should_reserve_sequential_indexes(self):
+        self.db.append_object(self.t1)
+        self.db.append_objects([self.t2, self.t3])
+        self.assertListEqual([self.t1.index, self.t2.index, self.t3.index], [1, 2, 3])
+
+    def test_append_objects_should_write_in_chunks(self):
+        result = self.db.append_objects([self.t1, self.t2, self.t3], chunk_size=2)
+        self.assertEqual(result.item_count, 3)
+        self.assertEqual(len(result.get_chunk_times()), 2)
+        self.assertEqual(self.db.get_all().item_count, 3)
+
+    def test_clear_should_reset_index(self):
+        self.db.append_objects([self.t1, self.t2])
+        self.db.clear()
+        self.db.append_object(self.t3)
+        self.assertEqual(self.t3.index, 1)
+
+    def test_clear_should_unlink_in_batches(self):
+        self.db.append_objects([self.t1, self.t2, self.t3])
+        scan_count = self.vars.scan_count
+        self.vars.scan_count = 2
+        try:
+            progress_list = list()
+            result = self.db.clear(on_progress=lambda progress: progress_list.append(progress.deleted_count))
+        finally:
+            self.vars.scan_count = scan_count
+        self.assertEqual(result.deleted_count, 3)
+        self.assertEqual(progress_list, [2, 3])
+        self.assertEqual(self.db.get_all().item_count, 0)
+
+    def test_clear_should_drop_index(self):
+        self.db.append_objects([self.t1, self.t2, self.t3])
+        result = self.db.clear(drop_index=True)
+        self.assertTrue(result.index_dropped)
+        self.assertEqual(self.db.get_index_info()["index_name"], "tasks:idx:v2")
+        self.db.append_object(self.t1)
+        self.assertEqual(self.db.get_all().item_count, 1)
+
     def test_aggregate_label(self):
         self.t1.label = "my_label"
         self.t2.label = "my_label"
@@ -106,6 +157,67 @@ class TestTasksDatabase(unittest.TestCase):
         due_date_list = self.db.unique("due_date")
         self.assertListEqual(due_date_list, ["2019-07-01"])
 
+    def test_get_by_values_should_read_unique_ids_from_hash(self):
+        self.db.append_object(self.t1)
+        self.db.append_objects([self.t2, self.t3])
+        self.t3.name = "t3 renamed"
+        self.db.replace_objects([self.t3])
+
+        task_dict = self.db.get_by_values("unique_id", [self.t1.unique_id, self.t3.unique_id, "missing"])
+        self.assertEqual(sorted(task_dict), sorted([self.t1.unique_id, self.t3.unique_id]))
+        self.assertEqual(task_dict[self.t3.unique_id].name, "t3 renamed")
+        self.assertEqual(self.db.get_object("unique_id", self.t2.unique_id).index, 2)
+        self.assertIsNone(self.db.get_object("unique_id", "missing"))
+
+    def test_create_index_should_move_alias(self):
+        self.db.append_objects([self.t1])
+        version = self.db.schema_version
+        self.assertEqual(self.db.get_index_info()["index_name"], f"tasks:idx:v{version}")
+
+        self.db.schema_version = version + 1
+        try:
+            self.db.create_index()
+            self.assertEqual(self.db.get_index_info()["index_name"], f"tasks:idx:v{version + 1}")
+            self.assertEqual(self.db.get_object("unique_id", self.t1.unique_id).name, "t1")
+        finally:
+            del self.db.schema_version
+            self.db.create_index()
+        self.assertEqual(self.db.get_index_info()["index_name"], f"tasks:idx:v{version}")
+
+    def test_tag_values_should_keep_commas(self):
+        self.t1.project = "home, work"
+        self.t2.project = "home"
+        self.db.append_objects([self.t1, self.t2])
+        task_list = self.db.get_selected("project", "home, work").to_list()
+        self.assertListEqual([task.name for task in task_list], ["t1"])
+        self.assertListEqual(sorted(self.db.unique("project")), ["home", "home, work"])
+
+    def test_create_index_should_replace_legacy_index(self):
+        self.db.append_objects([self.t1])
+        index_name = self.db.get_index_info()["index_name"]
+        db = Redis(host=self.vars.redis_host, port=self.vars.redis_port)
+        db.execute_command("FT.ALIASDEL", "tasks:idx")
+        db.execute_command("FT.DROPINDEX", index_name)
+        Client("tasks:idx", conn=db).create_index((TextField("name"),), definition=IndexDefinition(prefix=["Task:"]))
+
+        self.db.create_index()
+        self.assertEqual(self.db.get_index_info()["index_name"], index_name)
+        self.assertEqual(self.db.get_object("unique_id", self.t1.unique_id).name, "t1")
+
+    def test_create_index_should_seed_id_keys_in_batches(self):
+        self.db.append_objects([self.t1, self.t2, self.t3])
+        db = Redis(host=self.vars.redis_host, port=self.vars.redis_port)
+        db.delete(self.db.id_key_name)
+
+        scan_count = self.vars.scan_count
+        self.vars.scan_count = 2
+        try:
+            self.db.create_index()
+        finally:
+            self.vars.scan_count = scan_count
+        self.assertEqual(db.hlen(self.db.id_key_name), 3)
+        self.assertEqual(self.db.get_object("unique_id", self.t3.unique_id).name, "t3")
+
     def test_object_serialization(self):
         self.db.append_object(self.t1)
         result = self.db.get_all()
@@ -68,3 +68,21 @@ class TestTimeCardImporter(unittest.TestCase):
         self.assertTrue(sync_results_list[0] == SyncAction.ADDED)
         self.assertTrue(sync_results_list[1] == SyncAction.UPDATED)
         self.assertTrue(sync_results_list[2] == SyncAction.DELETED)
+
+    def test_import_time_cards_with_bulk_save(self):
+        time_card = self.time_cards.add("8:00", "10:00", "2023-07-04")
+
+        updated_time_card = TimeCard()
+        updated_time_card.time_out = "12:00"
+        updated_time_card.elapsed_time = "4:00"
+        updated_time_card.unique_id = time_card.unique_id
+
+        obj_list = [{'time_in': '8:00', 'time_out': '10:00', 'date': '2023-07-05'},
+                    {'time_in': '8:00', 'time_out': '10:00', 'date': '2023-07-05'}]
+        time_card_list = [updated_time_card] + self.importer.convert(obj_list)
+
+        sync_results = self.importer.import_objects(time_card_list, bulk_save=True)
+        self.assertListEqual(sync_results.get_list(), [SyncAction.UPDATED, SyncAction.ADDED, SyncAction.ADDED])
+
+        self.assertEqual(self.time_cards.get_all().item_count, 3)
+        self.assertEqual(self.time_cards.get_time_card_by_index(time_card.index).time_out, "12:00")
@@ -1,6 +1,7 @@
+import os
 import unittest
 
-from taskmgr.lib.variables import CommonVariables
+from taskmgr.lib.variables import CommonVariables, ConfigCache
 
 
 class TestVariables(unittest.TestCase):
@@ -31,6 +32,12 @@ class TestVariables(unittest.TestCase):
         self.assertIsInstance(self.vars.redis_port, int)
         self.assertIsInstance(self.vars.redis_host, str)
 
+    def test_durability_variables(self):
+        self.assertIn(self.vars.durability, CommonVariables.durability_modes)
+        self.assertIsInstance(self.vars.bgsave_interval, int)
+        with self.assertRaises(ValueError):
+            self.vars.durability = "always"
+
     def test_set_variable(self):
         self.vars.default_project_name = "work"
         self.assertTrue(self.vars.default_project_name == "work")
@@ -41,6 +48,68 @@ class TestVariables(unittest.TestCase):
         vars.reset()
         self.assertTrue(len(str(vars.default_project_name)) == 0)
 
+    def test_cache_should_not_parse_unchanged_file(self):
+        self.vars.max_rows = 10
+        self.assertEqual(self.vars.max_rows, 10)
+        parse_count = CommonVariables.cache.parse_count
+
+        for _ in range(100):
+            self.assertEqual(CommonVariables('test_variables.ini').max_rows, 10)
+        self.assertEqual(CommonVariables.cache.parse_count, parse_count)
+
+    def test_cache_should_reload_modified_file(self):
+        self.vars.default_label = "home"
+        self.assertEqual(self.vars.default_label, "home")
+
+        path = f"{self.vars.resources_dir}/test_variables.ini"
+        with open(path, 'r') as configfile:
+            content = configfile.read()
+        with open(path, 'w') as configfile:
+            configfile.write(content.replace("default_label = home", "default_label = office"))
+
+        check_interval = ConfigCache.check_interval
+        ConfigCache.check_interval = 0
+        try:
+            self.assertEqual(self.vars.default_label, "office")
+        finally:
+            ConfigCache.check_interval = check_interval
+            self.vars.reset()
+
+    def test_unknown_durability_should_use_default(self):
+        self.vars.durability = "sync"
+        path = f"{self.vars.resources_dir}/test_variables.ini"
+        with open(path, 'r') as configfile:
+            content = configfile.read()
+        with open(path, 'w') as configfile:
+            configfile.write(content.replace("durability = sync", "durability = Sync"))
+
+        check_interval = ConfigCache.check_interval
+        ConfigCache.check_interval = 0
+        try:
+            self.assertEqual(self.vars.durability, CommonVariables.default_values["durability"])
+        finally:
+            ConfigCache.check_interval = check_interval
+            self.vars.reset()
+
+    def test_missing_section_should_use_defaults(self):
+        vars = CommonVariables('test_missing_section.ini')
+        path = f"{vars.resources_dir}/test_missing_section.ini"
+        try:
+            self.assertEqual(vars.redis_host, "localhost")
+            parse_count = CommonVariables.cache.parse_count
+            inode = os.stat(path).st_ino
+
+            for _ in range(10):
+                self.assertEqual(vars.redis_host, "localhost")
+                self.assertEqual(vars.snapshot_reconcile_interval, 3600)
+            self.assertEqual(CommonVariables.cache.parse_count, parse_count)
+            self.assertEqual(os.stat(path).st_ino, inode)
+            with open(path, 'r') as configfile:
+                self.assertNotIn("[database]", configfile.read())
+        finally:
+            os.remove(path)
+            CommonVariables.cache.invalidate(path)
+
     def test_date_format_validation(self):
         self.assertTrue(self.vars.validate_date_format('2020-01-01'))
         self.assertFalse(self.vars.validate_date_format('2020-01-011'))